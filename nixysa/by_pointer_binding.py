@@ -33,6 +33,9 @@ import java_utils
 import npapi_utils
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant')
+
+
 def JavaMemberString(scope, type_defn):
   """Gets the representation of a member name in Java.
 
@@ -33,6 +33,10 @@ import npapi_utils
 import syntax_tree
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+
 def JavaMemberString(scope, type_defn):
   """Gets the representation of a member name in Java.
 
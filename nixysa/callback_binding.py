@@ -45,6 +45,10 @@ import npapi_utils
 import syntax_tree
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+
 class Error(Exception):
   """Base exception for the callback_binding module."""
 
@@ -22,52 +22,48 @@ To use:
 """
 
 import glob
-import imp
-# Use hashlib if present (Python 2.5 and up), otherwise fall back to md5.
-try:
-  import hashlib
-except ImportError:
-  import md5
 import os
 import sys
 
 import gflags
 
 # local imports
+import depfile
+import glue_layout
 import idl_parser
 import locking
 import log
+import manifest
+import memo
+import module_registry
+import output_cache
+import parallel
+import parse_cache
+import profiler
+import reachability
+import size_report
+import stamp_file
 import syntax_tree
-
-# default supported generators
-import header_generator
-import cpp_header_generator
-import js_header_generator
-import npapi_generator
-import ppapi_generator
-
-# default supported binding models
-import pod_binding
-import enum_binding
-import callback_binding
-import by_value_binding
-import by_pointer_binding
-import unsized_array_binding
-import nullable_binding
-
-generators = {'header': header_generator,
-              'cppheader': cpp_header_generator,
-              'jsheader': js_header_generator,
-              'npapi': npapi_generator,
-              'ppapi': ppapi_generator}
-
-binding_models = {'pod': pod_binding,
-                  'callback': callback_binding,
-                  'enum': enum_binding,
-                  'by_value': by_value_binding,
-                  'by_pointer': by_pointer_binding,
-                  'unsized_array': unsized_array_binding,
-                  'nullable': nullable_binding}
+import watch
+import writer
+
+# default supported generators and binding models. The modules are only
+# imported when a run uses them, see module_registry.
+generators = module_registry.ModuleRegistry(
+    {'header': 'header_generator',
+     'cppheader': 'cpp_header_generator',
+     'jsheader': 'js_header_generator',
+     'npapi': 'npapi_generator',
+     'ppapi': 'ppapi_generator'})
+
+binding_models = module_registry.ModuleRegistry(
+    {'pod': 'pod_binding',
+     'callback': 'callback_binding',
+     'enum': 'enum_binding',
+     'by_value': 'by_value_binding',
+     'by_pointer': 'by_pointer_binding',
+     'unsized_array': 'unsized_array_binding',
+     'nullable': 'nullable_binding'})
 
 
 FLAGS = gflags.FLAGS
@@ -82,9 +78,49 @@ gflags.DEFINE_multistring('generator-module', [], 'include a generator module.'
 
 gflags.DEFINE_multistring('generate', [], 'the generator to use')
 gflags.DEFINE_string('output-dir', '.', 'the output directory')
+gflags.DEFINE_integer('jobs', 1, 'the number of processes generating files in'
+                      ' parallel.')
+
+gflags.DEFINE_string('parse-cache-dir', '', 'directory of a cache of parsed IDL'
+                     ' files and of the bytecode of the modules given by'
+                     ' --generator-module and --binding-module, that can be'
+                     ' shared between several build trees. Disabled if'
+                     ' empty.')
+gflags.DEFINE_integer('parse-cache-size', 64, 'maximum size of the parse'
+                      ' cache, in megabytes.')
+
+gflags.DEFINE_string('output-cache-dir', '', 'directory of a cache of'
+                     ' generated files, that can be shared between several'
+                     ' build trees using the same --output-dir. Disabled if'
+                     ' empty.')
+gflags.DEFINE_integer('output-cache-size', 256, 'maximum size of the output'
+                      ' cache, in megabytes.')
+gflags.DEFINE_boolean('output-cache-hardlink', False, 'hard-link the files'
+                      ' found in the output cache into the output directory,'
+                      ' instead of copying them.')
+
+gflags.DEFINE_string('depfile', '', 'write the dependencies of the generated'
+                     ' files to this file, in the Makefile syntax understood'
+                     ' by make and ninja.')
+
+gflags.DEFINE_string('profile-codegen', '', 'write a report of the time spent'
+                     ' in each phase of the run to this file, in JSON'
+                     ' format.')
+gflags.DEFINE_string('profile-codegen-stats', '', 'write the python profiler'
+                     ' statistics of the generation phase to this file, for'
+                     ' the pstats module.')
+gflags.DEFINE_string('size-report', '', 'write a report of the size of the'
+                     ' code generated for each definition and by each binding'
+                     ' model to this file, in JSON format.')
+
+gflags.DEFINE_boolean('watch', False, 'keep running, and generate the files'
+                      ' again each time the input files change.')
+gflags.DEFINE_float('watch-interval', 0.5, 'the interval between checks for'
+                    ' changes in watch mode, in seconds.')
 
 gflags.DEFINE_boolean('exclusive-lock', False, 'Use file locking to make sure'
-                      ' there is only one instance running at a time.')
+                      ' there is only one instance running at a time in the'
+                      ' output directory.')
 gflags.DEFINE_boolean('force', False, 'force generation even if the source'
                       ' files have not changed')
 gflags.DEFINE_boolean('force-docs', False, 'force all members to have'
@@ -95,6 +131,31 @@ gflags.DEFINE_boolean('overloaded-function-docs', False,
                       'generate special overloaded function docs.')
 gflags.DEFINE_boolean('properties-equal-undefined', False,
                       'Emit class.prototype.property = undefined;')
+gflags.DEFINE_multistring('glue-root', [], 'only generate the NPAPI and PPAPI'
+                          ' glue for the definitions reachable from this'
+                          ' qualified name (e.g. o3d::Client). Can be'
+                          ' repeated.')
+gflags.DEFINE_enum('glue-layout', glue_layout.FILE, glue_layout.LAYOUTS,
+                   'the layout of the NPAPI and PPAPI glue implementation'
+                   ' files: one file for each IDL file, one translation unit'
+                   ' for each class and callback, or --glue-shards files for'
+                   ' each IDL file. See glue_layout.py.')
+gflags.DEFINE_integer('glue-shards', 4, 'the number of glue implementation'
+                      ' files for each IDL file, with --glue-layout=shards.',
+                      lower_bound=1)
+gflags.DEFINE_string('glue-unity', '', 'also write a unity build file, that'
+                     ' includes all the NPAPI or PPAPI glue implementation'
+                     ' files, with this name in the output directory.'
+                     ' Disabled if empty.')
+gflags.DEFINE_string('glue-pch', '', 'also write a header including the'
+                     ' headers common to all the NPAPI or PPAPI glue files,'
+                     ' with this name in the output directory, and include it'
+                     ' first in the glue implementation files, so that it can'
+                     ' be used as a precompiled header. Disabled if empty.')
+
+# the shared IDL parser, see GetParser.
+_parser = None
+
 
 class NativeType(syntax_tree.Definition):
   defn_type = 'Native'
@@ -139,101 +200,645 @@ def GetNativeTypes():
           GetStdNamespace()]
 
 
-def AddModulesFromFlags(table, flag_values, md5_hash):
+def GetParser():
+  """Gets the IDL parser shared by all the runs of the code generator.
+
+  Returns:
+    the idl_parser.Parser.
+  """
+  global _parser
+  if _parser is None:
+    _parser = idl_parser.Parser()
+  return _parser
+
+
+def LockOutputDir(output_dir):
+  """Locks an output directory.
+
+  Only one instance of the code generator at a time generates files into an
+  output directory: this function waits until other instances release it.
+
+  Args:
+    output_dir: the output directory.
+
+  Returns:
+    the lock file. Release the lock with UnlockOutputDir.
+  """
+  lock_file = open(os.path.join(output_dir, 'lock'), 'w')
+  locking.lockf(lock_file, locking.LOCK_EX)
+  return lock_file
+
+
+def UnlockOutputDir(lock_file):
+  """Releases the lock of an output directory.
+
+  Args:
+    lock_file: the lock file returned by LockOutputDir.
+  """
+  locking.lockf(lock_file, locking.LOCK_UN)
+  lock_file.close()
+
+
+def SplitModuleFlag(entry):
+  """Splits a --generator-module or --binding-module value.
+
+  Args:
+    entry: the flag value, as name:path.
+
+  Returns:
+    a (name, path) pair.
+  """
+  string_list = entry.split(':')
+  return string_list[0], ':'.join(string_list[1:])
+
+
+def AddModulesFromFlags(table, flag_values, bytecode_cache=None):
+  """Registers the modules given by --generator-module or --binding-module.
+
+  The modules are loaded the first time they are used. Modules that are
+  already registered with the same source file, e.g. by a code generator
+  server, are kept.
+
+  Args:
+    table: the module_registry.ModuleRegistry to add the modules to.
+    flag_values: the flag values, as name:path.
+    bytecode_cache: the disk_cache.DiskCache to keep the bytecode of the
+      modules in, or None.
+  """
+  if bytecode_cache is not None:
+    table.bytecode_cache = bytecode_cache
   for entry in flag_values:
-    string_list = entry.split(':')
-    name = string_list[0]
-    path = ':'.join(string_list[1:])
+    name, path = SplitModuleFlag(entry)
     try:
-      # hash the extra modules that we load
-      md5_hash.update(open(path).read())
-      table[name] = imp.load_source(name, path)
+      table.AddSource(name, path)
     except IOError:
       print 'Could not load module %s.' % path
       raise
 
 
-def main(argv):
-  files = argv[1:]
-  # generate a hash of all the inputs to figure out if we need to re-generate
-  # the outputs.
-  # Use hashlib if present (Python 2.5 and up), otherwise fall back to md5.
-  if globals().has_key('hashlib'):
-    md5_hash = hashlib.md5()
+def GetOutputCache():
+  """Gets the output cache selected by the flags.
+
+  Returns:
+    the output_cache.OutputCache, or None if it is disabled.
+  """
+  if not FLAGS['output-cache-dir'].value:
+    return None
+  return output_cache.OutputCache(
+      FLAGS['output-cache-dir'].value,
+      FLAGS['output-cache-size'].value * 1024 * 1024,
+      FLAGS['output-cache-hardlink'].value)
+
+
+def GetToolSources():
+  """Gets the python source files of the code generator.
+
+  Returns:
+    the sorted list of the source files.
+  """
+  sources = glob.glob(os.path.join(os.path.dirname(__file__), '*.py'))
+  sources.sort()
+  return sources
+
+
+def GetModuleSources():
+  """Gets the python source files of all the loaded code generator modules.
+
+  Returns:
+    the list of the absolute paths of the code generator source files,
+    followed by the ones of the generator and binding model modules loaded
+    from other directories.
+  """
+  sources = [os.path.abspath(source) for source in GetToolSources()]
+  for source in generators.GetSources() + binding_models.GetSources():
+    source = os.path.abspath(source)
+    if source not in sources:
+      sources.append(source)
+  return sources
+
+
+def GetToolDigest():
+  """Gets the digest of the code generator and of the flags affecting outputs.
+
+  Generator and binding model modules are not included: the dependency
+  manifest tracks them separately.
+
+  Returns:
+    the digest, as an hexadecimal string.
+  """
+  md5_hash = writer.NewMd5()
+  tracked_sources = set(os.path.abspath(source) for source in
+                        generators.GetSources() + binding_models.GetSources())
+  for source_file in GetToolSources():
+    if os.path.abspath(source_file) not in tracked_sources:
+      md5_hash.update(open(source_file).read())
+  md5_hash.update(FLAGS['output-dir'].value)
+  for flag in ['force-docs', 'no-return-docs', 'overloaded-function-docs',
+               'properties-equal-undefined', 'glue-layout', 'glue-shards',
+               'glue-unity', 'glue-pch']:
+    md5_hash.update('%s=%s\n' % (flag, FLAGS[flag].value))
+  return md5_hash.hexdigest()
+
+
+def FilesAreIndependent(generator):
+  """Checks whether the outputs of a generator for a file only depend on it.
+
+  Generators declare this by setting a files_are_independent module attribute
+  to True. Each of their output files must then only depend on its source file
+  and on the types it references, so that the generator can be run on the
+  subset of the source files that are out of date, and its outputs can be
+  cached for each file.
+
+  Args:
+    generator: the generator module.
+
+  Returns:
+    True if the outputs for each file are independent of the other files.
+  """
+  return getattr(generator, 'files_are_independent', False)
+
+
+def SupportsJobs(generator):
+  """Checks whether a generator can generate its files in parallel.
+
+  Generators declare this by setting a supports_jobs module attribute to True.
+  Their ProcessFiles function then takes a jobs argument, the maximum number of
+  processes to use. Other generators are called with the output directory, the
+  pairs and the namespace only.
+
+  Args:
+    generator: the generator module.
+
+  Returns:
+    True if the ProcessFiles function of the generator takes a jobs argument.
+  """
+  return getattr(generator, 'supports_jobs', False)
+
+
+def GetWriterUnits(writer_list):
+  """Groups writers by the source file they were generated from.
+
+  Args:
+    writer_list: a list of writers, each with an idl_file member, see
+      writer.IsTracked.
+
+  Returns:
+    a list of (idl_parser.File, writer list) pairs, in the order of the first
+    writer of each file.
+  """
+  units = []
+  unit_map = {}
+  for file_writer in writer_list:
+    if file_writer.idl_file not in unit_map:
+      unit_map[file_writer.idl_file] = []
+      units.append((file_writer.idl_file, unit_map[file_writer.idl_file]))
+    unit_map[file_writer.idl_file].append(file_writer)
+  return units
+
+
+def GetDepfileRules(pairs, tracker, my_manifest):
+  """Gets the dependencies of all the generated files.
+
+  Args:
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file.
+    tracker: the manifest.DependencyTracker for the definitions.
+    my_manifest: the manifest.Manifest listing the output files of each unit.
+
+  Returns:
+    a list of (output, input list) pairs, one for each generated file.
+  """
+  tool_sources = GetToolSources()
+  all_sources = [idl_file.source for (idl_file, defn) in pairs]
+  pair_map = dict([(idl_file.source, (idl_file, defn)) for (idl_file, defn)
+                   in pairs])
+  rules = []
+  for generator_name in FLAGS.generate:
+    generator = generators[generator_name]
+    independent = FilesAreIndependent(generator)
+    for source, outputs in my_manifest.GetUnits(generator_name):
+      if source in pair_map:
+        idl_file, defn = pair_map[source]
+        files, unit_binding_models = tracker.GetDependencies(
+            idl_file, defn, not independent)
+        module_sources = [manifest.GetModuleSource(module) for module in
+                          unit_binding_models]
+      else:
+        # Global namespace glue.
+        files = all_sources
+        module_sources = binding_models.GetSources()
+      inputs = [f for f in all_sources if f in files]
+      module_sources = [manifest.GetModuleSource(generator)] + module_sources
+      module_sources.sort()
+      for input_file in tool_sources + module_sources:
+        if input_file not in inputs:
+          inputs.append(input_file)
+      for output in outputs:
+        rules.append((output, inputs))
+  return rules
+
+
+def GetInputHash(files, stamps=None, file_digests=None):
+  """Gets the hash of all the inputs of the code generator.
+
+  Args:
+    files: the list of the IDL files.
+    stamps: the stamp_file.StampFile giving the digests of the files that
+      didn't change since the last run, or None to read all the files.
+    file_digests: (optional) a dictionary receiving the digest of each IDL
+      file, by file name.
+
+  Returns:
+    the hash, as an hexadecimal string.
+  """
+  if stamps is None:
+    get_digest = manifest.GetFileDigest
   else:
-    md5_hash = md5.new();
+    get_digest = stamps.GetDigest
+  md5_hash = writer.NewMd5()
   # hash the input files and the source python files (globbing *.py in the
   # directory of this file)
-  for source_file in files + glob.glob(os.path.join(os.path.dirname(__file__),
-                                                    '*.py')):
-    md5_hash.update(open(source_file).read())
+  for source_file in files:
+    digest = get_digest(source_file)
+    md5_hash.update(digest)
+    if file_digests is not None:
+      file_digests[source_file] = digest
+  for source_file in glob.glob(os.path.join(os.path.dirname(__file__),
+                                            '*.py')):
+    md5_hash.update(get_digest(source_file))
   # hash the options since they may affect the output
   for s in (FLAGS['generator-module'].value + FLAGS['binding-module'].value +
-            FLAGS.generate + [FLAGS['output-dir'].value]):
+            FLAGS.generate + [FLAGS['output-dir'].value] +
+            FLAGS['glue-root'].value +
+            [FLAGS['glue-layout'].value, str(FLAGS['glue-shards'].value),
+             FLAGS['glue-unity'].value, FLAGS['glue-pch'].value]):
     md5_hash.update(s)
+  # hash the extra modules that we load
+  for entry in FLAGS['generator-module'].value + FLAGS['binding-module'].value:
+    md5_hash.update(get_digest(SplitModuleFlag(entry)[1]))
+  return md5_hash.hexdigest()
 
-  # import generator and binding model modules, and hash them
-  AddModulesFromFlags(generators, FLAGS['generator-module'].value, md5_hash)
-  AddModulesFromFlags(binding_models, FLAGS['binding-module'].value, md5_hash)
-
-  output_dir = FLAGS['output-dir'].value
-  if not os.path.isdir(output_dir):
-    os.makedirs(output_dir)
-
-  hash_filename = os.path.join(output_dir, 'hash')
-  hash_value = md5_hash.hexdigest()
-  if not FLAGS.force:
-    try:
-      hash_file = open(hash_filename, 'r')
-      # Don't read while others are writing...
-      if FLAGS['exclusive-lock'].value:
-        locking.lockf(hash_file, locking.LOCK_SH)
 
-      old_hash = hash_file.read()
+def ParseFiles(files, parser, my_parse_cache):
+  """Parses the IDL files.
 
-      if FLAGS['exclusive-lock'].value:
-        locking.lockf(hash_file, locking.LOCK_UN)
-      hash_file.close()
-
-      if hash_value == old_hash:
-        print "Source files haven't changed: nothing to generate."
-        return
-    except IOError:
-      # Could not load the hash file, so there must be stuff to
-      # generate.
-      pass
+  Args:
+    files: the list of the IDL files.
+    parser: the idl_parser.Parser to parse the files with.
+    my_parse_cache: the parse_cache.ParseCache to get the definitions from, or
+      None.
 
-  hash_file = open(hash_filename, 'w')
-  if FLAGS['exclusive-lock'].value:
-    locking.lockf(hash_file, locking.LOCK_EX)
-
-  my_parser = idl_parser.Parser(output_dir)
+  Returns:
+    a list of (idl_parser.File, syntax_tree.Definition list) describing the
+    list of top-level definitions in each source file.
+  """
   pairs = []
   for f in files:
     idl_file = idl_parser.File(f)
-    defn = my_parser.Parse(idl_file)
+    if my_parse_cache:
+      defn = profiler.Call('parse', f, my_parse_cache.Parse, parser,
+                           idl_file)
+    else:
+      defn = profiler.Call('parse', f, parser.Parse, idl_file)
     pairs.append((idl_file, defn))
+  if my_parse_cache:
+    my_parse_cache.Trim()
+  return pairs
+
+
+def PruneUnreachable(pairs, global_namespace, tool_digest):
+  """Finds the definitions reachable from the --glue-root flags.
+
+  The NPAPI and PPAPI generators skip the other definitions. The pruned
+  definitions are reported.
+
+  Args:
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file.
+    global_namespace: the finalized global namespace.
+    tool_digest: the digest of the code generator and of the flags, see
+      GetToolDigest.
+
+  Returns:
+    the tool digest, updated with the set of reachable definitions: the
+    outputs of every file depend on it.
+
+  Raises:
+    reachability.UnknownRootError: a root doesn't name any definition.
+  """
+  start = profiler.Start()
+  reachable = reachability.Prune(global_namespace, FLAGS['glue-root'].value)
+  pruned = []
+  for (idl_file, defn) in pairs:
+    pruned += reachability.GetPruned(global_namespace, defn)
+  profiler.Record('prune', ','.join(FLAGS['glue-root'].value), start,
+                  reachable=len(reachable), pruned=len(pruned))
+  table = global_namespace.symbol_table
+  for defn in pruned:
+    log.Info('Pruned unreachable %s %s' % (defn.defn_type,
+                                           table.GetQualifiedName(defn)))
+  log.Info('Glue roots: %d definitions reachable, %d pruned.' %
+           (len(reachable), len(pruned)))
+  md5_hash = writer.NewMd5()
+  md5_hash.update(tool_digest)
+  md5_hash.update(reachability.GetDigest(global_namespace))
+  return md5_hash.hexdigest()
+
+
+def GenerateOutputs(pairs, output_dir, manifest_filename, file_digests=None):
+  """Generates the outputs whose dependencies changed since the last run.
+
+  Args:
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file. The definitions
+      are not finalized yet.
+    output_dir: the output directory.
+    manifest_filename: the name of the dependency manifest file.
+    file_digests: (optional) the digests of the IDL files, by file name, as
+      computed by GetInputHash.
+  """
   definitions = sum([defn for (f, defn) in pairs], []) + GetNativeTypes()
   global_namespace = syntax_tree.Namespace(None, [], '', definitions)
   syntax_tree.FinalizeObjects(global_namespace, binding_models)
+  tool_digest = GetToolDigest()
+  if FLAGS['glue-root'].value:
+    tool_digest = PruneUnreachable(pairs, global_namespace, tool_digest)
 
-  writer_list = []
+  # Only generate the outputs whose dependencies changed since the last run.
+  tracker = manifest.DependencyTracker(pairs, tool_digest, file_digests)
+  my_manifest = manifest.Manifest(manifest_filename)
+  if not FLAGS.force:
+    my_manifest.Load()
+  my_output_cache = GetOutputCache()
+  defn_map = dict(pairs)
+  tasks = []
   for generator_name in FLAGS.generate:
     try:
       generator = generators[generator_name]
-      writer_list += generator.ProcessFiles(output_dir, pairs, global_namespace)
     except KeyError:
       print 'Unknown generator %s.' % generator_name
       raise
-  for writer in writer_list:
-    writer.Write()
+    independent = FilesAreIndependent(generator)
+    digests = {}
+    for (idl_file, defn) in pairs:
+      digests[idl_file] = tracker.GetUnitDigest(generator, idl_file, defn,
+                                                not independent)
+    if independent:
+      # Only run the generator on the files that are out of date.
+      generator_pairs = [(idl_file, defn) for (idl_file, defn) in pairs if not
+                         my_manifest.IsUpToDate((generator_name,
+                                                 idl_file.source),
+                                                digests[idl_file])]
+    else:
+      generator_pairs = pairs
+    # Get the outputs found in the output cache instead of generating them:
+    # each file for independent generators, all the files otherwise.
+    cached_writers = []
+    cache_key = None
+    if my_output_cache and independent:
+      remaining_pairs = []
+      for (idl_file, defn) in generator_pairs:
+        unit_writers = my_output_cache.Get(
+            my_output_cache.GetKey(generator_name, [digests[idl_file]]),
+            output_dir, pairs)
+        if unit_writers is None:
+          remaining_pairs.append((idl_file, defn))
+        else:
+          cached_writers += unit_writers
+      generator_pairs = remaining_pairs
+    elif my_output_cache:
+      cache_key = my_output_cache.GetKey(
+          generator_name,
+          [digests[idl_file] for (idl_file, defn) in pairs] +
+          [tracker.GetGlobalsDigest(generator, binding_models.GetSources())])
+      cached_writers = my_output_cache.Get(cache_key, output_dir, pairs)
+      if cached_writers is None:
+        cached_writers = []
+      else:
+        generator_pairs = None
+    tasks.append((generator_name, generator, independent, digests,
+                  generator_pairs, cached_writers, cache_key))
+
+  # With --jobs, the generators run concurrently, sharing the processes.
+  jobs = FLAGS.jobs
+  generator_jobs = max(1, jobs / max(1, len(tasks)))
+
+  def _RunGenerator(task):
+    generator, task_pairs = task[1], task[4]
+    if task_pairs is None:
+      # All the outputs are in the output cache.
+      return []
+    memo.ResetStats()
+    start = profiler.Start()
+    if SupportsJobs(generator):
+      generator_writers = generator.ProcessFiles(output_dir, task_pairs,
+                                                 global_namespace,
+                                                 jobs=generator_jobs)
+    else:
+      generator_writers = generator.ProcessFiles(output_dir, task_pairs,
+                                                 global_namespace)
+    profiler.Record('generate', task[0], start, memo=memo.GetStats())
+    return generator_writers
+  results = parallel.MapWriters(_RunGenerator, tasks, jobs, pairs)
+
+  writer_lists = []
+  # The units to add to the output cache once they are written, as (cache key,
+  # writer list) pairs.
+  cache_units = []
+  # The writers that can't be tracked, written unconditionally.
+  untracked_writers = []
+  for task, generator_writers in zip(tasks, results):
+    (generator_name, generator, independent, digests, task_pairs,
+     cached_writers, cache_key) = task
+    untracked = [file_writer for file_writer in generator_writers
+                 if not writer.IsTracked(file_writer)]
+    if untracked:
+      untracked_writers += untracked
+      generator_writers = [file_writer for file_writer in generator_writers
+                           if writer.IsTracked(file_writer)]
+    # A cached unit would miss the untracked files.
+    if my_output_cache and not untracked:
+      if independent:
+        for idl_file, unit_writers in GetWriterUnits(generator_writers):
+          if idl_file in defn_map:
+            cache_units.append((
+                my_output_cache.GetKey(generator_name, [digests[idl_file]]),
+                unit_writers))
+      elif task_pairs is not None:
+        cache_units.append((cache_key, generator_writers))
+    generator_writers = generator_writers + cached_writers
+    writer_list = []
+    sources = [idl_file.source for (idl_file, defn) in pairs]
+    for idl_file, unit_writers in GetWriterUnits(generator_writers):
+      if idl_file in defn_map:
+        digest = digests[idl_file]
+      else:
+        # Global namespace glue.
+        digest = tracker.GetGlobalsDigest(generator,
+                                          binding_models.GetSources())
+        sources.append(idl_file.source)
+      key = (generator_name, idl_file.source)
+      if independent or not my_manifest.IsUpToDate(key, digest):
+        writer_list += unit_writers
+        my_manifest.Update(key, digest, [unit_writer.GetFilename() for
+                                         unit_writer in unit_writers])
+    my_manifest.Prune(generator_name, sources)
+    writer_lists.append((generator_name, writer_list))
+  # The files whose contents didn't change are not written again.
+  output_stamps = stamp_file.StampFile(os.path.join(output_dir,
+                                                    'output_stamps'))
+  output_stamps.Load()
+  for generator_name, writer_list in writer_lists:
+    start = profiler.Start()
+    written = writer.WriteFiles(writer_list, output_stamps)
+    if profiler.IsEnabled():
+      output_bytes = sum([os.path.getsize(file_writer.GetFilename())
+                          for file_writer in writer_list])
+      profiler.Record('write', generator_name, start,
+                      output_files=len(writer_list), output_bytes=output_bytes,
+                      written_files=len(written))
+    for file_writer in writer_list:
+      size_report.AddFile(file_writer.GetFilename(),
+                          file_writer.idl_file.source)
+  for file_writer in untracked_writers:
+    file_writer.Write()
+  for cache_key, unit_writers in cache_units:
+    my_output_cache.Put(cache_key, output_dir, unit_writers, output_stamps)
+  output_stamps.Keep(my_manifest.GetOutputs())
+  output_stamps.Save()
+  my_manifest.Save()
+  if my_output_cache:
+    start = profiler.Start()
+    my_output_cache.Trim()
+    profiler.Record('output_cache', FLAGS['output-cache-dir'].value, start,
+                    hits=my_output_cache.hits, misses=my_output_cache.misses)
+    log.Info('Output cache: %d hits, %d misses.' % (my_output_cache.hits,
+                                                    my_output_cache.misses))
+  if FLAGS.depfile:
+    depfile.WriteDepfile(FLAGS.depfile,
+                         GetDepfileRules(pairs, tracker, my_manifest))
+
+
+def Generate(files, get_pairs):
+  """Generates the files that are out of date.
+
+  Args:
+    files: the list of the IDL files.
+    get_pairs: a function returning the list of (idl_parser.File,
+      syntax_tree.Definition list) pairs describing the top-level definitions
+      in each source file. It is only called if something needs to be
+      generated.
+  """
+  output_dir = FLAGS['output-dir'].value
+  if not os.path.isdir(output_dir):
+    os.makedirs(output_dir)
 
-  # Save hash for next time
-  hash_file.write(hash_value)
   if FLAGS['exclusive-lock'].value:
-    locking.lockf(hash_file, locking.LOCK_UN)
-  hash_file.close()
-  log.FailIfHaveErrors()
+    lock_file = LockOutputDir(output_dir)
+  try:
+    hash_filename = os.path.join(output_dir, 'hash')
+    manifest_filename = os.path.join(output_dir, 'manifest')
+    # generate a hash of all the inputs to figure out if we need to
+    # re-generate the outputs. Only the files whose stat data changed since
+    # the last run are read.
+    stamps = stamp_file.StampFile(os.path.join(output_dir, 'stamps'))
+    stamps.Load()
+    file_digests = {}
+    hash_value = profiler.Call('hash', '', GetInputHash, files, stamps,
+                               file_digests)
+    stamps.Save()
+    if not FLAGS.force:
+      try:
+        old_hash = open(hash_filename, 'r').read()
+        if hash_value == old_hash:
+          old_manifest = manifest.Manifest(manifest_filename)
+          old_manifest.Load()
+          if (old_manifest.HasAllOutputs() and
+              (not FLAGS.depfile or os.path.exists(FLAGS.depfile))):
+            print "Source files haven't changed: nothing to generate."
+            return
+      except IOError:
+        # Could not load the hash file, so there must be stuff to
+        # generate.
+        pass
+
+    # Remove the hash while generating, so that an interrupted run is not
+    # considered up to date.
+    if os.path.exists(hash_filename):
+      os.remove(hash_filename)
+    pairs = get_pairs()
+    try:
+      if FLAGS['profile-codegen-stats'].value:
+        profiler.RunWithStats(FLAGS['profile-codegen-stats'].value,
+                              GenerateOutputs, pairs, output_dir,
+                              manifest_filename, file_digests)
+      else:
+        GenerateOutputs(pairs, output_dir, manifest_filename, file_digests)
+    except reachability.UnknownRootError, e:
+      # Without the hash, the next run generates the outputs again.
+      log.Error('Unknown glue root %s.' % e.name)
+      return
+
+    # Save hash for next time
+    hash_file = open(hash_filename, 'w')
+    try:
+      hash_file.write(hash_value)
+    finally:
+      hash_file.close()
+  finally:
+    if FLAGS['exclusive-lock'].value:
+      UnlockOutputDir(lock_file)
+
+
+def Run(files, get_pairs):
+  """Generates the files that are out of date, and profiles the run.
+
+  Args:
+    files: the list of the IDL files.
+    get_pairs: the function returning the parsed files, see Generate.
+  """
+  profiler.Reset()
+  size_report.Reset()
+  # The definitions are new in each run.
+  memo.Reset()
+  try:
+    Generate(files, get_pairs)
+  finally:
+    if FLAGS['profile-codegen'].value:
+      profiler.WriteReport(FLAGS['profile-codegen'].value)
+    if FLAGS['size-report'].value:
+      size_report.WriteReport(FLAGS['size-report'].value)
+
+
+def main(argv):
+  files = argv[1:]
+  my_parser = GetParser()
+  if FLAGS['parse-cache-dir'].value:
+    my_parse_cache = parse_cache.ParseCache(
+        FLAGS['parse-cache-dir'].value,
+        FLAGS['parse-cache-size'].value * 1024 * 1024)
+    bytecode_cache = my_parse_cache.cache
+  else:
+    my_parse_cache = None
+    bytecode_cache = None
+
+  # register generator and binding model modules
+  AddModulesFromFlags(generators, FLAGS['generator-module'].value,
+                      bytecode_cache)
+  AddModulesFromFlags(binding_models, FLAGS['binding-module'].value,
+                      bytecode_cache)
+
+  if FLAGS['profile-codegen'].value:
+    profiler.Enable()
+  if FLAGS['size-report'].value:
+    size_report.Enable()
+  if FLAGS.watch:
+    watcher = watch.SourceWatcher(files, my_parser, my_parse_cache)
+    watch.Watch(lambda: Run(files, watcher.GetPairs), files,
+                GetModuleSources(), FLAGS['watch-interval'].value)
+  else:
+    Run(files, lambda: ParseFiles(files, my_parser, my_parse_cache))
+    log.FailIfHaveErrors()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,354 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Code generator benchmark.
+
+This script generates synthetic IDL files, runs each generator on them, and
+writes the timings in JSON format. The size of the IDL corpus is multiplied by
+each of the --scales, so that the timings show how the code generator scales:
+the 'scaling' member of the results has, for each generator, the exponent of
+the best power law fit of the run time as a function of the corpus size. An
+exponent noticeably greater than 1 means super-linear behavior.
+
+Each run is a new code generator process, with --force and --profile-codegen:
+the results include the profiling report (see profiler.py) of each run. The
+tree_rss_kb member of each run is the peak memory use of the process once the
+syntax tree is finalized, before the generators run, which mostly measures the
+size of the syntax tree.
+
+To use:
+ codegen_benchmark.py --files=20 --classes=50 --scales=1,2,4 \
+     --output=results.json
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import gflags
+
+import profiler
+
+
+FLAGS = gflags.FLAGS
+gflags.DEFINE_integer('files', 10, 'the number of IDL files, at scale 1.')
+gflags.DEFINE_integer('classes', 20, 'the number of classes in each file.')
+gflags.DEFINE_integer('namespace-depth', 2, 'the depth of the namespaces the'
+                      ' definitions of each file are in.')
+gflags.DEFINE_integer('inheritance-depth', 4, 'the length of the inheritance'
+                      ' chains of the classes.')
+gflags.DEFINE_integer('typedef-depth', 4, 'the length of the typedef chains.')
+gflags.DEFINE_integer('overloads', 3, 'the number of overloads of each'
+                      ' method.')
+gflags.DEFINE_list('scales', '1,2,4', 'the multipliers of the number'
+                   ' of files.')
+gflags.DEFINE_list('generators', 'header,cppheader,jsheader,npapi,ppapi',
+                   'the generators to benchmark.')
+gflags.DEFINE_integer('repeat', 1, 'the number of runs for each generator and'
+                      ' scale. The fastest run is kept.')
+gflags.DEFINE_string('output', 'codegen_benchmark.json', 'the results file.')
+gflags.DEFINE_string('work-dir', '', 'the directory for the IDL files and the'
+                     ' outputs. Defaults to a temporary directory, removed'
+                     ' at the end.')
+
+
+def GenerateIdl(index, classes, namespace_depth, inheritance_depth,
+                typedef_depth, overloads):
+  """Generates the contents of a synthetic IDL file.
+
+  The file defines classes in inheritance chains, with constructors,
+  properties, overloaded methods, and methods taking arrays, nullable values,
+  enums, callbacks, typedef chains and classes of the previous file.
+
+  Args:
+    index: the index of the file.
+    classes: the number of classes.
+    namespace_depth: the depth of the namespaces the definitions are in.
+    inheritance_depth: the length of the inheritance chains.
+    typedef_depth: the length of the typedef chains.
+    overloads: the number of overloads of each method.
+
+  Returns:
+    the contents of the file.
+  """
+  namespaces = ['bench%d' % index] + ['level%d' % level for level in
+                                      range(1, namespace_depth)]
+  lines = []
+
+  def _Add(definition, params=(), returns=False):
+    """Adds a documented definition, with the given parameter names."""
+    indent = definition[:len(definition) - len(definition.lstrip())]
+    lines.append('%s%%[Synthetic definition.' % indent)
+    for param in params:
+      lines.append('\\param %s Synthetic parameter.' % param)
+    if returns:
+      lines.append('\\return Synthetic value.')
+    lines.append('%s%%]' % indent)
+    lines.append(definition)
+
+  for name in namespaces:
+    lines.append('namespace %s {' % name)
+  _Add('enum Mode%d { MODE_A_%d, MODE_B_%d, MODE_C_%d };' %
+       (index, index, index, index))
+  _Add('callback void Callback%d(int value, float ratio);' % index,
+       ['value', 'ratio'])
+  _Add('typedef int Int%d_0;' % index)
+  for depth in range(1, typedef_depth):
+    _Add('typedef Int%d_%d Int%d_%d;' % (index, depth - 1, index, depth))
+  typedef_name = 'Int%d_%d' % (index, max(typedef_depth - 1, 0))
+  if index > 0:
+    previous_class = '::'.join(['bench%d' % (index - 1)] + namespaces[1:] +
+                               ['Class%d_0' % (index - 1)])
+  else:
+    previous_class = None
+  for number in range(classes):
+    name = 'Class%d_%d' % (index, number)
+    if number % inheritance_depth:
+      base = ' : Class%d_%d' % (index, number - 1)
+    else:
+      base = ''
+    _Add('[binding_model=by_pointer, include="bench%d.h"] class %s%s {' %
+         (index, name, base))
+    _Add('  %s();' % name)
+    _Add('  %s(int value);' % name, ['value'])
+    _Add('  [getter, setter] int value_%d;' % number)
+    _Add('  [getter] %s typed_%d;' % (typedef_name, number))
+    for overload in range(overloads):
+      params = ['p%d' % param for param in range(overload)]
+      _Add('  float Compute%d(%s);' % (number, ', '.join(
+          ['float %s' % param for param in params])), params, True)
+    _Add('  void SetValues%d(int[] values);' % number, ['values'])
+    _Add('  %s? Next%d(%s? other);' % (name, number, name), ['other'], True)
+    _Add('  void SetMode%d(Mode%d mode);' % (number, index), ['mode'])
+    _Add('  void SetCallback%d(Callback%d handler);' % (number, index),
+         ['handler'])
+    if previous_class:
+      _Add('  %s GetPrevious%d();' % (previous_class, number), (), True)
+    lines.append('};')
+  _Add('void Free%d(Class%d_0 object);' % (index, index), ['object'])
+  for name in namespaces:
+    lines.append('}  // namespace %s' % name)
+  return '\n'.join(lines) + '\n'
+
+
+def WriteCorpus(directory, files, classes, namespace_depth, inheritance_depth,
+                typedef_depth, overloads):
+  """Writes a synthetic IDL corpus.
+
+  Args:
+    directory: the directory to write the files to.
+    files: the number of files.
+    classes: the number of classes in each file.
+    namespace_depth: see GenerateIdl.
+    inheritance_depth: see GenerateIdl.
+    typedef_depth: see GenerateIdl.
+    overloads: see GenerateIdl.
+
+  Returns:
+    a (list of file names, total size in bytes) pair.
+  """
+  filenames = []
+  size = 0
+  for index in range(files):
+    filename = os.path.join(directory, 'bench%d.idl' % index)
+    contents = GenerateIdl(index, classes, namespace_depth, inheritance_depth,
+                           typedef_depth, overloads)
+    f = open(filename, 'w')
+    try:
+      f.write(contents)
+    finally:
+      f.close()
+    filenames.append(filename)
+    size += len(contents)
+  return filenames, size
+
+
+def RunCodegen(generator, filenames, output_dir, report_filename):
+  """Runs the code generator in a new process.
+
+  Args:
+    generator: the generator to run.
+    filenames: the list of IDL files.
+    output_dir: the output directory.
+    report_filename: the name of the profiling report file.
+
+  Returns:
+    a (exit status, wall time in seconds, profiling report) tuple. The report
+    is None if the code generator failed before writing it.
+  """
+  codegen = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'codegen.py')
+  if os.path.exists(report_filename):
+    os.remove(report_filename)
+  command = [sys.executable, codegen, '--force', '--output-dir=%s' % output_dir,
+             '--generate=%s' % generator,
+             '--profile-codegen=%s' % report_filename] + filenames
+  devnull = open(os.devnull, 'w')
+  try:
+    start = time.time()
+    status = subprocess.call(command, stdout=devnull, stderr=devnull)
+    seconds = time.time() - start
+  finally:
+    devnull.close()
+  report = None
+  if os.path.exists(report_filename):
+    f = open(report_filename)
+    try:
+      report = profiler.json.load(f)
+    finally:
+      f.close()
+  return status, seconds, report
+
+
+def GetTreeRss(report):
+  """Gets the peak memory use once the syntax tree is finalized.
+
+  Args:
+    report: the profiling report of a run.
+
+  Returns:
+    the peak memory use in kilobytes, or None if it is not known.
+  """
+  if not report:
+    return None
+  tree_rss = None
+  for record in report['records']:
+    if record['phase'] in ('parse', 'finalize'):
+      tree_rss = record['max_rss_kb']
+  return tree_rss
+
+
+def GetScalingExponent(sizes, times):
+  """Fits a power law to run times.
+
+  Args:
+    sizes: the list of the input sizes.
+    times: the list of the corresponding run times.
+
+  Returns:
+    the exponent of the least squares fit of times = a * sizes ^ exponent, or
+    None if there are not enough points.
+  """
+  points = [(math.log(size), math.log(seconds)) for (size, seconds)
+            in zip(sizes, times) if size > 0 and seconds > 0]
+  if len(points) < 2:
+    return None
+  mean_x = sum([x for (x, y) in points]) / len(points)
+  mean_y = sum([y for (x, y) in points]) / len(points)
+  variance = sum([(x - mean_x) ** 2 for (x, y) in points])
+  if not variance:
+    return None
+  covariance = sum([(x - mean_x) * (y - mean_y) for (x, y) in points])
+  return covariance / variance
+
+
+def RunBenchmark(work_dir, generators, scales):
+  """Runs the benchmark.
+
+  Args:
+    work_dir: the directory for the IDL files and the outputs.
+    generators: the list of the generators to benchmark.
+    scales: the list of the multipliers of the number of files.
+
+  Returns:
+    the results, as a dictionary.
+  """
+  runs = []
+  for scale in scales:
+    corpus_dir = os.path.join(work_dir, 'scale%d' % scale)
+    if not os.path.isdir(corpus_dir):
+      os.makedirs(corpus_dir)
+    filenames, size = WriteCorpus(corpus_dir, FLAGS.files * scale,
+                                  FLAGS.classes, FLAGS['namespace-depth'].value,
+                                  FLAGS['inheritance-depth'].value,
+                                  FLAGS['typedef-depth'].value,
+                                  FLAGS.overloads)
+    for generator in generators:
+      output_dir = os.path.join(corpus_dir, generator)
+      report_filename = os.path.join(corpus_dir, generator + '.json')
+      best = None
+      for unused_repeat in range(FLAGS.repeat):
+        status, seconds, report = RunCodegen(generator, filenames, output_dir,
+                                             report_filename)
+        if best is None or seconds < best[1]:
+          best = (status, seconds, report)
+      status, seconds, report = best
+      tree_rss = GetTreeRss(report)
+      print '%-10s scale %3d: %8.3fs %8s KB tree%s' % (
+          generator, scale, seconds, tree_rss, status and ' (failed)' or '')
+      runs.append({'generator': generator,
+                   'scale': scale,
+                   'files': len(filenames),
+                   'classes': len(filenames) * FLAGS.classes,
+                   'idl_bytes': size,
+                   'status': status,
+                   'wall_seconds': seconds,
+                   'tree_rss_kb': tree_rss,
+                   'profile': report})
+  scaling = {}
+  for generator in generators:
+    generator_runs = [run for run in runs if run['generator'] == generator
+                      and run['status'] == 0]
+    scaling[generator] = GetScalingExponent(
+        [run['idl_bytes'] for run in generator_runs],
+        [run['wall_seconds'] for run in generator_runs])
+  config = {}
+  for flag in ['files', 'classes', 'namespace-depth', 'inheritance-depth',
+               'typedef-depth', 'overloads', 'repeat']:
+    config[flag] = FLAGS[flag].value
+  config['scales'] = scales
+  return {'config': config, 'runs': runs, 'scaling': scaling}
+
+
+def main(argv):
+  if len(argv) > 1:
+    print >> sys.stderr, 'Usage: %s [flags]' % argv[0]
+    sys.exit(1)
+  if profiler.json is None:
+    print >> sys.stderr, 'The benchmark needs the json module or simplejson.'
+    sys.exit(1)
+  generators = FLAGS.generators
+  scales = [int(scale) for scale in FLAGS.scales]
+  work_dir = FLAGS['work-dir'].value
+  if work_dir:
+    remove_work_dir = False
+  else:
+    work_dir = tempfile.mkdtemp()
+    remove_work_dir = True
+  try:
+    results = RunBenchmark(work_dir, generators, scales)
+  finally:
+    if remove_work_dir:
+      shutil.rmtree(work_dir)
+  for generator in generators:
+    exponent = results['scaling'][generator]
+    if exponent is None:
+      print '%-10s scaling: unknown' % generator
+    else:
+      print '%-10s scaling: size ^ %.2f' % (generator, exponent)
+  f = open(FLAGS.output, 'w')
+  try:
+    profiler.json.dump(results, f, indent=1, sort_keys=True)
+  finally:
+    f.close()
+
+
+if __name__ == '__main__':
+  main(FLAGS(sys.argv))
@@ -0,0 +1,73 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for codegen_benchmark."""
+
+import shutil
+import tempfile
+import unittest
+import codegen
+import codegen_benchmark
+import idl_parser
+import syntax_tree
+
+
+class CodegenBenchmarkUnitTest(unittest.TestCase):
+  def testCorpusIsValid(self):
+    directory = tempfile.mkdtemp()
+    try:
+      filenames, size = codegen_benchmark.WriteCorpus(directory, 3, 5, 3, 2, 3,
+                                                      2)
+      self.assertEquals(len(filenames), 3)
+      self.assert_(size > 0)
+      parser = idl_parser.Parser()
+      definitions = []
+      for filename in filenames:
+        defn_list = parser.Parse(idl_parser.File(filename))
+        self.assertEquals(parser.error_count, 0)
+        definitions += defn_list
+      namespace = syntax_tree.Namespace(None, [], '',
+                                        definitions + codegen.GetNativeTypes())
+      syntax_tree.FinalizeObjects(namespace, codegen.binding_models)
+      classes = [defn for defn in namespace.GetObjectsRecursive()
+                 if defn.defn_type == 'Class']
+      self.assertEquals(len(classes), 15)
+      self.assertEquals(classes[-1].name, 'Class2_4')
+      self.assertEquals([scope.name for scope
+                         in classes[-1].GetParentScopeStack()],
+                        ['', 'bench2', 'level1', 'level2'])
+      self.assert_(classes[-1].base_type is None)
+      self.assert_(classes[-2].base_type is classes[-3])
+    finally:
+      shutil.rmtree(directory)
+
+  def testGetScalingExponent(self):
+    self.assertAlmostEqual(codegen_benchmark.GetScalingExponent(
+        [1, 2, 4], [3.0, 6.0, 12.0]), 1.0)
+    self.assertAlmostEqual(codegen_benchmark.GetScalingExponent(
+        [1, 2, 4], [1.0, 4.0, 16.0]), 2.0)
+    self.assertEquals(codegen_benchmark.GetScalingExponent([1], [1.0]), None)
+
+  def testGetTreeRss(self):
+    report = {'records': [{'phase': 'parse', 'max_rss_kb': 10},
+                          {'phase': 'finalize', 'max_rss_kb': 20},
+                          {'phase': 'generate', 'max_rss_kb': 30}]}
+    self.assertEquals(codegen_benchmark.GetTreeRss(report), 20)
+    self.assertEquals(codegen_benchmark.GetTreeRss(None), None)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,216 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Code generator client.
+
+This is a drop-in replacement for codegen.py, that forwards its arguments to a
+code generator server (see codegen_server.py) instead of running the code
+generator itself. The server socket is given by the NIXYSA_SERVER environment
+variable. If it is not set, or the server can't be reached, the code generator
+runs in a new process as usual.
+
+To use:
+ NIXYSA_SERVER=/tmp/nixysa.sock codegen_client.py --output-dir=output-path \
+     --generate=npapi file1.idl file2.idl ...
+
+This module only depends on the standard library, so that the client starts
+quickly. It also implements the protocol between the client and the server: a
+sequence of messages, each with a one-character type, a length and a payload.
+The client sends a request message, and the server answers with output
+messages, followed by an exit message with the exit status. The payload of the
+request is plain data: the directory the code generator runs in, followed by
+its command line, separated by NUL characters (see EncodeRequest).
+"""
+
+import os
+import socket
+import struct
+import sys
+
+# Message types.
+REQUEST = 'r'
+STDOUT = 'o'
+STDERR = 'e'
+EXIT = 'x'
+
+# Message header: type and payload length.
+_header_format = '!cI'
+_header_size = struct.calcsize(_header_format)
+
+
+class ProtocolError(Exception):
+  """Raised when a message is truncated or malformed."""
+
+
+def SendMessage(sock, message_type, payload):
+  """Sends a message.
+
+  Args:
+    sock: the connected socket.
+    message_type: the message type.
+    payload: the message payload, as a string.
+  """
+  sock.sendall(struct.pack(_header_format, message_type, len(payload)) +
+               payload)
+
+
+def _Receive(sock, size):
+  """Receives exactly size bytes."""
+  chunks = []
+  while size > 0:
+    chunk = sock.recv(size)
+    if not chunk:
+      raise ProtocolError('connection closed')
+    chunks.append(chunk)
+    size -= len(chunk)
+  return ''.join(chunks)
+
+
+def ReceiveMessage(sock):
+  """Receives a message.
+
+  Args:
+    sock: the connected socket.
+
+  Returns:
+    a (message type, payload) pair.
+
+  Raises:
+    ProtocolError: the connection was closed before the end of the message.
+  """
+  message_type, size = struct.unpack(_header_format,
+                                     _Receive(sock, _header_size))
+  return message_type, _Receive(sock, size)
+
+
+def EncodeRequest(argv, cwd):
+  """Encodes the payload of a request message.
+
+  Args:
+    argv: the code generator command line.
+    cwd: the directory the code generator runs in.
+
+  Returns:
+    the payload.
+
+  Raises:
+    ValueError: an argument contains a NUL character, so it can't be encoded.
+  """
+  fields = [cwd] + list(argv)
+  for field in fields:
+    if '\0' in field:
+      raise ValueError('NUL character in %r' % field)
+  return '\0'.join(fields)
+
+
+def DecodeRequest(payload):
+  """Decodes the payload of a request message, see EncodeRequest.
+
+  Args:
+    payload: the payload.
+
+  Returns:
+    an (argv, cwd) pair.
+
+  Raises:
+    ProtocolError: the payload is not a valid request.
+  """
+  fields = payload.split('\0')
+  if len(fields) < 2 or not os.path.isabs(fields[0]) or not fields[1]:
+    raise ProtocolError('invalid request')
+  return fields[1:], fields[0]
+
+
+def Connect(socket_path):
+  """Connects to a code generator server.
+
+  Args:
+    socket_path: the path of the server socket.
+
+  Returns:
+    the connected socket, or None if the server can't be reached.
+  """
+  sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    sock.connect(socket_path)
+  except socket.error:
+    sock.close()
+    return None
+  return sock
+
+
+def RunRemote(sock, argv, cwd, stdout, stderr):
+  """Runs the code generator on a server.
+
+  Args:
+    sock: the socket connected to the server.
+    argv: the code generator command line.
+    cwd: the directory the code generator runs in.
+    stdout: the file to copy the code generator output to.
+    stderr: the file to copy the code generator error output to.
+
+  Returns:
+    the exit status of the code generator.
+
+  Raises:
+    ProtocolError: the server closed the connection before the end of the
+      run.
+  """
+  SendMessage(sock, REQUEST, EncodeRequest(argv, cwd))
+  while True:
+    message_type, payload = ReceiveMessage(sock)
+    if message_type == STDOUT:
+      stdout.write(payload)
+    elif message_type == STDERR:
+      stderr.write(payload)
+    elif message_type == EXIT:
+      stdout.flush()
+      stderr.flush()
+      return int(payload)
+
+
+def RunLocal(argv):
+  """Replaces the current process with the code generator.
+
+  Args:
+    argv: the code generator command line.
+  """
+  codegen = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'codegen.py')
+  os.execv(sys.executable, [sys.executable, codegen] + argv[1:])
+
+
+def main(argv):
+  socket_path = os.environ.get('NIXYSA_SERVER')
+  sock = None
+  if socket_path and hasattr(socket, 'AF_UNIX'):
+    sock = Connect(socket_path)
+  if sock is None:
+    RunLocal(argv)
+  try:
+    try:
+      status = RunRemote(sock, argv, os.getcwd(), sys.stdout, sys.stderr)
+    except (ProtocolError, socket.error):
+      # The server went away, e.g. to restart with new code.
+      print >> sys.stderr, 'Code generator server failed, running locally.'
+      RunLocal(argv)
+  finally:
+    sock.close()
+  sys.exit(status)
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -0,0 +1,195 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Code generator server.
+
+This server runs the code generator for the requests of codegen_client.py,
+received on a Unix domain socket. It saves the start-up time of the code
+generator: the generator and binding model modules are already imported, and
+the parser tables are already loaded.
+
+Each request runs in a process forked from the server, so requests can't
+affect each other, and run concurrently. Requests for the same output
+directory wait for each other (see codegen.LockOutputDir).
+
+Generator and binding model modules given to the server with
+--generator-module and --binding-module are loaded once, and used by the
+requests that ask for the same modules. Parse results can be shared between
+requests through the parse cache (see --parse-cache-dir).
+
+The server restarts when the code generator or one of the modules it loaded
+changes.
+
+To use:
+ codegen_server.py --socket=/tmp/nixysa.sock [--generator-module=...] &
+ NIXYSA_SERVER=/tmp/nixysa.sock codegen_client.py --output-dir=output-path \
+     --generate=npapi file1.idl file2.idl ...
+"""
+
+import os
+import SocketServer
+import sys
+import traceback
+
+import gflags
+
+import codegen
+import codegen_client
+import watch
+
+
+FLAGS = gflags.FLAGS
+gflags.DEFINE_string('socket', '', 'the path of the server socket.')
+
+
+class MessageWriter(object):
+  """File-like object sending what is written to it to the client."""
+
+  def __init__(self, sock, message_type):
+    """Inits a MessageWriter instance.
+
+    Args:
+      sock: the socket connected to the client.
+      message_type: the type of the messages, codegen_client.STDOUT or
+        codegen_client.STDERR.
+    """
+    self._sock = sock
+    self._message_type = message_type
+
+  def write(self, data):
+    if data:
+      codegen_client.SendMessage(self._sock, self._message_type, data)
+
+  def flush(self):
+    pass
+
+
+def RunRequest(sock, argv, cwd):
+  """Runs the code generator for a request.
+
+  This runs in the process forked for the request. The outputs of the code
+  generator are sent to the client.
+
+  Args:
+    sock: the socket connected to the client.
+    argv: the code generator command line.
+    cwd: the directory the code generator runs in.
+
+  Returns:
+    the exit status of the code generator.
+  """
+  sys.stdout = MessageWriter(sock, codegen_client.STDOUT)
+  sys.stderr = MessageWriter(sock, codegen_client.STDERR)
+  try:
+    os.chdir(cwd)
+    FLAGS.Reset()
+    argv = FLAGS(argv)
+    if FLAGS.watch:
+      print >> sys.stderr, 'The server doesn\'t support --watch.'
+      return 1
+    # Concurrent requests may generate files in the same directory.
+    FLAGS['exclusive-lock'].value = True
+    codegen.main(argv)
+  except gflags.FlagsError, e:
+    print >> sys.stderr, '%s\nUsage: %s ARGS\n%s' % (e, argv[0], FLAGS)
+    return 1
+  except SystemExit, e:
+    if e.code is None:
+      return 0
+    elif isinstance(e.code, int):
+      return e.code
+    print >> sys.stderr, e.code
+    return 1
+  except Exception:
+    traceback.print_exc()
+    return 1
+  return 0
+
+
+class RequestHandler(SocketServer.BaseRequestHandler):
+  """Handler for the requests of codegen_client.py."""
+
+  def handle(self):
+    message_type, payload = codegen_client.ReceiveMessage(self.request)
+    if message_type != codegen_client.REQUEST:
+      return
+    try:
+      argv, cwd = codegen_client.DecodeRequest(payload)
+    except codegen_client.ProtocolError:
+      return
+    status = RunRequest(self.request, argv, cwd)
+    codegen_client.SendMessage(self.request, codegen_client.EXIT, str(status))
+
+
+class CodegenServer(SocketServer.ForkingMixIn, SocketServer.UnixStreamServer):
+  """Code generator server class."""
+
+  def __init__(self, socket_path, module_sources):
+    """Inits a CodegenServer instance.
+
+    Args:
+      socket_path: the path of the server socket.
+      module_sources: the source files of the loaded code generator modules.
+        The server restarts when one of them changes.
+    """
+    if os.path.exists(socket_path):
+      # Left by a server that didn't shut down properly.
+      os.remove(socket_path)
+    SocketServer.UnixStreamServer.__init__(self, socket_path, RequestHandler)
+    self.socket_path = socket_path
+    self._module_stamps = watch.GetStamps(module_sources)
+
+  def process_request(self, request, client_address):
+    """Forks a process to handle a request, restarting first if needed."""
+    for path, stamp in self._module_stamps.items():
+      if watch.GetStamp(path) != stamp:
+        # The client runs the code generator itself when the connection is
+        # closed.
+        request.close()
+        self.Shutdown()
+        watch.Restart()
+    SocketServer.ForkingMixIn.process_request(self, request, client_address)
+
+  def Shutdown(self):
+    """Closes the server socket."""
+    self.server_close()
+    if os.path.exists(self.socket_path):
+      os.remove(self.socket_path)
+
+
+def main(argv):
+  if not FLAGS.socket or len(argv) > 1:
+    print >> sys.stderr, 'Usage: %s --socket=path [flags]' % argv[0]
+    sys.exit(1)
+  codegen.AddModulesFromFlags(codegen.generators,
+                              FLAGS['generator-module'].value)
+  codegen.AddModulesFromFlags(codegen.binding_models,
+                              FLAGS['binding-module'].value)
+  # Import everything before forking, so that the runs don't have to.
+  codegen.generators.LoadAll()
+  codegen.binding_models.LoadAll()
+  codegen.GetParser().Build()
+  server = CodegenServer(FLAGS.socket, codegen.GetModuleSources())
+  print 'Listening on %s.' % FLAGS.socket
+  sys.stdout.flush()
+  try:
+    server.serve_forever()
+  finally:
+    server.Shutdown()
+
+
+if __name__ == '__main__':
+  main(FLAGS(sys.argv))
@@ -0,0 +1,118 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for codegen_server and codegen_client."""
+
+import cStringIO
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import unittest
+import codegen_client
+import codegen_server
+
+
+class CodegenServerUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.socket_path = os.path.join(self.directory, 'sock')
+    self.server = codegen_server.CodegenServer(self.socket_path, [])
+    self.pid = os.fork()
+    if self.pid == 0:
+      try:
+        self.server.serve_forever()
+      finally:
+        os._exit(0)
+    self.server.server_close()
+
+  def tearDown(self):
+    os.kill(self.pid, signal.SIGTERM)
+    os.waitpid(self.pid, 0)
+    shutil.rmtree(self.directory)
+
+  def Run(self, argv):
+    """Runs the code generator on the server, returns (status, outputs)."""
+    sock = codegen_client.Connect(self.socket_path)
+    self.assert_(sock)
+    stdout = cStringIO.StringIO()
+    stderr = cStringIO.StringIO()
+    try:
+      status = codegen_client.RunRemote(sock, ['codegen.py'] + argv,
+                                        self.directory, stdout, stderr)
+    finally:
+      sock.close()
+    return status, stdout.getvalue(), stderr.getvalue()
+
+  def testMessages(self):
+    client, server = socket.socketpair()
+    try:
+      codegen_client.SendMessage(client, codegen_client.STDOUT, 'x' * 100000)
+      codegen_client.SendMessage(client, codegen_client.EXIT, '')
+      self.assertEquals(codegen_client.ReceiveMessage(server),
+                        (codegen_client.STDOUT, 'x' * 100000))
+      self.assertEquals(codegen_client.ReceiveMessage(server),
+                        (codegen_client.EXIT, ''))
+      client.close()
+      self.assertRaises(codegen_client.ProtocolError,
+                        codegen_client.ReceiveMessage, server)
+    finally:
+      server.close()
+
+  def testRequests(self):
+    argv = ['codegen.py', '--output-dir=a b', '']
+    self.assertEquals(codegen_client.DecodeRequest(
+        codegen_client.EncodeRequest(argv, '/tmp')), (argv, '/tmp'))
+    self.assertRaises(ValueError, codegen_client.EncodeRequest,
+                      ['codegen.py', 'a\0b'], '/tmp')
+    for payload in ['', '/tmp', 'tmp\0codegen.py', '/tmp\0',
+                    "(S'codegen.py'\np0\n."]:
+      self.assertRaises(codegen_client.ProtocolError,
+                        codegen_client.DecodeRequest, payload)
+    # The server closes the connection on invalid requests.
+    sock = codegen_client.Connect(self.socket_path)
+    try:
+      codegen_client.SendMessage(sock, codegen_client.REQUEST, 'codegen.py')
+      self.assertRaises(codegen_client.ProtocolError,
+                        codegen_client.ReceiveMessage, sock)
+    finally:
+      sock.close()
+
+  def testRun(self):
+    f = open(os.path.join(self.directory, 'test.idl'), 'w')
+    f.write('[binding_model=by_pointer] class A { void Go(); };\n')
+    f.close()
+    argv = ['--output-dir=glue', '--generate=header', 'test.idl']
+    status, stdout, stderr = self.Run(argv)
+    self.assertEquals((status, stderr), (0, ''))
+    self.assertEquals(stdout, 'Writing glue/test.h\n')
+    self.assert_(os.path.exists(os.path.join(self.directory, 'glue/test.h')))
+    # Flags from a request don't affect the next one.
+    status, stdout, stderr = self.Run(['--force'] + argv)
+    self.assertEquals((status, stderr), (0, ''))
+    status, stdout, stderr = self.Run(argv)
+    self.assertEquals(stdout, 'Source files haven\'t changed: nothing to'
+                      ' generate.\n')
+    status, stdout, stderr = self.Run(['--generate=unknown', 'test.idl'])
+    self.assertEquals(status, 1)
+    status, stdout, stderr = self.Run(['--unknown-flag'])
+    self.assertEquals(status, 1)
+    self.assert_(stderr.startswith('Unknown command line flag'))
+
+
+if __name__ == '__main__':
+  unittest.main()
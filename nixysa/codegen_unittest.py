@@ -0,0 +1,98 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for codegen."""
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+_nixysa_dir = os.path.dirname(os.path.abspath(__file__))
+_example_files = glob.glob(os.path.join(_nixysa_dir, '..', 'examples',
+                                        'complex', '*.idl'))
+
+# A generator module written before the jobs argument and the dependency
+# manifest: its writers have no idl_file member.
+_legacy_generator = '''
+import os
+import cpp_utils
+
+
+def ProcessFiles(output_dir, pairs, namespace):
+  file_writer = cpp_utils.CppFileWriter(os.path.join(output_dir, 'legacy.cc'),
+                                        False)
+  file_writer.EmitCode('// %d files' % len(pairs))
+  return [file_writer]
+'''
+
+
+class CodegenUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.generator_path = os.path.join(self.directory, 'legacy_generator.py')
+    f = open(self.generator_path, 'w')
+    try:
+      f.write(_legacy_generator)
+    finally:
+      f.close()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def Run(self, args):
+    process = subprocess.Popen([sys.executable,
+                                os.path.join(_nixysa_dir, 'codegen.py'),
+                                '--generator-module=legacy:%s' %
+                                self.generator_path,
+                                '--output-dir=glue'] + args + _example_files,
+                               cwd=self.directory, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+    return process.returncode, output
+
+  def Generate(self, args):
+    returncode, output = self.Run(['--generate=legacy'] + args)
+    self.assertEquals(returncode, 0, output)
+
+  def testLegacyGenerator(self):
+    legacy_path = os.path.join(self.directory, 'glue', 'legacy.cc')
+    for args in [[], ['--generate=header', '--jobs=2']]:
+      self.Generate(args)
+      f = open(legacy_path)
+      try:
+        self.assert_('// %d files' % len(_example_files) in f.read())
+      finally:
+        f.close()
+      os.remove(legacy_path)
+      # The untracked file has no manifest entry: it is written again.
+      self.Generate(args + ['--force'])
+      self.assert_(os.path.exists(legacy_path))
+
+  def testUnknownGlueRoot(self):
+    args = ['--generate=npapi', '--glue-root=NoSuchClass']
+    for unused_run in range(2):
+      returncode, output = self.Run(args)
+      self.assertNotEquals(returncode, 0)
+      self.assert_('Unknown glue root NoSuchClass.' in output, output)
+      self.assert_('Traceback' not in output, output)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -24,6 +24,10 @@ import cpp_utils
 import gflags
 import java_utils
 import naming
+import parallel
+
+files_are_independent = True
+supports_jobs = True
 
 
 class UndocumentedError(Exception):
@@ -332,12 +336,13 @@ class CPPHeaderGenerator(object):
     """
     writer = cpp_utils.CppFileWriter('%s/%s' % (self._output_dir,
                                                 idl_file.header), True)
+    writer.idl_file = idl_file
     code_section = writer.CreateSection('defns')
     self.DefinitionList(code_section, namespace, defn_list)
     return writer
 
 
-def ProcessFiles(output_dir, pairs, namespace):
+def ProcessFiles(output_dir, pairs, namespace, jobs=1):
   """Generates the headers for all input files.
 
   Args:
@@ -345,15 +350,18 @@ def ProcessFiles(output_dir, pairs, namespace):
     pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
       the list of top-level definitions in each source file.
     namespace: a syntax_tree.Namespace for the global namespace.
+    jobs: (optional) the number of processes generating the files.
 
   Returns:
-    a list of cpp_utils.CppFileWriter, one for each output header file.
+    a list of cpp_utils.CppFileWriter (or writer.RenderedFile when running in
+    parallel), one for each output header file.
   """
   generator = CPPHeaderGenerator(output_dir)
-  writer_list = []
-  for (f, defn) in pairs:
-    writer_list.append(generator.Generate(f, namespace, defn))
-  return writer_list
+
+  def _Generate(pair):
+    idl_file, defn = pair
+    return [generator.Generate(idl_file, namespace, defn)]
+  return parallel.GenerateFiles(_Generate, pairs, jobs)
 
 
 def main():
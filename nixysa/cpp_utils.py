@@ -19,8 +19,11 @@
 This module contains a few utilities for C++ code generation.
 """
 
+import cStringIO
 import re
+import memo
 import naming
+import size_report
 import writer
 
 
@@ -40,6 +43,7 @@ def GetCommonPrefixLength(list1, list2):
   return l
 
 
+@memo.Memoize
 def GetScopePrefixWithScopeOperator(scope, type_defn, scope_operator):
   """Gets the prefix string to reference a type from a given scope.
 
@@ -104,6 +108,7 @@ def GetScopePrefix(scope, type_defn):
   return GetScopePrefixWithScopeOperator(scope, type_defn, '::')
 
 
+@memo.Memoize
 def GetScopedName(scope, type_defn):
   """Gets the prefix string to reference a type from a given scope.
 
@@ -249,6 +254,11 @@ def MakeHeaderToken(filename):
   return re.sub('[^A-Z0-9_]', '_', filename.upper()) + '__'
 
 
+# Matches lines opening or closing a namespace, that don't change the
+# indentation.
+_namespace_re = re.compile(r'\bnamespace\b')
+
+
 class CppFileWriter(object):
   """C++ file writer class.
 
@@ -408,6 +418,7 @@ class CppFileWriter(object):
         code: a string containing the code to emit.
       """
       self._ValidateNamespace()
+      start = len(self._code)
       for line in code.split('\n'):
         line = line.strip('\t\r ')
         if not line:
@@ -422,8 +433,10 @@ class CppFileWriter(object):
             adjust_chars = ' '
           self._code.append(self._indent_string * (self._indent + adjust_indent)
                             + adjust_chars + line)
-        if not re.search(r'\bnamespace\b', line):
+        if 'namespace' not in line or not _namespace_re.search(line):
           self._indent += line.count('{') - line.count('}')
+      if size_report.IsEnabled():
+        size_report.AddLines(self._code[start:])
 
     def EmitTemplate(self, template):
       """Emits a template at the current position.
@@ -509,6 +522,37 @@ class CppFileWriter(object):
           lines.append(line)
       return lines
 
+    def CountLines(self):
+      """Counts the lines emitted so far, including in children sections.
+
+      The lines closing the namespaces still open are not counted.
+
+      Returns:
+        the number of lines.
+      """
+      count = 0
+      stack = [self]
+      while stack:
+        for line in stack.pop()._code:
+          if isinstance(line, CppFileWriter.Section):
+            stack.append(line)
+          else:
+            count += 1
+      return count
+
+    def GetItems(self):
+      """Gets the code of the section, for writer.WriteLines.
+
+      The open namespaces are closed first, like GetLines does.
+
+      Returns:
+        the list of the code lines and child sections.
+      """
+      self._fe_namespaces = []
+      self._need_validate = True
+      self._ValidateNamespace()
+      return self._code
+
   def __init__(self, filename, is_header, header_token=None,
                indent_string='  '):
     """Inits a CppFileWriter.
@@ -599,6 +643,23 @@ class CppFileWriter(object):
     """
     self._main_section.EmitCode(code)
 
+  def EmitSection(self, section):
+    """Emits a section at the current position in the main section.
+
+    Args:
+      section: the section to add, e.g. created by
+        CppFileWriter.Section.CreateUnlinkedSection.
+    """
+    self._main_section.EmitSection(section)
+
+  def CountLines(self):
+    """Counts the lines emitted so far in the main section.
+
+    Returns:
+      the number of lines.
+    """
+    return self._main_section.CountLines()
+
   def GetLines(self):
     """Retrieves the full contents of the file writer.
 
@@ -624,14 +685,55 @@ class CppFileWriter(object):
       lines.extend(['', '#endif  // %s' % self._header_token])
     return lines
 
+  def GetFilename(self):
+    """Gets the name of the file.
+
+    Returns:
+      the name of the file, as specified at creation time.
+    """
+    return self._filename
+
+  def WriteTo(self, stream):
+    """Writes the full contents of the file to a stream.
+
+    The contents are the same as GetContent, but they are written as they
+    are rendered.
+
+    Args:
+      stream: a file-like object.
+    """
+    write = stream.write
+    empty = True
+    if self._is_header:
+      write('#ifndef %s\n#define %s\n' % (self._header_token,
+                                          self._header_token))
+      empty = False
+    for section in [self._include_section, self._main_section]:
+      if writer.WriteLines(section, write, '\n'):
+        empty = False
+    if self._is_header:
+      write('\n#endif  // %s\n' % self._header_token)
+      empty = False
+    if empty:
+      write('\n')
+
+  def GetContent(self):
+    """Gets the full contents of the file.
+
+    Returns:
+      the contents, as a string.
+    """
+    stream = cStringIO.StringIO()
+    self.WriteTo(stream)
+    return stream.getvalue()
+
   def Write(self):
     """Writes the full contents to the file.
 
     This function writes the full contents to the file specified by the
     'filename' parameter at creation time.
     """
-    writer.WriteIfContentDifferent(self._filename,
-                                   '\n'.join(self.GetLines()) + '\n')
+    writer.WriteIfContentDifferent(self._filename, self.GetContent())
 
 
 def main():
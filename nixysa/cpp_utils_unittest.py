@@ -18,6 +18,7 @@
 
 import unittest
 import cpp_utils
+import writer
 
 template = """test1
 ${#Test}
@@ -61,6 +62,25 @@ class CppFileWriterUnitTest(unittest.TestCase):
     self.assertTrue(lines[3] == 'test4')
     self.assertTrue(lines[4] == 'test3')
 
+  def MakeHeader(self, line_count):
+    writer = cpp_utils.CppFileWriter('a.h', True)
+    writer.AddInclude('b.h')
+    section = writer.CreateSection('test')
+    section.PushNamespace('a')
+    section.EmitTemplate(template_reuse)
+    for i in range(line_count):
+      section.GetSection('Test').EmitCode('int i%d;' % i)
+    return writer
+
+  def testWriteTo(self):
+    # The lines are written by chunks: test on both sides of the chunk size.
+    for line_count in [0, 3, writer._WRITE_CHUNK_LINES * 2 + 1]:
+      content = self.MakeHeader(line_count).GetContent()
+      lines = self.MakeHeader(line_count).GetLines()
+      self.assertEquals(content, '\n'.join(lines) + '\n')
+      self.assertTrue('}  // namespace a\n' in content)
+    self.assertEquals(self.writer.GetContent(), '\n')
+
 
 if __name__ == '__main__':
   unittest.main()
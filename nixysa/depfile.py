@@ -0,0 +1,105 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Dependency file writing and reading.
+
+This module writes the dependencies of the generated files in the Makefile
+syntax understood by make, ninja (as a 'depfile') and the nixysa SCons tool:
+one rule per output file, listing all the files it was generated from.
+
+  glue/foo_glue.h: foo.idl bar.idl nixysa/codegen.py ...
+"""
+
+import re
+
+# Characters that need to be escaped in Makefile rules.
+_escape_re = re.compile(r'([ #\\])')
+
+
+def EscapePath(path):
+  """Escapes a path for a Makefile rule.
+
+  Args:
+    path: the path.
+
+  Returns:
+    the escaped path.
+  """
+  return _escape_re.sub(r'\\\1', path).replace('$', '$$')
+
+
+def FormatRule(output, inputs):
+  """Formats a Makefile rule.
+
+  Args:
+    output: the name of the output file.
+    inputs: the list of the names of the input files.
+
+  Returns:
+    the rule, as a string.
+  """
+  lines = ['%s:' % EscapePath(output)]
+  lines += [' %s' % EscapePath(path) for path in inputs]
+  return ' \\\n'.join(lines) + '\n'
+
+
+def WriteDepfile(filename, rules):
+  """Writes a dependency file.
+
+  Args:
+    filename: the name of the dependency file.
+    rules: a list of (output, input list) pairs.
+  """
+  f = open(filename, 'w')
+  try:
+    for output, inputs in rules:
+      f.write(FormatRule(output, inputs))
+  finally:
+    f.close()
+
+
+def ReadDepfile(filename):
+  """Reads a dependency file.
+
+  Args:
+    filename: the name of the dependency file.
+
+  Returns:
+    a dictionary mapping output names to lists of input names.
+  """
+  f = open(filename, 'r')
+  try:
+    contents = f.read()
+  finally:
+    f.close()
+  contents = contents.replace('\\\n', ' ').replace('$$', '$')
+  dependencies = {}
+  for line in contents.splitlines():
+    # Split on unescaped spaces.
+    words = [word.replace('\\ ', ' ').replace('\\#', '#').replace('\\\\', '\\')
+             for word in re.split(r'(?<!\\) +', line.strip()) if word]
+    if not words or not words[0].endswith(':'):
+      continue
+    dependencies[words[0][:-1]] = words[1:]
+  return dependencies
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
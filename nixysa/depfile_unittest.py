@@ -0,0 +1,45 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for depfile."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import depfile
+
+
+class DepfileUnitTest(unittest.TestCase):
+  def testFormatRule(self):
+    self.assertEquals(depfile.FormatRule('glue/a.h', ['a.idl', 'b c.idl']),
+                      'glue/a.h: \\\n a.idl \\\n b\\ c.idl\n')
+    self.assertEquals(depfile.EscapePath('$a#b'), '$$a\\#b')
+
+  def testWriteAndRead(self):
+    directory = tempfile.mkdtemp()
+    try:
+      filename = os.path.join(directory, 'deps.d')
+      rules = [('glue/a.h', ['a.idl', 'dir with spaces/b.idl', 'c$.py']),
+               ('glue/b.h', ['b.idl'])]
+      depfile.WriteDepfile(filename, rules)
+      self.assertEquals(depfile.ReadDepfile(filename), dict(rules))
+    finally:
+      shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-disk cache.
+
+This module implements a simple content cache on disk, that can be shared by
+several processes. Entries are files named after their key, that are written
+atomically. The cache size is bounded: Trim removes the least recently used
+entries until the cache fits in its maximum size.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+class DiskCache(object):
+  """On-disk cache class.
+
+  Attributes:
+    directory: the cache directory.
+    max_size: the maximum size of the cache, in bytes.
+    hits: the number of successful look-ups.
+    misses: the number of failed look-ups.
+  """
+
+  def __init__(self, directory, max_size):
+    """Inits a DiskCache instance.
+
+    Args:
+      directory: the cache directory. It is created if it doesn't exist.
+      max_size: the maximum size of the cache, in bytes.
+    """
+    self.directory = directory
+    self.max_size = max_size
+    self.hits = 0
+    self.misses = 0
+    if not os.path.isdir(directory):
+      try:
+        os.makedirs(directory)
+      except OSError:
+        # Another process may have created it in the meantime.
+        if not os.path.isdir(directory):
+          raise
+
+  def GetPath(self, key):
+    """Gets the path of the file for an entry.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+
+    Returns:
+      the path of the entry file.
+    """
+    return os.path.join(self.directory, key[:2], key)
+
+  def Get(self, key):
+    """Looks up an entry.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+
+    Returns:
+      the contents of the entry, or None if it is not in the cache.
+    """
+    path = self.GetPath(key)
+    try:
+      f = open(path, 'rb')
+      try:
+        data = f.read()
+      finally:
+        f.close()
+    except IOError:
+      self.misses += 1
+      return None
+    self.Touch(key)
+    self.hits += 1
+    return data
+
+  def Touch(self, key):
+    """Marks an entry as recently used.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+    """
+    try:
+      os.utime(self.GetPath(key), None)
+    except OSError:
+      # Removed by a concurrent Trim, it doesn't matter.
+      pass
+
+  def Put(self, key, data):
+    """Adds an entry to the cache.
+
+    The entry is written to a temporary file first, then renamed, so that
+    other processes never see partial entries.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+      data: the contents of the entry.
+    """
+    self._Add(key, lambda f: f.write(data))
+
+  def PutFile(self, key, filename):
+    """Adds an entry to the cache, with the contents of a file.
+
+    The file is copied by blocks, without reading it all in memory. See Put.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+      filename: the name of the file.
+    """
+    source = open(filename, 'rb')
+    try:
+      self._Add(key, lambda f: shutil.copyfileobj(source, f))
+    finally:
+      source.close()
+
+  def _Add(self, key, write):
+    """Adds an entry to the cache, through a temporary file.
+
+    Args:
+      key: the key of the entry, as an hexadecimal string.
+      write: the function writing the contents of the entry, called with the
+        temporary file object.
+    """
+    path = self.GetPath(key)
+    entry_dir = os.path.dirname(path)
+    if not os.path.isdir(entry_dir):
+      try:
+        os.makedirs(entry_dir)
+      except OSError:
+        if not os.path.isdir(entry_dir):
+          raise
+    fd, temp_path = tempfile.mkstemp(dir=entry_dir, prefix='.tmp')
+    f = os.fdopen(fd, 'wb')
+    try:
+      write(f)
+    finally:
+      f.close()
+    try:
+      os.rename(temp_path, path)
+    except OSError:
+      # On Windows, rename fails if the entry already exists - it was added by
+      # another process, with the same contents.
+      try:
+        os.remove(temp_path)
+      except OSError:
+        # Already gone, it doesn't matter.
+        pass
+
+  def Trim(self):
+    """Evicts the least recently used entries until the cache fits its size."""
+    entries = []
+    total_size = 0
+    for entry_dir, unused_dirs, filenames in os.walk(self.directory):
+      for filename in filenames:
+        if filename.startswith('.tmp'):
+          # Entries being written by another process.
+          continue
+        path = os.path.join(entry_dir, filename)
+        try:
+          stat = os.stat(path)
+        except OSError:
+          continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total_size += stat.st_size
+    entries.sort()
+    for unused_mtime, size, path in entries:
+      if total_size <= self.max_size:
+        break
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+      total_size -= size
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -33,6 +33,10 @@ import cpp_utils
 import java_utils
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+
 class InvalidEnumUsage(Exception):
   """Raised when an enum type is used incorrectly."""
   pass
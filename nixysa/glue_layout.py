@@ -0,0 +1,270 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Layout of the NPAPI and PPAPI glue implementation files.
+
+The glue generators write one glue header for each IDL file. The glue
+implementation can be laid out in several ways (see the --glue-layout flag):
+- 'file': one implementation file for each IDL file (foo_glue.cc).
+- 'class': the glue of each class and callback defined in a namespace goes
+  into a translation unit of its own (e.g. foo_glue_o3d_Client.cc for
+  o3d::Client), so that it compiles in parallel with the rest, and that
+  changing a class only recompiles its glue. The namespace glue and the glue
+  of the other definitions stay in foo_glue.cc. Nested classes are in the
+  translation unit of their outer class.
+- 'shards': the glue of the classes and callbacks is spread over a fixed
+  number of translation units for each IDL file (foo_glue.cc, foo_glue_1.cc,
+  ...), balanced by number of lines. The names of the generated files only
+  depend on the IDL file names.
+
+Since the glue of a class may then be compiled without the code that precedes
+it in foo_glue.cc, the code it needs from verbatim blocks must be in
+'header_glue' blocks, not in 'cpp_glue' blocks.
+
+In addition, a unity build file including all the glue implementation files
+can be generated (see the --glue-unity flag), to compile all the glue as a
+single translation unit. A header including the headers common to all the glue
+files can also be generated (see the --glue-pch flag): it is included first in
+all the glue implementation files, so that it can be compiled as a precompiled
+header, e.g. glue_pch.h.gch with GCC.
+"""
+
+import os
+import cpp_utils
+import gflags
+
+FILE = 'file'
+CLASS = 'class'
+SHARDS = 'shards'
+LAYOUTS = [FILE, CLASS, SHARDS]
+
+
+class Error(Exception):
+  """Base exception for the glue_layout module."""
+
+
+class InvalidLayoutError(Error):
+  """Raised when a layout is unknown, or has an invalid number of shards."""
+
+  def __init__(self, message):
+    Error.__init__(self, message)
+    self.message = message
+
+
+class Layout(object):
+  """The layout of the glue implementation files.
+
+  A generator creates the implementation section of each class or callback
+  with CreateSection, and gets the implementation writers of each IDL file
+  from GetWriters.
+  """
+
+  def __init__(self, mode=FILE, shards=1, unity_file='', pch_file=''):
+    """Inits a Layout.
+
+    Args:
+      mode: (optional) the layout, one of LAYOUTS. Defaults to FILE.
+      shards: (optional) the number of implementation files for each IDL file,
+        with the SHARDS layout.
+      unity_file: (optional) the name of the unity build file, relative to the
+        output directory. None is written if empty.
+      pch_file: (optional) the name of the precompiled header, relative to the
+        output directory. None is written if empty.
+
+    Raises:
+      InvalidLayoutError: the layout is unknown, or the number of shards is
+        not positive.
+    """
+    if mode not in LAYOUTS:
+      raise InvalidLayoutError('unknown glue layout %s' % mode)
+    if mode == SHARDS and shards < 1:
+      raise InvalidLayoutError('invalid number of glue shards %d' % shards)
+    self.mode = mode
+    self.shards = shards
+    self.unity_file = unity_file
+    self.pch_file = pch_file
+
+  def CreateSection(self, units, parent_section, obj, glue_namespaces):
+    """Creates the glue implementation section of a class or callback.
+
+    With the FILE layout, or for definitions that are not in a namespace, the
+    section is created in the parent section. Otherwise a translation unit is
+    created for it, and added to the units of the IDL file.
+
+    Args:
+      units: the list of the translation units of the IDL file, a list of
+        (name, section) pairs.
+      parent_section: the implementation section of the parent scope.
+      obj: the Class or Callback definition.
+      glue_namespaces: the list of the glue namespaces to open for the glue of
+        the definition, e.g. ['glue', 'namespace_o3d', 'class_Client'].
+
+    Returns:
+      the created section.
+    """
+    namespace_name = glue_namespaces[-1]
+    if self.mode == FILE or obj.parent.defn_type != 'Namespace':
+      parent_section.PushNamespace(namespace_name)
+      section = parent_section.CreateSection(namespace_name)
+      parent_section.PopNamespace()
+      return section
+    unit = parent_section.CreateUnlinkedSection(namespace_name)
+    for name in glue_namespaces:
+      unit.PushNamespace(name)
+    section = unit.CreateSection(namespace_name)
+    for name in glue_namespaces:
+      unit.PopNamespace()
+    names = [scope.name for scope in obj.GetParentScopeStack() if scope.name]
+    units.append(('_'.join(names + [obj.name]), unit))
+    return section
+
+  def GetWriters(self, cpp_writer, units, create_writer):
+    """Gets the glue implementation writers of an IDL file.
+
+    Args:
+      cpp_writer: the main implementation writer of the IDL file.
+      units: the list of the translation units created by CreateSection for
+        the IDL file.
+      create_writer: a function creating an implementation writer, given a
+        suffix for the file name.
+
+    Returns:
+      the list of the implementation writers, the main one first.
+    """
+    if self.mode == FILE:
+      return [cpp_writer]
+    elif self.mode == CLASS:
+      writer_list = [cpp_writer]
+      suffixes = set()
+      for name, unit in units:
+        suffix = name
+        index = 1
+        while suffix in suffixes:
+          index += 1
+          suffix = '%s_%d' % (name, index)
+        suffixes.add(suffix)
+        unit_writer = create_writer(suffix)
+        unit_writer.EmitSection(unit)
+        writer_list.append(unit_writer)
+      return writer_list
+    else:
+      writer_list = [cpp_writer] + [create_writer(str(index))
+                                    for index in range(1, self.shards)]
+      # Put the biggest units first into the smallest shards, then emit the
+      # units of each shard in definition order.
+      sizes = [cpp_writer.CountLines()] + [0] * (self.shards - 1)
+      unit_sizes = [(-unit.CountLines(), index)
+                    for index, (name, unit) in enumerate(units)]
+      unit_sizes.sort()
+      shard_units = [[] for shard in writer_list]
+      for size, index in unit_sizes:
+        shard = sizes.index(min(sizes))
+        sizes[shard] -= size
+        shard_units[shard].append(index)
+      for shard, indices in enumerate(shard_units):
+        for index in sorted(indices):
+          writer_list[shard].EmitSection(units[index][1])
+      return writer_list
+
+
+def SplitFilename(filename, suffix):
+  """Adds a suffix to the name of a glue implementation file.
+
+  Args:
+    filename: the name of the main implementation file, e.g. 'foo_glue.cc'.
+    suffix: the suffix, e.g. '1'.
+
+  Returns:
+    the name of the file with the suffix, e.g. 'foo_glue_1.cc'.
+  """
+  root, ext = os.path.splitext(filename)
+  return '%s_%s%s' % (root, suffix, ext)
+
+
+def CreateUnityWriter(output_dir, unity_file, writer_list, idl_file,
+                      pch_file=''):
+  """Creates the unity build file, including all the glue implementation files.
+
+  Args:
+    output_dir: the output directory.
+    unity_file: the name of the unity build file, relative to the output
+      directory.
+    writer_list: the list of the glue writers of all the IDL files.
+    idl_file: the source file to set as the idl_file member of the writer,
+      e.g. the global namespace file.
+    pch_file: (optional) the name of the precompiled header, included first.
+
+  Returns:
+    a CppFileWriter.
+  """
+  unity_writer = cpp_utils.CppFileWriter('%s/%s' % (output_dir, unity_file),
+                                         False)
+  if pch_file:
+    unity_writer.AddInclude(pch_file)
+  prefix = output_dir + '/'
+  for file_writer in writer_list:
+    filename = file_writer.GetFilename()
+    if os.path.splitext(filename)[1] != '.cc':
+      continue
+    if filename.startswith(prefix):
+      filename = filename[len(prefix):]
+    unity_writer.AddInclude(filename)
+  unity_writer.idl_file = idl_file
+  return unity_writer
+
+
+def CreatePchWriter(output_dir, pch_file, includes, idl_file):
+  """Creates the precompiled header, including the common glue headers.
+
+  Args:
+    output_dir: the output directory.
+    pch_file: the name of the precompiled header, relative to the output
+      directory.
+    includes: the list of the common headers, (name, system) pairs.
+    idl_file: the source file to set as the idl_file member of the writer,
+      e.g. the global namespace file.
+
+  Returns:
+    a CppFileWriter.
+  """
+  pch_writer = cpp_utils.CppFileWriter('%s/%s' % (output_dir, pch_file), True)
+  for include, system in includes:
+    pch_writer.AddInclude(include, system)
+  pch_writer.idl_file = idl_file
+  return pch_writer
+
+
+def GetLayout():
+  """Gets the layout given by the command-line flags.
+
+  Returns:
+    a Layout.
+
+  Raises:
+    InvalidLayoutError: the flags give an invalid layout.
+  """
+  return Layout(gflags.FLAGS['glue-layout'].value,
+                gflags.FLAGS['glue-shards'].value,
+                gflags.FLAGS['glue-unity'].value,
+                gflags.FLAGS['glue-pch'].value)
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,160 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for glue_layout."""
+
+import unittest
+import codegen
+import glue_layout
+import idl_parser
+import npapi_generator
+import syntax_tree
+
+_idl = """namespace test {
+  callback void Done(int status);
+  [binding_model=by_pointer, include="test.h"] class Buffer {
+    Buffer();
+    void SetData(int[] data);
+    [binding_model=by_pointer, include="test.h"] class Inner {
+      void Run();
+    };
+  };
+  [binding_model=by_pointer, include="test.h"] class Stream : Buffer {
+    void Read(Done done);
+  };
+  void Free();
+}
+[binding_model=by_pointer, include="test.h"] class Global {
+  void Run();
+};
+"""
+
+
+class GlueLayoutUnitTest(unittest.TestCase):
+  def Generate(self, layout, shards=1, unity_file='', pch_file=''):
+    """Generates the NPAPI glue, returns a dictionary of the contents."""
+    codegen.FLAGS['glue-layout'].value = layout
+    codegen.FLAGS['glue-shards'].value = shards
+    codegen.FLAGS['glue-unity'].value = unity_file
+    codegen.FLAGS['glue-pch'].value = pch_file
+    try:
+      idl_file = idl_parser.File('test.idl')
+      pairs = [(idl_file, idl_parser.Parser().Parse(idl_file, _idl))]
+      namespace = syntax_tree.Namespace(
+          None, [], '', pairs[0][1] + codegen.GetNativeTypes())
+      syntax_tree.FinalizeObjects(namespace, codegen.binding_models)
+      writer_list = npapi_generator.ProcessFiles('glue', pairs, namespace)
+      return dict([(w.GetFilename(), w.GetContent()) for w in writer_list])
+    finally:
+      codegen.FLAGS['glue-layout'].value = glue_layout.FILE
+      codegen.FLAGS['glue-shards'].value = 4
+      codegen.FLAGS['glue-unity'].value = ''
+      codegen.FLAGS['glue-pch'].value = ''
+
+  def GetCode(self, contents):
+    """Gets the sorted lines of code of the implementation files.
+
+    Includes and namespaces are not part of the code.
+    """
+    lines = []
+    for filename, content in contents.items():
+      if filename.endswith('.cc'):
+        lines += [line for line in content.split('\n') if line and
+                  not line.startswith('#include') and
+                  not line.startswith('namespace ') and
+                  not line.startswith('}  // namespace')]
+    lines.sort()
+    return lines
+
+  def testInvalidLayout(self):
+    self.assertRaises(glue_layout.InvalidLayoutError, glue_layout.Layout,
+                      'tree')
+    self.assertRaises(glue_layout.InvalidLayoutError, glue_layout.Layout,
+                      glue_layout.SHARDS, 0)
+
+  def testSplitFilename(self):
+    self.assertEquals(glue_layout.SplitFilename('foo_glue.cc', '1'),
+                      'foo_glue_1.cc')
+
+  def testClassLayout(self):
+    by_file = self.Generate(glue_layout.FILE)
+    by_class = self.Generate(glue_layout.CLASS)
+    # Inner is generated with Buffer, the namespace glue and the functions
+    # stay in the main file.
+    self.assertEquals(sorted(by_class.keys()),
+                      ['glue/globals_glue.cc', 'glue/globals_glue.h',
+                       'glue/test_glue.cc', 'glue/test_glue.h',
+                       'glue/test_glue_Global.cc',
+                       'glue/test_glue_test_Buffer.cc',
+                       'glue/test_glue_test_Done.cc',
+                       'glue/test_glue_test_Stream.cc'])
+    self.assertEquals(self.GetCode(by_class), self.GetCode(by_file))
+    self.assertEquals(by_class['glue/test_glue.h'], by_file['glue/test_glue.h'])
+    buffer_glue = by_class['glue/test_glue_test_Buffer.cc']
+    self.assert_('#include "test_glue.h"' in buffer_glue)
+    self.assert_('namespace glue {\nnamespace namespace_test {\n'
+                 'namespace class_Buffer {\n' in buffer_glue)
+    self.assert_('namespace class_Inner {' in buffer_glue)
+    self.assert_('SetData' in buffer_glue)
+    for name in ['Inner', 'SetData']:
+      self.assert_(name not in by_class['glue/test_glue.cc'])
+
+  def testShardsLayout(self):
+    by_file = self.Generate(glue_layout.FILE)
+    by_shards = self.Generate(glue_layout.SHARDS, 3)
+    self.assertEquals(sorted([name for name in by_shards.keys()
+                              if name.startswith('glue/test_glue')]),
+                      ['glue/test_glue.cc', 'glue/test_glue.h',
+                       'glue/test_glue_1.cc', 'glue/test_glue_2.cc'])
+    self.assertEquals(self.GetCode(by_shards), self.GetCode(by_file))
+    for name in ['glue/test_glue_1.cc', 'glue/test_glue_2.cc']:
+      self.assert_('namespace class_' in by_shards[name])
+
+  def testUnityFile(self):
+    contents = self.Generate(glue_layout.CLASS, unity_file='all_glue.cc')
+    includes = [line for line in contents['glue/all_glue.cc'].split('\n')
+                if line.startswith('#include')]
+    self.assertEquals(includes,
+                      ['#include "globals_glue.cc"', '#include "test_glue.cc"',
+                       '#include "test_glue_test_Done.cc"',
+                       '#include "test_glue_test_Buffer.cc"',
+                       '#include "test_glue_test_Stream.cc"',
+                       '#include "test_glue_Global.cc"'])
+
+  def testPch(self):
+    contents = self.Generate(glue_layout.CLASS, unity_file='all_glue.cc',
+                             pch_file='glue_pch.h')
+    pch = contents['glue/glue_pch.h']
+    self.assert_(pch.startswith('#ifndef GLUE_GLUE_PCH_H__\n'))
+    for include in ['<npapi.h>', '<npruntime.h>', '"common.h"',
+                    '"static_object.h"', '"plugin_main.h"']:
+      self.assert_('#include %s' % include in pch)
+    for filename, content in contents.items():
+      if filename.endswith('.cc'):
+        self.assert_(content.startswith('\n#include "glue_pch.h"\n'),
+                     filename)
+    # The files are otherwise the same as without the precompiled header.
+    by_file = self.Generate(glue_layout.FILE)
+    with_pch = self.Generate(glue_layout.FILE, pch_file='glue_pch.h')
+    del with_pch['glue/glue_pch.h']
+    self.assertEquals(sorted(with_pch.keys()), sorted(by_file.keys()))
+    for filename, content in with_pch.items():
+      self.assertEquals(content.replace('#include "glue_pch.h"\n', ''),
+                        by_file[filename])
+
+
+if __name__ == '__main__':
+  unittest.main()
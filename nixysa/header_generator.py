@@ -21,8 +21,12 @@ This module generates C++ header files from the parsed syntax tree.
 
 import cpp_utils
 import naming
+import parallel
 import syntax_tree
 
+files_are_independent = True
+supports_jobs = True
+
 # TODO: have these exceptions derive from a common Error.
 
 
@@ -500,6 +504,7 @@ class HeaderGenerator(object):
     self.emitted_defn = set()
     writer = cpp_utils.CppFileWriter('%s/%s' % (self._output_dir,
                                                 idl_file.header), True)
+    writer.idl_file = idl_file
 
     decl_section = writer.CreateSection('decls')
     code_section = writer.CreateSection('defns')
@@ -508,9 +513,13 @@ class HeaderGenerator(object):
 
     self.needed_decl -= self.needed_defn
     if self.needed_decl:
-      for type_defn in self.needed_decl:
-        # TODO: sort by namespace so that we don't open and close them more
-        # than necessary.
+      # Sort by namespace so that we don't open and close them more than
+      # necessary, and so that the output doesn't depend on the set order.
+      needed_decl = [([scope.name for scope in type_defn.GetParentScopeStack()],
+                      type_defn.name, type_defn)
+                     for type_defn in self.needed_decl]
+      needed_decl.sort()
+      for unused_scopes, unused_name, type_defn in needed_decl:
         ForwardDecl(decl_section, type_defn)
       decl_section.EmitCode('')
 
@@ -520,13 +529,13 @@ class HeaderGenerator(object):
     #     raise CircularDefinition(type_defn)
     includes = set(type_defn.GetDefinitionInclude()
                    for type_defn in self.needed_defn)
-    for include_file in includes:
+    for include_file in sorted(includes):
       if include_file is not None:
         writer.AddInclude(include_file)
     return writer
 
 
-def ProcessFiles(output_dir, pairs, namespace):
+def ProcessFiles(output_dir, pairs, namespace, jobs=1):
   """Generates the headers for all input files.
 
   Args:
@@ -534,15 +543,18 @@ def ProcessFiles(output_dir, pairs, namespace):
     pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
       the list of top-level definitions in each source file.
     namespace: a syntax_tree.Namespace for the global namespace.
+    jobs: (optional) the number of processes generating the files.
 
   Returns:
-    a list of cpp_utils.CppFileWriter, one for each output header file.
+    a list of cpp_utils.CppFileWriter (or writer.RenderedFile when running in
+    parallel), one for each output header file.
   """
   generator = HeaderGenerator(output_dir)
-  writer_list = []
-  for (f, defn) in pairs:
-    writer_list.append(generator.Generate(f, namespace, defn))
-  return writer_list
+
+  def _Generate(pair):
+    idl_file, defn = pair
+    return [generator.Generate(idl_file, namespace, defn)]
+  return parallel.GenerateFiles(_Generate, pairs, jobs)
 
 
 def main():
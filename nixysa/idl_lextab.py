@@ -0,0 +1,10 @@
+# idl_lextab.py. This file automatically created by PLY (version 3.0). Don't edit!
+_tabversion   = '3.0'
+_lextokens    = {'TYPEDEF': 1, 'DOCUMENTATION_OPEN': 1, 'QUALIFIER': 1, 'COMMENT_OPEN': 1, 'CALLBACK': 1, 'TEXT': 1, 'ENUM': 1, 'NAMESPACE': 1, 'NUMBER': 1, 'SIGNED': 1, 'ID': 1, 'TYPENAME': 1, 'COMMENT_CLOSE': 1, 'VERBATIM_OPEN': 1, 'STRING_CLOSE': 1, 'VERBATIM_CLOSE': 1, 'CLASS': 1, 'DOCUMENTATION_CLOSE': 1, 'STRING_OPEN': 1}
+_lexreflags   = 0
+_lexliterals  = '{}()[];:,=?'
+_lexstateinfo = {'documentation': 'exclusive', 'string': 'exclusive', 'verbatim': 'exclusive', 'INITIAL': 'inclusive', 'cppcomment': 'exclusive', 'ccomment': 'exclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_COMMENT_OPEN_C>/\\*)|(?P<t_COMMENT_OPEN_CPP>//)|(?P<t_STRING_OPEN>")|(?P<t_INITIAL_newline>\\n+)|(?P<t_ID>~?[a-zA-Z_][a-zA-Z_0-9]*)|(?P<t_VERBATIM_OPEN>%{)|(?P<t_DOCUMENTATION_OPEN>%\\[)|(?P<t_NUMBER>0x[0-9A-Fa-f]+|0[0-7]*|[1-9][0-9]*)', [None, ('t_COMMENT_OPEN_C', 'COMMENT_OPEN_C'), ('t_COMMENT_OPEN_CPP', 'COMMENT_OPEN_CPP'), ('t_STRING_OPEN', 'STRING_OPEN'), ('t_INITIAL_newline', 'newline'), ('t_ID', 'ID'), ('t_VERBATIM_OPEN', 'VERBATIM_OPEN'), ('t_DOCUMENTATION_OPEN', 'DOCUMENTATION_OPEN'), (None, 'NUMBER')])], 'string': [('(?P<t_string_STRING_CLOSE>")|(?P<t_string_TEXT>[^\\\\\\r"]+)|(?P<t_string_TEXT_ESCAPE>\\\\.)', [None, ('t_string_STRING_CLOSE', 'STRING_CLOSE'), ('t_string_TEXT', 'TEXT'), ('t_string_TEXT_ESCAPE', 'TEXT_ESCAPE')])], 'verbatim': [('(?P<t_verbatim_VERBATIM_CLOSE>%})|(?P<t_verbatim_ccomment_TEXT>[^%\\r]+|%)', [None, ('t_verbatim_VERBATIM_CLOSE', 'VERBATIM_CLOSE'), ('t_verbatim_ccomment_TEXT', 'TEXT')])], 'documentation': [('(?P<t_documentation_DOCUMENTATION_CLOSE>%\\])|(?P<t_documentation_ccomment_TEXT>[^%\\r]+|%)', [None, ('t_documentation_DOCUMENTATION_CLOSE', 'DOCUMENTATION_CLOSE'), ('t_documentation_ccomment_TEXT', 'TEXT')])], 'cppcomment': [('(?P<t_cppcomment_COMMENT_CLOSE>\\n)|(?P<t_cppcomment_TEXT>[^\\n\\r]+)', [None, ('t_cppcomment_COMMENT_CLOSE', 'COMMENT_CLOSE'), ('t_cppcomment_TEXT', 'TEXT')])], 'ccomment': [('(?P<t_ccomment_COMMENT_CLOSE>\\*/)|(?P<t_ccomment_TEXT>[^*\\r]+|\\*)|(?P<t_verbatim_ccomment_TEXT>[^%\\r]+|%)|(?P<t_documentation_ccomment_TEXT>[^%\\r]+|%)', [None, ('t_ccomment_COMMENT_CLOSE', 'COMMENT_CLOSE'), ('t_ccomment_TEXT', 'TEXT'), ('t_verbatim_ccomment_TEXT', 'TEXT'), ('t_documentation_ccomment_TEXT', 'TEXT')])]}
+_lexstateignore = {'INITIAL': ' \t\r', 'string': '\r', 'verbatim': '\r', 'documentation': '\r', 'cppcomment': '\r', 'ccomment': '\r'}
+_lexstateerrorf = {'documentation': 't_ANY_error', 'string': 't_ANY_error', 'verbatim': 't_ANY_error', 'INITIAL': 't_ANY_error', 'cppcomment': 't_ANY_error', 'ccomment': 't_ANY_error'}
+_grammar_hash = 'b32e6fcd09ef0ba9491a86746f473fa5'
@@ -18,14 +18,32 @@
 
 This is the parser module for the IdlGlue-NG code generator. It is written using
 ply (http://www.dabeaz.com/ply/).
+
+The lexer and parser tables are precomputed and shipped next to this file, in
+the idl_lextab and idl_parsetab modules. They are keyed by a hash of the grammar,
+and are only used if that hash matches the current grammar. After changing the
+grammar, regenerate them with:
+ idl_parser.py --write-tables
 """
 
-import sys
+import imp
 import os.path
+import sys
 from ply import lex
 from ply import yacc
 
+import log
 import syntax_tree
+import writer
+
+
+# names of the modules containing the precomputed lexer and parser tables.
+_lextab_module = 'idl_lextab'
+_parsetab_module = 'idl_parsetab'
+
+# cached value for GetGrammarHash, and for _LoadTables.
+_grammar_hash = None
+_tables = None
 
 
 class File(object):
@@ -63,6 +81,8 @@ class SourceLocation(object):
     line: the source line of the definition.
   """
 
+  __slots__ = ('file', 'line')
+
   def __init__(self, source_file, line):
     """Inits a SourceLocation instance.
 
@@ -84,10 +104,24 @@ class Parser(object):
   tree objects. It is written using PLY. t_* methods and members are used for
   the ply lexer to define the tokens and their regular expressions, p_* methods
   are used for the ply parser to define the grammar rules.
+
+  A Parser instance is a parsing session: the ply lexer and the LALR parser are
+  built the first time a file is parsed, and re-used for all the following
+  files. Only the per-file state (current file, line number and lexer state) is
+  reset between files.
+
+  Attributes:
+    file: the File being parsed.
+    error_count: the number of lexing and syntax errors found in that file.
   """
 
-  def __init__(self, output_dir):
-    self.output_dir = output_dir
+  def __init__(self):
+    self.file = None
+    self.error_count = 0
+    self._lexer = None
+    self._parser = None
+    self._locations = {}
+    self._attributes = {}
 
   # remove gpylint warnings regarding docstrings and naming.
   # pylint: disable-msg=C6409,C6102,C6108,C6104,C6111,C6105,C6310
@@ -193,6 +227,7 @@ class Parser(object):
     t.lexer.lineno += t.value.count('\n')
 
   def t_ANY_error(self, t):
+    self.error_count += 1
     location = self._GetLocation()
     print ("Illegal character '%s' at file %s line %d" %
            (t.value[0], location.file.source, location.line))
@@ -201,6 +236,8 @@ class Parser(object):
   def t_ID(self, t):
     r'~?[a-zA-Z_][a-zA-Z_0-9]*'
     t.type = self._reserved.get(t.value, 'ID')  # Check for reserved words
+    # Type names are repeated in every reference.
+    t.value = intern(t.value)
     return t
 
   def t_VERBATIM_OPEN(self, t):
@@ -271,13 +308,13 @@ class Parser(object):
 
   def p_attributes_opt_1(self, p):
     'attributes_opt : empty'
-    p[0] = {}
+    p[0] = self._InternAttributes([])
 
   # If we want to force documentation, this rule and the one above should not
   # exist.
   def p_attributes_opt_2(self, p):
     "attributes_opt : '[' attribute_list_opt ']'"
-    p[0] = dict(p[2])
+    p[0] = self._InternAttributes(p[2])
 
   def p_attributes_opt_3(self, p):
     "attributes_opt : documentation_value '[' attribute_list_opt ']'"
@@ -520,6 +557,7 @@ class Parser(object):
     pass
 
   def p_error(self, p):
+    self.error_count += 1
     location = self._GetLocation()
     if p is None:
       print ('%s:%d: Syntax error - unexpected end of file' %
@@ -528,11 +566,13 @@ class Parser(object):
       print ('%s:%d: Syntax error - unexpected token %s(%s)' %
              (location.file.source, location.line, p.type, p.value))
 
-  def Parse(self, idl_file):
+  def Parse(self, idl_file, input_data=None):
     """Parses an IDL file.
 
     Args:
       idl_file: the file to parse, as a File object.
+      input_data: (optional) the contents of the file, if they were already
+        read. Defaults to reading the file.
 
     Returns:
       A list of syntax_tree.Definition objects which represent all the
@@ -540,27 +580,210 @@ class Parser(object):
       'finalized', some post-processing has to be executed (see
       syntax_tree.FinalizeObjects).
     """
-    self._lexer = lex.lex(module=self)
-    # Add the output dir to the system path so that yacc finds the generated
-    # parsetab in there.
-    sys.path.insert(0, self.output_dir)
-    self._parser = yacc.yacc(module=self, outputdir=self.output_dir)
-    del sys.path[0]
-    self.file = idl_file
-    input_data = open(idl_file.source).read()
+    self.Build()
+    self._Reset(idl_file)
+    if input_data is None:
+      input_data = open(idl_file.source).read()
     return self._parser.parse(input=input_data, lexer=self._lexer)
 
+  def Build(self):
+    """Builds the lexer and parser, if they were not built yet.
+
+    Parse builds them on first use: a process that parses files later, like a
+    code generator server, can call this in advance.
+    """
+    if self._parser is None:
+      self._Build()
+
+  def _Build(self):
+    """Builds the ply lexer and parser for this session.
+
+    If the precomputed tables match the grammar, they are used directly,
+    without going through the ply grammar reflection and validation. Otherwise
+    the tables are generated in memory - they are never written to disk.
+    """
+    tables = _LoadTables()
+    if tables:
+      lextab, parsetab = tables
+      self._lexer = lex.lex(module=self, optimize=1, lextab=lextab)
+      lr_table = yacc.LRTable()
+      lr_table.read_table(parsetab)
+      lr_table.bind_callables(dict([(name, getattr(self, name)) for name
+                                    in dir(self) if name.startswith('p_')]))
+      self._parser = yacc.LRParser(lr_table, self.p_error)
+    else:
+      log.Warning('IDL parser tables are out of date, run'
+                  ' "idl_parser.py --write-tables" to regenerate them.')
+      self._lexer = lex.lex(module=self)
+      self._parser = yacc.yacc(module=self, debug=0, write_tables=0,
+                               tabmodule=_parsetab_module,
+                               errorlog=yacc.NullLogger())
+
+  def _Reset(self, idl_file):
+    """Resets the per-file state before parsing a new file.
+
+    Args:
+      idl_file: the file about to be parsed, as a File object.
+    """
+    self.file = idl_file
+    self.error_count = 0
+    self._locations = {}
+    self._attributes = {}
+    self._lexer.lineno = 1
+    self._lexer.lexstatestack = []
+    self._lexer.begin('INITIAL')
+
   def _GetLocation(self):
-    return SourceLocation(self.file, self._lexer.lineno)
+    # Definitions on the same line share their location.
+    line = self._lexer.lineno
+    try:
+      return self._locations[line]
+    except KeyError:
+      location = SourceLocation(self.file, line)
+      self._locations[line] = location
+      return location
+
+  def _InternAttributes(self, attribute_list):
+    """Gets the attributes dictionary for a list of attributes.
+
+    Definitions with the same attributes share the same dictionary within a
+    file, a read-only syntax_tree.SharedAttributes. Documented definitions have
+    their own dictionaries, since their documentation is different.
 
+    Args:
+      attribute_list: the list of (name, value) pairs.
 
-def main(filename):
-  parser = Parser('.')
-  print parser.Parse(File(filename))
+    Returns:
+      the attributes dictionary.
+    """
+    key = tuple(attribute_list)
+    try:
+      return self._attributes[key]
+    except KeyError:
+      attributes = syntax_tree.SharedAttributes(attribute_list)
+      self._attributes[key] = attributes
+      return attributes
 
 
-if __name__ == '__main__':
-  if len(sys.argv) != 2:
+def GetGrammarHash():
+  """Gets a hash of the IDL grammar.
+
+  The hash covers everything the lexer and parser tables are built from: the
+  tokens, literals and lexer states, the token rules (in definition order) and
+  the grammar rules. It doesn't depend on the code of the rule actions.
+
+  Returns:
+    the hash, as an hexadecimal string.
+  """
+  global _grammar_hash
+  if _grammar_hash is None:
+    md5_hash = writer.NewMd5()
+    md5_hash.update(repr((Parser.tokens, Parser.literals, Parser.states,
+                          sorted(Parser._reserved.items()))))
+    rules = []
+    for name in dir(Parser):
+      value = getattr(Parser, name)
+      if name.startswith('t_') or name.startswith('p_'):
+        if isinstance(value, str):
+          rules.append((0, name, value))
+        else:
+          function = value.im_func
+          rules.append((function.func_code.co_firstlineno, name,
+                        function.__doc__))
+    rules.sort()
+    for unused_line, name, rule in rules:
+      md5_hash.update('%s\0%s\0' % (name, rule))
+    _grammar_hash = md5_hash.hexdigest()
+  return _grammar_hash
+
+
+def _ImportTableModule(name):
+  """Imports a table module from the directory of this file.
+
+  Args:
+    name: the name of the module.
+
+  Returns:
+    the module, or None if it could not be imported.
+  """
+  try:
+    module_file, path, description = imp.find_module(
+        name, [os.path.dirname(os.path.abspath(__file__))])
+  except ImportError:
+    return None
+  try:
+    return imp.load_module(name, module_file, path, description)
+  finally:
+    if module_file:
+      module_file.close()
+
+
+def _LoadTables():
+  """Loads the precomputed lexer and parser tables.
+
+  Returns:
+    a (lextab, parsetab) pair of modules, or None if the tables are missing,
+    or don't match the current grammar or ply version.
+  """
+  global _tables
+  if _tables is None:
+    _tables = False
+    lextab = _ImportTableModule(_lextab_module)
+    parsetab = _ImportTableModule(_parsetab_module)
+    grammar_hash = GetGrammarHash()
+    if (lextab and parsetab and
+        getattr(lextab, '_grammar_hash', None) == grammar_hash and
+        getattr(parsetab, '_grammar_hash', None) == grammar_hash and
+        getattr(lextab, '_tabversion', None) == lex.__version__ and
+        getattr(parsetab, '_tabversion', None) == yacc.__tabversion__):
+      _tables = (lextab, parsetab)
+  return _tables
+
+
+def WriteTables(directory):
+  """Generates the precomputed lexer and parser tables.
+
+  Args:
+    directory: the directory to write the table modules into.
+  """
+  for name in [_lextab_module, _parsetab_module]:
+    # Remove the previous tables, or yacc would re-use them.
+    for extension in ['.py', '.pyc', '.pyo']:
+      filename = os.path.join(directory, name + extension)
+      if os.path.exists(filename):
+        os.remove(filename)
+    if name in sys.modules:
+      del sys.modules[name]
+  parser = Parser()
+  lexer = lex.lex(module=parser)
+  lexer.writetab(_lextab_module, directory)
+  yacc.yacc(module=parser, debug=0, tabmodule=_parsetab_module,
+            outputdir=directory)
+  for name in [_lextab_module, _parsetab_module]:
+    filename = os.path.join(directory, name + '.py')
+    f = open(filename, 'r')
+    content = f.read()
+    f.close()
+    # yacc names the table file by its full path in the header comment: keep
+    # the checked-in tables independent of the directory they were built in.
+    content = content.replace('# %s\n' % filename, '# %s.py\n' % name, 1)
+    f = open(filename, 'w')
+    f.write(content)
+    f.write('_grammar_hash = %r\n' % GetGrammarHash())
+    f.close()
+
+
+def main(argv):
+  if len(argv) != 2:
     print 'usage : idl_parser.py  inputfile'
+    print '        idl_parser.py  --write-tables'
     raise SystemExit
-  main(sys.argv[1])
+  if argv[1] == '--write-tables':
+    WriteTables(os.path.dirname(os.path.abspath(__file__)))
+  else:
+    parser = Parser()
+    print parser.Parse(File(argv[1]))
+
+
+if __name__ == '__main__':
+  main(sys.argv)
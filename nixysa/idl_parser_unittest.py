@@ -0,0 +1,97 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for idl_parser."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import idl_parser
+
+_first_idl = """namespace first {
+  class A {
+    int a;
+  };
+}
+"""
+
+# The unterminated comment leaves the lexer in the 'ccomment' state.
+_broken_idl = """
+
+class B {
+/* unterminated comment
+"""
+
+_second_idl = """
+
+class C {
+  void Method();
+};
+"""
+
+
+class ParserUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def MakeFile(self, name, contents):
+    filename = os.path.join(self.directory, name)
+    f = open(filename, 'w')
+    f.write(contents)
+    f.close()
+    return idl_parser.File(filename)
+
+  def testParse(self):
+    parser = idl_parser.Parser()
+    idl_file = self.MakeFile('first.idl', _first_idl)
+    defn_list = parser.Parse(idl_file)
+    self.assertEquals(len(defn_list), 1)
+    self.assertEquals(defn_list[0].defn_type, 'Namespace')
+    self.assertEquals(defn_list[0].name, 'first')
+    class_defn = defn_list[0].defn_list[0]
+    self.assertEquals(class_defn.name, 'A')
+    self.assertEquals(class_defn.source.file, idl_file)
+
+  def testSessionIsReused(self):
+    parser = idl_parser.Parser()
+    parser.Parse(self.MakeFile('first.idl', _first_idl))
+    lexer = parser._lexer
+    yacc_parser = parser._parser
+    parser.Parse(self.MakeFile('broken.idl', _broken_idl))
+    second_file = self.MakeFile('second.idl', _second_idl)
+    defn_list = parser.Parse(second_file)
+    self.assertTrue(parser._lexer is lexer)
+    self.assertTrue(parser._parser is yacc_parser)
+    # File and line state must have been reset for the new file: the result
+    # must be the same as with a fresh parser.
+    fresh_list = idl_parser.Parser().Parse(second_file)
+    self.assertEquals(len(defn_list), 1)
+    self.assertEquals(defn_list[0].name, 'C')
+    self.assertEquals(defn_list[0].source.file, second_file)
+    self.assertEquals(defn_list[0].source.line, fresh_list[0].source.line)
+
+  def testTablesUpToDate(self):
+    # If this fails, the grammar was changed: run
+    # 'idl_parser.py --write-tables' to regenerate the tables.
+    self.assertTrue(idl_parser._LoadTables())
+
+
+if __name__ == '__main__':
+  unittest.main()
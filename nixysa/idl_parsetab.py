@@ -0,0 +1,110 @@
+
+# idl_parsetab.py
+# This file is automatically generated. Do not edit.
+_tabversion = '3.0'
+
+_lr_method = 'LALR'
+
+_lr_signature = 671462022
+    
+_lr_action_items = {'TEXT':([5,21,24,25,28,47,55,],[-80,-80,55,-48,-80,-80,-49,]),'DOCUMENTATION_CLOSE':([5,22,24,25,55,],[23,54,-47,-48,-49,]),'NUMBER':([66,115,],[89,134,]),'COMMENT_OPEN':([0,2,4,6,7,8,10,11,14,15,16,18,19,20,51,76,77,78,80,86,100,102,114,118,121,122,123,124,125,127,128,129,130,131,132,136,139,140,141,145,],[-80,21,-43,-25,-24,-29,-26,-30,-80,-23,-28,-31,-27,-44,21,-45,-51,-46,-52,-80,-80,-50,21,-66,-53,-37,-36,-41,-38,-80,-34,-40,-42,-39,-35,-61,21,-2,-54,-55,]),'CALLBACK':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,42,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,42,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),')':([79,95,96,97,99,109,112,119,120,142,143,],[-80,-57,-58,111,-56,-80,-60,137,-59,-80,144,]),'(':([58,90,138,],[79,109,142,]),'DOCUMENTATION_OPEN':([0,1,2,4,6,7,8,10,11,14,15,16,18,19,20,51,76,77,78,80,86,100,102,106,113,114,118,121,122,123,124,125,127,128,129,130,131,132,136,139,140,141,145,],[-80,5,-21,-43,-25,-24,-29,-26,-30,-80,-23,-28,-31,-27,-44,-22,-45,-51,-46,-52,-80,-80,-50,5,5,-32,-66,-53,-37,-36,-41,-38,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),'VERBATIM_OPEN':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,28,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,28,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),',':([44,45,46,48,50,70,72,91,92,93,95,96,103,104,105,112,120,134,135,],[-80,-11,73,-16,-17,-13,-14,-15,-12,-18,110,-58,-62,-64,116,-60,-59,-65,-63,]),';':([56,58,84,111,117,133,137,144,],[77,80,102,121,136,140,141,145,]),':':([36,59,63,138,],[63,82,87,63,]),'=':([44,48,50,93,104,],[71,-16,-17,-18,115,]),'CLASS':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,31,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,31,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),'?':([26,29,33,36,37,39,41,65,67,88,107,108,138,],[-69,-72,-70,-74,-71,-73,67,-75,-79,-77,67,-78,-74,]),'$end':([0,1,2,3,4,6,7,8,10,11,14,15,16,18,19,20,51,76,77,78,80,102,118,121,136,140,141,],[-80,-1,-21,0,-43,-25,-24,-29,-26,-30,-80,-23,-28,-31,-27,-44,-22,-45,-51,-46,-52,-50,-66,-53,-61,-2,-54,]),'TYPEDEF':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,32,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,32,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),'ENUM':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,34,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,34,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),'NAMESPACE':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,102,106,118,121,136,140,141,],[-80,-80,-21,-43,-25,-24,-29,35,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-50,-80,-66,-53,-61,-2,-54,]),'STRING_CLOSE':([24,25,47,55,74,],[-47,-48,-80,-49,93,]),'VERBATIM_CLOSE':([24,25,28,55,57,],[-47,-48,-80,-49,78,]),'[':([0,1,2,4,6,7,8,10,11,14,15,16,17,18,19,20,23,26,29,33,36,37,39,41,51,54,65,67,76,77,78,80,86,88,100,102,106,107,108,113,114,118,121,122,123,124,125,127,128,129,130,131,132,136,138,139,140,141,145,],[-80,13,-21,-43,-25,-24,-29,-26,-30,-80,-23,-28,52,-31,-27,-44,-20,-69,-72,-70,-74,-71,-73,66,-22,-19,-75,-79,-45,-51,-46,-52,-80,-77,-80,-50,13,66,-78,13,-32,-66,-53,-37,-36,-41,-38,-80,-34,-40,-42,-39,-35,-61,-74,-33,-2,-54,-55,]),']':([13,43,44,45,46,48,49,50,52,66,70,72,75,89,91,92,93,],[-80,69,-80,-11,-10,-16,-9,-17,-80,88,-13,-14,94,108,-15,-12,-18,]),'ID':([0,1,2,4,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,23,26,27,29,30,31,32,33,34,35,36,37,38,39,40,41,42,51,52,54,60,64,65,67,68,69,71,73,76,77,78,79,80,82,85,86,87,88,94,98,100,102,106,107,108,109,110,113,114,116,118,121,122,123,124,125,126,127,128,129,130,131,132,136,138,139,140,141,142,145,],[-80,-80,-21,-43,-25,-24,-29,36,-26,-30,-5,48,-80,-23,-28,-8,-31,-27,-44,-20,-69,56,-72,58,59,36,-70,61,62,-74,-71,36,-73,65,-67,36,-22,48,-19,84,-68,-75,-79,90,-6,48,48,-45,-51,-46,36,-52,36,104,-80,36,-77,-7,112,-80,-50,-80,-76,-78,36,36,-80,-32,104,-66,-53,-37,-36,-41,-38,138,-80,-34,-40,-42,-39,-35,-61,-74,-33,-2,-54,36,-55,]),'STRING_OPEN':([13,52,71,73,],[47,47,47,47,]),'QUALIFIER':([0,1,2,4,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,23,32,38,42,51,52,54,69,71,73,76,77,78,79,80,82,86,94,100,102,106,109,110,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,142,145,],[-80,-80,-21,-43,-25,-24,-29,38,-26,-30,-5,50,-80,-23,-28,-8,-31,-27,-44,-20,38,38,38,-22,50,-19,-6,50,50,-45,-51,-46,38,-52,38,-80,-7,-80,-50,-80,38,38,-80,-32,-66,-53,-37,-36,-41,-38,38,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,38,-55,]),'SIGNED':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,32,38,42,51,54,69,76,77,78,79,80,82,86,87,94,100,102,106,109,110,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,142,145,],[-80,-80,-21,-43,-25,-24,-29,40,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,40,40,40,-22,-19,-6,-45,-51,-46,40,-52,40,-80,40,-7,-80,-50,-80,40,40,-80,-32,-66,-53,-37,-36,-41,-38,40,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,40,-55,]),'TYPENAME':([0,1,2,4,6,7,8,9,10,11,12,14,15,16,17,18,19,20,23,51,54,69,76,77,78,80,86,94,100,102,106,113,114,118,121,122,123,124,125,126,127,128,129,130,131,132,136,139,140,141,145,],[-80,-80,-21,-43,-25,-24,-29,27,-26,-30,-5,-80,-23,-28,-8,-31,-27,-44,-20,-22,-19,-6,-45,-51,-46,-52,-80,-7,-80,-50,-80,-80,-32,-66,-53,-37,-36,-41,-38,27,-80,-34,-40,-42,-39,-35,-61,-33,-2,-54,-55,]),'COMMENT_CLOSE':([21,24,25,53,55,],[-80,-47,-48,76,-49,]),'{':([26,29,33,36,37,39,41,59,61,62,64,65,67,81,83,88,101,107,108,],[-69,-72,-70,-74,-71,-73,-67,-80,85,86,-68,-75,-79,100,-3,-77,-4,-76,-78,]),'}':([2,4,6,7,8,10,11,14,15,16,18,19,20,51,76,77,78,80,86,100,102,103,104,105,106,113,114,118,121,122,123,124,125,127,128,129,130,131,132,134,135,136,139,140,141,145,],[-21,-43,-25,-24,-29,-26,-30,-80,-23,-28,-31,-27,-44,-22,-45,-51,-46,-52,-80,-80,-50,-62,-64,117,118,133,-32,-66,-53,-37,-36,-41,-38,-80,-34,-40,-42,-39,-35,-65,-63,-61,-33,-2,-54,-55,]),}
+
+_lr_action = { }
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = { }
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'comment':([2,51,114,139,],[20,20,20,20,]),'base_class':([59,],[81,]),'member_definition_list':([100,],[113,]),'callback_definition':([1,106,113,],[8,8,124,]),'param_list':([79,109,142,],[95,95,95,]),'text':([5,21,28,47,],[22,53,57,74,]),'variable_definition':([1,106,113,],[7,7,123,]),'param':([79,109,110,142,],[96,96,120,96,]),'param_list_opt':([79,109,142,],[97,119,143,]),'typename_definition':([1,106,113,],[6,6,122,]),'namespace_definition':([1,106,],[11,11,]),'type_reference':([9,32,38,42,79,82,87,109,110,126,142,],[41,41,41,41,41,41,107,41,41,41,41,]),'documentation_value':([1,106,113,],[17,17,17,]),'typedef_definition':([1,106,113,],[10,10,125,]),'enum_value':([85,116,],[103,135,]),'type_name':([9,32,38,42,79,82,87,109,110,126,142,],[26,26,26,26,26,26,26,26,26,26,26,]),'attribute_list':([13,52,],[46,46,]),'comments':([0,14,86,100,127,],[2,51,2,114,139,]),'attributes_opt':([1,106,113,],[9,9,126,]),'start':([0,],[3,]),'attribute':([13,52,73,],[45,45,92,]),'type':([9,32,38,42,79,82,109,110,126,142,],[30,60,64,68,98,101,98,98,30,98,]),'empty':([0,1,5,13,14,21,28,44,47,52,59,79,86,100,106,109,113,127,142,],[4,12,25,49,4,25,25,72,25,49,83,99,4,4,12,99,12,4,99,]),'member_definition':([113,],[127,]),'unsized_array_type_reference':([9,32,38,42,79,82,87,109,110,126,142,],[37,37,37,37,37,37,37,37,37,37,37,]),'scoped_type_reference':([9,32,38,42,79,82,87,109,110,126,142,],[33,33,33,33,33,33,33,33,33,33,33,]),'definition_list':([0,86,],[1,106,]),'attribute_list_opt':([13,52,],[43,75,]),'attribute_value':([44,],[70,]),'constructor_definition':([113,],[132,]),'enum_values':([85,],[105,]),'definition':([1,106,],[14,14,]),'function_definition':([1,106,113,],[15,15,128,]),'nullable_type_reference':([9,32,38,42,79,82,87,109,110,126,142,],[39,39,39,39,39,39,39,39,39,39,39,]),'text_list':([5,21,28,47,],[24,24,24,24,]),'enum_definition':([1,106,113,],[16,16,129,]),'verbatim_block':([1,106,113,],[18,18,130,]),'class_definition':([1,106,113,],[19,19,131,]),'sized_array_type_reference':([9,32,38,42,79,82,87,109,110,126,142,],[29,29,29,29,29,29,29,29,29,29,29,]),'attrid':([13,52,71,73,],[44,44,91,44,]),}
+
+_lr_goto = { }
+for _k, _v in _lr_goto_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = { }
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> start","S'",1,None,None,None),
+  ('start -> definition_list','start',1,'p_start','idl_parser.py',291),
+  ('class_definition -> attributes_opt CLASS ID base_class { member_definition_list } ;','class_definition',8,'p_class_definition','idl_parser.py',295),
+  ('base_class -> empty','base_class',1,'p_base_class_1','idl_parser.py',302),
+  ('base_class -> : type','base_class',2,'p_base_class_2','idl_parser.py',306),
+  ('attributes_opt -> empty','attributes_opt',1,'p_attributes_opt_1','idl_parser.py',310),
+  ('attributes_opt -> [ attribute_list_opt ]','attributes_opt',3,'p_attributes_opt_2','idl_parser.py',316),
+  ('attributes_opt -> documentation_value [ attribute_list_opt ]','attributes_opt',4,'p_attributes_opt_3','idl_parser.py',320),
+  ('attributes_opt -> documentation_value','attributes_opt',1,'p_attributes_opt_4','idl_parser.py',324),
+  ('attribute_list_opt -> empty','attribute_list_opt',1,'p_attribute_list_opt','idl_parser.py',328),
+  ('attribute_list_opt -> attribute_list','attribute_list_opt',1,'p_attribute_list_opt','idl_parser.py',329),
+  ('attribute_list -> attribute','attribute_list',1,'p_attribute_list_1','idl_parser.py',336),
+  ('attribute_list -> attribute_list , attribute','attribute_list',3,'p_attribute_list_2','idl_parser.py',340),
+  ('attribute -> attrid attribute_value','attribute',2,'p_attribute','idl_parser.py',344),
+  ('attribute_value -> empty','attribute_value',1,'p_attribute_value_1','idl_parser.py',348),
+  ('attribute_value -> = attrid','attribute_value',2,'p_attribute_value_2','idl_parser.py',352),
+  ('attrid -> ID','attrid',1,'p_attrid_1','idl_parser.py',356),
+  ('attrid -> QUALIFIER','attrid',1,'p_attrid_1','idl_parser.py',357),
+  ('attrid -> STRING_OPEN text STRING_CLOSE','attrid',3,'p_attrid_2','idl_parser.py',361),
+  ('documentation_value -> DOCUMENTATION_OPEN text DOCUMENTATION_CLOSE','documentation_value',3,'p_documentation_value_1','idl_parser.py',365),
+  ('documentation_value -> DOCUMENTATION_OPEN DOCUMENTATION_CLOSE','documentation_value',2,'p_documentation_value_2','idl_parser.py',369),
+  ('definition_list -> comments','definition_list',1,'p_definition_list_1','idl_parser.py',373),
+  ('definition_list -> definition_list definition comments','definition_list',3,'p_definition_list_2','idl_parser.py',377),
+  ('definition -> function_definition','definition',1,'p_definition','idl_parser.py',381),
+  ('definition -> variable_definition','definition',1,'p_definition','idl_parser.py',382),
+  ('definition -> typename_definition','definition',1,'p_definition','idl_parser.py',383),
+  ('definition -> typedef_definition','definition',1,'p_definition','idl_parser.py',384),
+  ('definition -> class_definition','definition',1,'p_definition','idl_parser.py',385),
+  ('definition -> enum_definition','definition',1,'p_definition','idl_parser.py',386),
+  ('definition -> callback_definition','definition',1,'p_definition','idl_parser.py',387),
+  ('definition -> namespace_definition','definition',1,'p_definition','idl_parser.py',388),
+  ('definition -> verbatim_block','definition',1,'p_definition','idl_parser.py',389),
+  ('member_definition_list -> comments','member_definition_list',1,'p_member_definition_list_1','idl_parser.py',393),
+  ('member_definition_list -> member_definition_list member_definition comments','member_definition_list',3,'p_member_definition_list_2','idl_parser.py',397),
+  ('member_definition -> function_definition','member_definition',1,'p_member_definition','idl_parser.py',401),
+  ('member_definition -> constructor_definition','member_definition',1,'p_member_definition','idl_parser.py',402),
+  ('member_definition -> variable_definition','member_definition',1,'p_member_definition','idl_parser.py',403),
+  ('member_definition -> typename_definition','member_definition',1,'p_member_definition','idl_parser.py',404),
+  ('member_definition -> typedef_definition','member_definition',1,'p_member_definition','idl_parser.py',405),
+  ('member_definition -> class_definition','member_definition',1,'p_member_definition','idl_parser.py',406),
+  ('member_definition -> enum_definition','member_definition',1,'p_member_definition','idl_parser.py',407),
+  ('member_definition -> callback_definition','member_definition',1,'p_member_definition','idl_parser.py',408),
+  ('member_definition -> verbatim_block','member_definition',1,'p_member_definition','idl_parser.py',409),
+  ('comments -> empty','comments',1,'p_comment_opt','idl_parser.py',413),
+  ('comments -> comments comment','comments',2,'p_comment_opt','idl_parser.py',414),
+  ('comment -> COMMENT_OPEN text COMMENT_CLOSE','comment',3,'p_comment','idl_parser.py',418),
+  ('verbatim_block -> attributes_opt VERBATIM_OPEN text VERBATIM_CLOSE','verbatim_block',4,'p_verbatim_block','idl_parser.py',422),
+  ('text -> text_list','text',1,'p_text','idl_parser.py',426),
+  ('text_list -> empty','text_list',1,'p_text_list','idl_parser.py',430),
+  ('text_list -> text_list TEXT','text_list',2,'p_text_list','idl_parser.py',431),
+  ('typedef_definition -> attributes_opt TYPEDEF type ID ;','typedef_definition',5,'p_typedef_definition','idl_parser.py',438),
+  ('typename_definition -> attributes_opt TYPENAME ID ;','typename_definition',4,'p_typename_definition','idl_parser.py',443),
+  ('variable_definition -> attributes_opt type ID ;','variable_definition',4,'p_variable_definition','idl_parser.py',447),
+  ('function_definition -> attributes_opt type ID ( param_list_opt ) ;','function_definition',7,'p_function_definition','idl_parser.py',452),
+  ('callback_definition -> attributes_opt CALLBACK type ID ( param_list_opt ) ;','callback_definition',8,'p_callback_definition','idl_parser.py',457),
+  ('constructor_definition -> attributes_opt ID ( param_list_opt ) ;','constructor_definition',6,'p_constructor_definition','idl_parser.py',462),
+  ('param_list_opt -> empty','param_list_opt',1,'p_param_list_opt_1','idl_parser.py',467),
+  ('param_list_opt -> param_list','param_list_opt',1,'p_param_list_opt_2','idl_parser.py',471),
+  ('param_list -> param','param_list',1,'p_param_list_1','idl_parser.py',475),
+  ('param_list -> param_list , param','param_list',3,'p_param_list_1','idl_parser.py',476),
+  ('param -> type ID','param',2,'p_param','idl_parser.py',483),
+  ('enum_definition -> attributes_opt ENUM ID { enum_values } ;','enum_definition',7,'p_enum_definition','idl_parser.py',487),
+  ('enum_values -> enum_value','enum_values',1,'p_enum_values','idl_parser.py',492),
+  ('enum_values -> enum_values , enum_value','enum_values',3,'p_enum_values','idl_parser.py',493),
+  ('enum_value -> ID','enum_value',1,'p_enum_value','idl_parser.py',500),
+  ('enum_value -> ID = NUMBER','enum_value',3,'p_enum_value','idl_parser.py',501),
+  ('namespace_definition -> attributes_opt NAMESPACE ID { definition_list }','namespace_definition',6,'p_namespace_definition','idl_parser.py',509),
+  ('type -> type_reference','type',1,'p_type','idl_parser.py',514),
+  ('type -> QUALIFIER type','type',2,'p_type','idl_parser.py',515),
+  ('type_reference -> type_name','type_reference',1,'p_type_reference','idl_parser.py',522),
+  ('type_reference -> scoped_type_reference','type_reference',1,'p_type_reference','idl_parser.py',523),
+  ('type_reference -> unsized_array_type_reference','type_reference',1,'p_type_reference','idl_parser.py',524),
+  ('type_reference -> sized_array_type_reference','type_reference',1,'p_type_reference','idl_parser.py',525),
+  ('type_reference -> nullable_type_reference','type_reference',1,'p_type_reference','idl_parser.py',526),
+  ('type_name -> ID','type_name',1,'p_type_name','idl_parser.py',530),
+  ('type_name -> SIGNED ID','type_name',2,'p_type_name','idl_parser.py',531),
+  ('scoped_type_reference -> ID : : type_reference','scoped_type_reference',4,'p_scoped_type_reference','idl_parser.py',539),
+  ('unsized_array_type_reference -> type_reference [ ]','unsized_array_type_reference',3,'p_unsized_array_type_reference','idl_parser.py',543),
+  ('sized_array_type_reference -> type_reference [ NUMBER ]','sized_array_type_reference',4,'p_sized_array_type_reference','idl_parser.py',547),
+  ('nullable_type_reference -> type_reference ?','nullable_type_reference',2,'p_nullable_type_reference','idl_parser.py',551),
+  ('empty -> <empty>','empty',0,'p_empty','idl_parser.py',556),
+]
+_grammar_hash = 'b32e6fcd09ef0ba9491a86746f473fa5'
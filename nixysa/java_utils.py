@@ -20,9 +20,11 @@ This module contains a few utilities for Javascripty-C++ code generation.
 """
 
 import cpp_utils
+import memo
 import naming
 
 
+@memo.Memoize
 def GetScopePrefix(scope, type_defn):
   """Gets the prefix string to reference a type from a given scope.
 
@@ -57,6 +59,7 @@ def GetScopePrefix(scope, type_defn):
   return '.'.join([s.name for s in type_stack[common_prefix:]] + [''])
 
 
+@memo.Memoize
 def GetScopedName(scope, type_defn):
   """Gets the prefix string to reference a type from a given scope.
 
@@ -26,9 +26,13 @@ import cpp_utils
 import js_utils
 import java_utils
 import naming
+import parallel
 import log
 import syntax_tree
 
+files_are_independent = True
+supports_jobs = True
+
 
 class UndocumentedError(Exception):
   """Error raised when a member is undocumented."""
@@ -257,6 +261,8 @@ class JSHeaderGenerator(object):
     func_comments = (js_utils.GetCommentsForParams(first_func)[0] +
         '\n'.join(param_comments))
 
+    # The attributes dictionary may be shared with other definitions.
+    first_func.attributes = dict(first_func.attributes)
     first_func.attributes['__docs'] = func_comments
     section = self.GetSectionFromAttributes(parent_section, first_func)
     self.Documentation(section, first_func, '')
@@ -503,12 +509,13 @@ class JSHeaderGenerator(object):
     filename = idl_file.basename + '.js'
     writer = js_utils.JavascriptFileWriter('%s/%s' % (self._output_dir,
                                                       filename), True)
+    writer.idl_file = idl_file
     code_section = writer.CreateSection('defns')
     self.DefinitionList(code_section, namespace, defn_list)
     return writer
 
 
-def ProcessFiles(output_dir, pairs, namespace):
+def ProcessFiles(output_dir, pairs, namespace, jobs=1):
   """Generates the headers for all input files.
 
   Args:
@@ -516,15 +523,18 @@ def ProcessFiles(output_dir, pairs, namespace):
     pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
       the list of top-level definitions in each source file.
     namespace: a syntax_tree.Namespace for the global namespace.
+    jobs: (optional) the number of processes generating the files.
 
   Returns:
-    a list of js_utils.JavascriptFileWriter, one for each output header file.
+    a list of js_utils.JavascriptFileWriter (or writer.RenderedFile when
+    running in parallel), one for each output header file.
   """
   generator = JSHeaderGenerator(output_dir)
-  writer_list = []
-  for (f, defn) in pairs:
-    writer_list.append(generator.Generate(f, namespace, defn))
-  return writer_list
+
+  def _Generate(pair):
+    idl_file, defn = pair
+    return [generator.Generate(idl_file, namespace, defn)]
+  return parallel.GenerateFiles(_Generate, pairs, jobs)
 
 
 def main():
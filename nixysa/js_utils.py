@@ -19,12 +19,15 @@
 This module contains a few utilities for Javascript code generation.
 """
 
+import cStringIO
 import re
 import sys
 import naming
 import gflags
 import log
+import memo
 import cpp_utils
+import size_report
 import writer
 
 
@@ -33,7 +36,7 @@ _param_re = re.compile(r'\s*\\param (\w+) (.*?)$')
 _non_id_re = re.compile(r'[^A-Z0-9_]')
 
 
-def GetScopePrefix(scope, type_defn, scope_operator):
+def GetScopePrefix(scope, type_defn, scope_operator='.'):
   """Gets the prefix string to reference a type from a given scope.
 
   This function returns a concatenation of js scope operators such as, in the
@@ -63,6 +66,7 @@ def GetScopePrefix(scope, type_defn, scope_operator):
   return cpp_utils.GetScopePrefixWithScopeOperator(scope, type_defn, '.')
 
 
+@memo.Memoize
 def GetScopedName(scope, type_defn):
   """Gets the prefix string to reference a type from a given scope.
 
@@ -92,6 +96,7 @@ def GetScopedName(scope, type_defn):
   return GetScopePrefix(scope, type_defn) + type_defn.name
 
 
+@memo.Memoize
 def GetFullyQualifiedScopePrefix(scope):
   """Gets the fully qualified scope prefix.
 
@@ -117,6 +122,7 @@ def GetFullyQualifiedTypeName(type_defn):
   return type_defn.binding_model.JSDocTypeString(type_defn)
 
 
+@memo.Memoize
 def GetFullyQualifiedTypeString(type_defn):
   """
   """
@@ -456,11 +462,14 @@ class JavascriptFileWriter(object):
         code: a string containing the code to emit.
       """
       self._ValidateNamespace()
+      start = len(self._code)
       for line in code.split('\n'):
         if not line:
           self._code.append('')
         else:
           self._code.append(line)
+      if size_report.IsEnabled():
+        size_report.AddLines(self._code[start:])
 
     def EmitTemplate(self, template):
       """Emits a template at the current position.
@@ -546,6 +555,19 @@ class JavascriptFileWriter(object):
           lines.append(line)
       return lines
 
+    def GetItems(self):
+      """Gets the code of the section, for writer.WriteLines.
+
+      The open namespaces are closed first, like GetLines does.
+
+      Returns:
+        the list of the code lines and child sections.
+      """
+      self._fe_namespaces = []
+      self._need_validate = True
+      self._ValidateNamespace()
+      return self._code
+
   def __init__(self, filename, is_header, header_token=None,
                indent_string='  '):
     """Inits a JavascriptFileWriter.
@@ -656,14 +678,48 @@ class JavascriptFileWriter(object):
       lines.extend(main_lines)
     return lines
 
+  def GetFilename(self):
+    """Gets the name of the file.
+
+    Returns:
+      the name of the file, as specified at creation time.
+    """
+    return self._filename
+
+  def WriteTo(self, stream):
+    """Writes the full contents of the file to a stream.
+
+    The contents are the same as GetContent, but they are written as they
+    are rendered.
+
+    Args:
+      stream: a file-like object.
+    """
+    write = stream.write
+    empty = True
+    for section in [self._include_section, self._main_section]:
+      if writer.WriteLines(section, write, '\n'):
+        empty = False
+    if empty:
+      write('\n')
+
+  def GetContent(self):
+    """Gets the full contents of the file.
+
+    Returns:
+      the contents, as a string.
+    """
+    stream = cStringIO.StringIO()
+    self.WriteTo(stream)
+    return stream.getvalue()
+
   def Write(self):
     """Writes the full contents to the file.
 
     This function writes the full contents to the file specified by the
     'filename' parameter at creation time.
     """
-    writer.WriteIfContentDifferent(self._filename,
-                                   '\n'.join(self.GetLines()) + '\n')
+    writer.WriteIfContentDifferent(self._filename, self.GetContent())
 
 
 def main():
@@ -55,6 +55,23 @@ def SourceWarning(source, msg):
   Warning ('%s:%d %s' % (source.file.source, source.line, msg))
 
 
+def GetCounts():
+  """Gets the number of errors and warnings printed so far.
+
+  Returns:
+    a pair (number of errors, number of warnings).
+  """
+  return _num_errors, _num_warnings
+
+
+def AddCounts(num_errors, num_warnings):
+  """Adds errors and warnings printed by another process to the counts."""
+  global _num_errors
+  global _num_warnings
+  _num_errors += num_errors
+  _num_warnings += num_warnings
+
+
 def FailIfHaveErrors():
   """Print status and exit if there were errors."""
   global _num_errors
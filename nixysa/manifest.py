@@ -0,0 +1,422 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Dependency manifest.
+
+This module implements incremental regeneration. Generated files are grouped
+in 'units': the files a generator creates for one IDL file, or for the global
+namespace. Each unit has a digest of everything it depends on:
+- the code generator itself and the flags affecting the output,
+- the generator module,
+- the IDL files it depends on: the IDL file it is generated from, and the files
+  defining the types it references (following typedefs, base classes, arrays
+  and callbacks),
+- the binding model modules of all these types.
+
+The manifest, stored in the output directory, records the digest and the
+output files of each unit. Only units whose digest changed, or whose outputs
+are missing, need to be generated again.
+
+Generators that create the glue for the global namespace have additional
+dependencies: the global namespace unit depends on every IDL file, and the
+glue for a namespace spanning several files is emitted into the unit of the
+first file defining it, so that unit depends on all the files contributing to
+that namespace.
+"""
+
+import os
+import writer
+
+
+def GetModuleSource(module):
+  """Gets the source file of a python module.
+
+  Args:
+    module: the module.
+
+  Returns:
+    the name of the source file of the module.
+  """
+  filename = module.__file__
+  if filename.endswith('.pyc') or filename.endswith('.pyo'):
+    filename = filename[:-1]
+  return filename
+
+
+def GetFileDigest(filename):
+  """Gets the digest of the contents of a file.
+
+  Args:
+    filename: the name of the file.
+
+  Returns:
+    the digest, as an hexadecimal string.
+  """
+  md5_hash = writer.NewMd5()
+  f = open(filename, 'rb')
+  try:
+    md5_hash.update(f.read())
+  finally:
+    f.close()
+  return md5_hash.hexdigest()
+
+
+def GetReferencedTypes(obj):
+  """Gets the types directly referenced by a definition.
+
+  Args:
+    obj: the syntax_tree.Definition.
+
+  Returns:
+    a list of types.
+  """
+  types = []
+  for name in ['type_defn', 'base_type', 'data_type']:
+    type_defn = getattr(obj, name, None)
+    if type_defn:
+      types.append(type_defn)
+  for param in getattr(obj, 'params', []):
+    if param.type_defn:
+      types.append(param.type_defn)
+  return types
+
+
+class DependencyTracker(object):
+  """Dependency tracker class.
+
+  This class computes the digests of the generated units, from a finalized
+  syntax tree.
+  """
+
+  def __init__(self, pairs, tool_digest, file_digests=None):
+    """Inits a DependencyTracker instance.
+
+    Args:
+      pairs: a list of (idl_parser.File, syntax_tree.Definition list)
+        describing the list of top-level definitions in each source file. The
+        definitions must have been finalized.
+      tool_digest: the digest of the code generator, and of the flags
+        affecting the outputs.
+      file_digests: (optional) the digests of the IDL files, by file name, if
+        they were already computed. The other files are read and hashed.
+    """
+    self._tool_digest = tool_digest
+    self._file_digests = {}
+    self._file_index = {}
+    self._namespace_files = {}
+    self._module_digests = {}
+    for index, (idl_file, defn_list) in enumerate(pairs):
+      if file_digests and idl_file.source in file_digests:
+        digest = file_digests[idl_file.source]
+      else:
+        digest = GetFileDigest(idl_file.source)
+      self._file_digests[idl_file.source] = digest
+      self._file_index[idl_file.source] = index
+      for obj in self._GetObjects(defn_list):
+        if obj.defn_type == 'Namespace':
+          files = self._namespace_files.setdefault(obj.scope, [])
+          if idl_file.source not in files:
+            files.append(idl_file.source)
+
+  def _GetObjects(self, defn_list):
+    """Gets all the definitions in a definition list, recursively."""
+    objects = []
+    for defn in defn_list:
+      objects.extend(defn.GetObjectsRecursive())
+    return objects
+
+  def GetModuleDigest(self, module):
+    """Gets the digest of a generator or binding model module.
+
+    Args:
+      module: the module.
+
+    Returns:
+      the digest, as an hexadecimal string.
+    """
+    return self.GetSourceDigest(GetModuleSource(module))
+
+  def GetSourceDigest(self, filename):
+    """Gets the digest of the source file of a generator or binding model.
+
+    Args:
+      filename: the name of the python source file.
+
+    Returns:
+      the digest, as an hexadecimal string.
+    """
+    try:
+      return self._module_digests[filename]
+    except KeyError:
+      digest = GetFileDigest(filename)
+      self._module_digests[filename] = digest
+      return digest
+
+  def GetDependencies(self, idl_file, defn_list, with_namespaces):
+    """Gets the IDL files and binding models the outputs of a file depend on.
+
+    Args:
+      idl_file: the idl_parser.File.
+      defn_list: the list of top-level definitions in that file.
+      with_namespaces: whether the outputs contain the glue for the namespaces
+        first defined in that file.
+
+    Returns:
+      a pair. The first element is the set of the names of the IDL files. The
+      second element is the set of the binding model modules.
+    """
+    files = set([idl_file.source])
+    binding_models = set()
+    objects = self._GetObjects(defn_list)
+    pending = []
+    for obj in objects:
+      pending.extend(GetReferencedTypes(obj))
+      if obj.binding_model:
+        binding_models.add(obj.binding_model)
+      if with_namespaces and obj.defn_type == 'Namespace':
+        namespace_files = self._namespace_files[obj.scope]
+        if namespace_files[0] == idl_file.source:
+          files.update(namespace_files)
+    visited = set()
+    while pending:
+      type_defn = pending.pop()
+      if type_defn in visited:
+        continue
+      visited.add(type_defn)
+      if type_defn.source:
+        files.add(type_defn.source.file.source)
+      if type_defn.binding_model:
+        binding_models.add(type_defn.binding_model)
+      pending.extend(GetReferencedTypes(type_defn))
+    return files, binding_models
+
+  def GetUnitDigest(self, generator, idl_file, defn_list, with_namespaces):
+    """Gets the digest of the outputs generated for an IDL file.
+
+    Args:
+      generator: the generator module.
+      idl_file: the idl_parser.File.
+      defn_list: the list of top-level definitions in that file.
+      with_namespaces: whether the outputs contain the glue for the namespaces
+        first defined in that file.
+
+    Returns:
+      the digest, as an hexadecimal string.
+    """
+    files, binding_models = self.GetDependencies(idl_file, defn_list,
+                                                 with_namespaces)
+    return self._MakeDigest(generator, files,
+                            [GetModuleSource(module) for module in
+                             binding_models])
+
+  def GetGlobalsDigest(self, generator, binding_model_sources):
+    """Gets the digest of the outputs generated for the global namespace.
+
+    The global namespace glue depends on all the IDL files, and on all the
+    binding models.
+
+    Args:
+      generator: the generator module.
+      binding_model_sources: the source files of all the binding model
+        modules, so that the modules don't need to be imported.
+
+    Returns:
+      the digest, as an hexadecimal string.
+    """
+    return self._MakeDigest(generator, self._file_digests.keys(),
+                            binding_model_sources)
+
+  def _MakeDigest(self, generator, files, binding_model_sources):
+    """Computes a unit digest from its dependencies.
+
+    Args:
+      generator: the generator module.
+      files: the names of the IDL files the unit depends on. Names of files
+        that are not IDL files (internal definitions) are ignored.
+      binding_model_sources: the source files of the binding model modules
+        the unit depends on.
+
+    Returns:
+      the digest, as an hexadecimal string.
+    """
+    md5_hash = writer.NewMd5()
+    md5_hash.update(self._tool_digest)
+    md5_hash.update(self.GetModuleDigest(generator))
+    module_digests = [self.GetSourceDigest(source) for source in
+                      binding_model_sources]
+    module_digests.sort()
+    for digest in module_digests:
+      md5_hash.update(digest)
+    # The order of the files matters (e.g. for the namespaces spanning several
+    # files), so use the command line order.
+    indexed_files = [(self._file_index[source], source) for source in files
+                     if source in self._file_index]
+    indexed_files.sort()
+    for unused_index, source in indexed_files:
+      md5_hash.update('%s\n%s\n' % (source, self._file_digests[source]))
+    return md5_hash.hexdigest()
+
+
+class Manifest(object):
+  """Manifest class.
+
+  The manifest maps units to their digest and list of output files. Units are
+  identified by a (generator name, IDL file name) pair.
+  """
+
+  def __init__(self, filename):
+    """Inits a Manifest instance.
+
+    Args:
+      filename: the name of the manifest file.
+    """
+    self._filename = filename
+    self._entries = {}
+
+  def Load(self):
+    """Loads the manifest file, if it exists.
+
+    If the file is malformed, e.g. truncated, no unit is loaded, so that all
+    the units are out of date.
+    """
+    self._entries = {}
+    try:
+      f = open(self._filename, 'r')
+    except IOError:
+      return
+    try:
+      outputs = None
+      for line in f:
+        line = line.rstrip('\n')
+        if line.startswith('\t'):
+          if outputs is None:
+            self._entries = {}
+            return
+          outputs.append(line[1:])
+        elif line:
+          fields = line.split(' ', 2)
+          if len(fields) != 3:
+            self._entries = {}
+            return
+          generator_name, digest, source = fields
+          outputs = []
+          self._entries[(generator_name, source)] = (digest, outputs)
+    finally:
+      f.close()
+
+  def Save(self):
+    """Saves the manifest file.
+
+    The file is replaced atomically, so that it is never left truncated.
+    """
+    lines = []
+    keys = self._entries.keys()
+    keys.sort()
+    for key in keys:
+      digest, outputs = self._entries[key]
+      lines.append('%s %s %s\n' % (key[0], digest, key[1]))
+      for output in outputs:
+        lines.append('\t%s\n' % output)
+    writer.WriteAtomically(self._filename, ''.join(lines))
+
+  def IsUpToDate(self, key, digest):
+    """Checks whether the outputs of a unit are up to date.
+
+    Args:
+      key: the (generator name, IDL file name) pair identifying the unit.
+      digest: the current digest of the unit.
+
+    Returns:
+      True if the unit has the same digest as when its outputs were generated,
+      and all its outputs exist.
+    """
+    try:
+      old_digest, outputs = self._entries[key]
+    except KeyError:
+      return False
+    if old_digest != digest:
+      return False
+    for output in outputs:
+      if not os.path.exists(output):
+        return False
+    return True
+
+  def HasAllOutputs(self):
+    """Checks whether all the outputs recorded in the manifest exist.
+
+    Returns:
+      True if all the outputs exist.
+    """
+    for unused_digest, outputs in self._entries.values():
+      for output in outputs:
+        if not os.path.exists(output):
+          return False
+    return True
+
+  def GetOutputs(self):
+    """Gets all the outputs recorded in the manifest.
+
+    Returns:
+      the list of the output file names.
+    """
+    outputs = []
+    for unused_digest, unit_outputs in self._entries.values():
+      outputs.extend(unit_outputs)
+    return outputs
+
+  def GetUnits(self, generator_name):
+    """Gets the units of a generator.
+
+    Args:
+      generator_name: the name of the generator.
+
+    Returns:
+      a sorted list of (IDL file name, output list) pairs.
+    """
+    units = [(key[1], outputs) for (key, (digest, outputs)) in
+             self._entries.items() if key[0] == generator_name]
+    units.sort()
+    return units
+
+  def Update(self, key, digest, outputs):
+    """Records the digest and outputs of a unit that was generated.
+
+    Args:
+      key: the (generator name, IDL file name) pair identifying the unit.
+      digest: the digest of the unit.
+      outputs: the list of output file names of the unit.
+    """
+    self._entries[key] = (digest, list(outputs))
+
+  def Prune(self, generator_name, sources):
+    """Removes the units of a generator that are no longer generated.
+
+    Args:
+      generator_name: the name of the generator.
+      sources: the names of the IDL files of the units to keep.
+    """
+    sources = set(sources)
+    for key in self._entries.keys():
+      if key[0] == generator_name and key[1] not in sources:
+        del self._entries[key]
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
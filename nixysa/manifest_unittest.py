@@ -0,0 +1,159 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for manifest."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import codegen
+import header_generator
+import idl_parser
+import manifest
+import syntax_tree
+
+_idl_files = [
+    ('a.idl', """namespace ns {
+[binding_model=by_pointer] class A {
+  int x;
+};
+}
+"""),
+    ('b.idl', """namespace ns {
+[binding_model=by_pointer] class B : A {
+  void Set(A a);
+};
+}
+"""),
+    ('c.idl', """namespace other {
+[binding_model=by_pointer] class C {
+  void Do(int a);
+};
+}
+""")]
+
+
+class ManifestUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def WriteFile(self, name, contents):
+    filename = os.path.join(self.directory, name)
+    f = open(filename, 'w')
+    f.write(contents)
+    f.close()
+    return filename
+
+  def GetDigests(self, with_namespaces, file_digests=None):
+    """Parses the test files, and gets the unit digest of each file."""
+    parser = idl_parser.Parser()
+    pairs = []
+    for name, unused_contents in _idl_files:
+      idl_file = idl_parser.File(os.path.join(self.directory, name))
+      pairs.append((idl_file, parser.Parse(idl_file)))
+    definitions = (sum([defn for (f, defn) in pairs], []) +
+                   codegen.GetNativeTypes())
+    namespace = syntax_tree.Namespace(None, [], '', definitions)
+    syntax_tree.FinalizeObjects(namespace, codegen.binding_models)
+    tracker = manifest.DependencyTracker(pairs, 'tool', file_digests)
+    digests = []
+    for idl_file, defn in pairs:
+      digests.append(tracker.GetUnitDigest(header_generator, idl_file, defn,
+                                           with_namespaces))
+    return digests
+
+  def testDependencies(self):
+    for name, contents in _idl_files:
+      self.WriteFile(name, contents)
+    old_a, old_b, old_c = self.GetDigests(False)
+    # b.idl references A, but a.idl doesn't reference B.
+    self.WriteFile('a.idl', _idl_files[0][1] + '// changed\n')
+    new_a, new_b, new_c = self.GetDigests(False)
+    self.assertNotEquals(old_a, new_a)
+    self.assertNotEquals(old_b, new_b)
+    self.assertEquals(old_c, new_c)
+    self.WriteFile('b.idl', _idl_files[1][1] + '// changed\n')
+    newer_a, newer_b, newer_c = self.GetDigests(False)
+    self.assertEquals(new_a, newer_a)
+    self.assertNotEquals(new_b, newer_b)
+    self.assertEquals(new_c, newer_c)
+
+  def testGivenFileDigests(self):
+    for name, contents in _idl_files:
+      self.WriteFile(name, contents)
+    file_digests = {}
+    for name, unused_contents in _idl_files:
+      filename = os.path.join(self.directory, name)
+      file_digests[filename] = manifest.GetFileDigest(filename)
+    self.assertEquals(self.GetDigests(False, file_digests),
+                      self.GetDigests(False))
+    # The given digests are used instead of reading the files.
+    file_digests[os.path.join(self.directory, 'c.idl')] = 'changed'
+    old_a, old_b, old_c = self.GetDigests(False)
+    new_a, new_b, new_c = self.GetDigests(False, file_digests)
+    self.assertEquals(old_a, new_a)
+    self.assertNotEquals(old_c, new_c)
+
+  def testNamespaceDependencies(self):
+    for name, contents in _idl_files:
+      self.WriteFile(name, contents)
+    old_a, old_b, old_c = self.GetDigests(True)
+    # a.idl is the first file defining the 'ns' namespace: its unit contains
+    # the glue of the whole namespace.
+    self.WriteFile('b.idl', _idl_files[1][1] + '// changed\n')
+    new_a, new_b, new_c = self.GetDigests(True)
+    self.assertNotEquals(old_a, new_a)
+    self.assertNotEquals(old_b, new_b)
+    self.assertEquals(old_c, new_c)
+
+  def testSaveAndLoad(self):
+    output = self.WriteFile('a.h', '')
+    filename = os.path.join(self.directory, 'manifest')
+    my_manifest = manifest.Manifest(filename)
+    my_manifest.Update(('header', 'a.idl'), 'digest_a', [output])
+    my_manifest.Update(('header', 'b.idl'), 'digest_b', [])
+    my_manifest.Prune('header', ['a.idl'])
+    my_manifest.Save()
+    loaded_manifest = manifest.Manifest(filename)
+    loaded_manifest.Load()
+    self.assertTrue(loaded_manifest.IsUpToDate(('header', 'a.idl'),
+                                               'digest_a'))
+    self.assertFalse(loaded_manifest.IsUpToDate(('header', 'a.idl'),
+                                                'digest_b'))
+    self.assertFalse(loaded_manifest.IsUpToDate(('header', 'b.idl'),
+                                                'digest_b'))
+    os.remove(output)
+    self.assertFalse(loaded_manifest.IsUpToDate(('header', 'a.idl'),
+                                                'digest_a'))
+    self.assertFalse(loaded_manifest.HasAllOutputs())
+
+  def testLoadMalformed(self):
+    output = self.WriteFile('a.h', '')
+    for content in ['header digest_a a.idl\n\t%s\nheader\n' % output,
+                    '\t%s\nheader digest_a a.idl\n\t%s\n' % (output, output)]:
+      filename = self.WriteFile('manifest', content)
+      my_manifest = manifest.Manifest(filename)
+      my_manifest.Load()
+      self.assertFalse(my_manifest.IsUpToDate(('header', 'a.idl'),
+                                              'digest_a'))
+
+
+if __name__ == '__main__':
+  unittest.main()
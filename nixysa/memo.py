@@ -0,0 +1,136 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memoization of the names derived from the syntax tree.
+
+The generators compute the same strings (scoped names, glue namespaces, split
+identifiers...) many times for the same definitions. Functions wrapped with
+Memoize keep their results until Reset is called, which the code generator
+does at the start of each run, since the definitions change in watch mode.
+The caches are shared by all the generators running in the same process.
+
+Results are keyed by the value of string and number arguments, and by the
+identity of the other arguments (definitions, functions). The cache keeps a
+reference to the arguments, so that their identity is not reused by another
+object while the result is cached. The memoized functions must not depend on
+anything else than their arguments, and the definitions must not be modified
+once they are passed to them.
+
+Each memoized function counts its hits and misses, see GetStats.
+"""
+
+_caches = []
+_value_types = (basestring, int, long, float, bool, type(None))
+
+
+class _Cache(object):
+  """The results and statistics of a memoized function.
+
+  Attributes:
+    name: the name of the function, e.g. 'cpp_utils.GetScopedName'.
+    values: a dictionary mapping argument keys to (arguments, result) pairs.
+    hits: the number of calls that found their result in the cache.
+    misses: the number of calls that computed their result.
+  """
+
+  def __init__(self, name):
+    """Inits a _Cache instance.
+
+    Args:
+      name: the name of the function.
+    """
+    self.name = name
+    self.values = {}
+    self.hits = 0
+    self.misses = 0
+
+
+def _GetKey(args):
+  """Gets the cache key for function arguments."""
+  key = []
+  for arg in args:
+    if isinstance(arg, _value_types):
+      key.append(arg)
+    else:
+      key.append(id(arg))
+  return tuple(key)
+
+
+def Memoize(function):
+  """Memoizes a function.
+
+  Args:
+    function: the function to memoize. It must only take positional
+      arguments.
+
+  Returns:
+    the memoized function.
+  """
+  cache = _Cache('%s.%s' % (function.__module__, function.__name__))
+  _caches.append(cache)
+
+  def _Memoized(*args):
+    key = _GetKey(args)
+    try:
+      result = cache.values[key][1]
+    except KeyError:
+      cache.misses += 1
+      result = function(*args)
+      cache.values[key] = (args, result)
+      return result
+    cache.hits += 1
+    return result
+  _Memoized.__name__ = function.__name__
+  _Memoized.__doc__ = function.__doc__
+  return _Memoized
+
+
+def Reset():
+  """Removes all the cached results, and resets the statistics."""
+  for cache in _caches:
+    cache.values = {}
+  ResetStats()
+
+
+def ResetStats():
+  """Resets the statistics, keeping the cached results."""
+  for cache in _caches:
+    cache.hits = 0
+    cache.misses = 0
+
+
+def GetStats():
+  """Gets the statistics of the memoized functions used since ResetStats.
+
+  Returns:
+    a dictionary mapping function names to dictionaries with hits, misses and
+    hit_rate members.
+  """
+  stats = {}
+  for cache in _caches:
+    calls = cache.hits + cache.misses
+    if calls:
+      stats[cache.name] = {'hits': cache.hits, 'misses': cache.misses,
+                           'hit_rate': float(cache.hits) / calls}
+  return stats
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for memo."""
+
+import unittest
+import memo
+import naming
+
+
+_calls = []
+_DESCRIBE_NAME = '%s._Describe' % __name__
+
+
+@memo.Memoize
+def _Describe(obj, suffix):
+  _calls.append((obj, suffix))
+  return '%s%s' % (obj.name, suffix)
+
+
+class _Named(object):
+  def __init__(self, name):
+    self.name = name
+
+
+class MemoUnitTest(unittest.TestCase):
+  def setUp(self):
+    memo.Reset()
+    _calls[:] = []
+
+  def testMemoize(self):
+    obj1 = _Named('a')
+    obj2 = _Named('a')
+    self.assertEquals(_Describe(obj1, '!'), 'a!')
+    self.assertEquals(_Describe(obj1, '!'), 'a!')
+    self.assertEquals(_Describe(obj1, '?'), 'a?')
+    # Keyed by identity, not by value.
+    self.assertEquals(_Describe(obj2, '!'), 'a!')
+    self.assertEquals(_calls, [(obj1, '!'), (obj1, '?'), (obj2, '!')])
+    stats = memo.GetStats()[_DESCRIBE_NAME]
+    self.assertEquals((stats['hits'], stats['misses']), (1, 3))
+    self.assertEquals(stats['hit_rate'], 0.25)
+
+  def testReset(self):
+    obj = _Named('a')
+    _Describe(obj, '!')
+    memo.ResetStats()
+    self.assertEquals(memo.GetStats(), {})
+    _Describe(obj, '!')
+    self.assertEquals(len(_calls), 1)
+    self.assertEquals(memo.GetStats()[_DESCRIBE_NAME]['hits'], 1)
+    memo.Reset()
+    obj.name = 'b'
+    self.assertEquals(_Describe(obj, '!'), 'b!')
+    self.assertEquals(len(_calls), 2)
+
+  def testSplitWordsCopies(self):
+    words = naming.SplitWords('FooBar')
+    words.append('baz')
+    self.assertEquals(naming.SplitWords('FooBar'), ['foo', 'bar'])
+
+
+if __name__ == '__main__':
+  unittest.main()
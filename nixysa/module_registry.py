@@ -0,0 +1,262 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of generator and binding model modules.
+
+The code generator knows about all the generators and binding models, but a
+run only uses the generators selected with --generate, and the binding models
+referenced by the types in the IDL files. A ModuleRegistry maps names to
+modules, and only imports a module the first time it is looked up, so that
+short runs don't pay for importing modules they don't use.
+
+Modules given by path (--generator-module, --binding-module) are loaded like
+imp.load_source would. Since the directory of these modules may not be
+writable, their compiled bytecode can be kept in a disk_cache.DiskCache
+instead of next to the source.
+"""
+
+import imp
+import marshal
+import os
+import sys
+
+import writer
+
+
+def _GetSourceFile(filename):
+  """Gets the source file from the name of a python file."""
+  if filename.endswith('.pyc') or filename.endswith('.pyo'):
+    filename = filename[:-1]
+  return filename
+
+
+class ModuleRegistry(object):
+  """Module registry class.
+
+  The registry behaves like a read-only dictionary mapping names to modules,
+  e.g. registry['pod'] imports pod_binding if needed and returns it. Looking
+  up all the values imports all the modules: prefer GetSources when only the
+  source files are needed.
+
+  Attributes:
+    bytecode_cache: the disk_cache.DiskCache holding the bytecode of the
+      modules loaded from a path, or None.
+  """
+
+  def __init__(self, module_names, bytecode_cache=None):
+    """Inits a ModuleRegistry instance.
+
+    Args:
+      module_names: a dictionary mapping names to the python names of the
+        modules to import, e.g. {'pod': 'pod_binding'}.
+      bytecode_cache: the disk_cache.DiskCache to keep the bytecode of the
+        modules loaded from a path in, or None.
+    """
+    self.bytecode_cache = bytecode_cache
+    # name -> (python module name, source file or None)
+    self._entries = {}
+    # name -> module, for the modules already imported.
+    self._modules = {}
+    for name, module_name in module_names.items():
+      self._entries[name] = (module_name, None)
+
+  def Register(self, name, module_name):
+    """Registers a module importable by name, replacing any previous one.
+
+    Args:
+      name: the generator or binding model name.
+      module_name: the python name of the module.
+    """
+    self._entries[name] = (module_name, None)
+    self._modules.pop(name, None)
+
+  def AddSource(self, name, path):
+    """Registers a module given by its source file.
+
+    If the same source file is already registered, the module already loaded
+    is kept.
+
+    Args:
+      name: the generator or binding model name.
+      path: the path of the python source file.
+
+    Raises:
+      IOError: the source file doesn't exist.
+    """
+    if name in self._entries and (os.path.abspath(path) ==
+                                  os.path.abspath(self.GetSource(name))):
+      return
+    if not os.path.isfile(path):
+      raise IOError('No such file: %s' % path)
+    self._entries[name] = (name, path)
+    self._modules.pop(name, None)
+
+  def __contains__(self, name):
+    return name in self._entries
+
+  def has_key(self, name):
+    return name in self._entries
+
+  def keys(self):
+    return self._entries.keys()
+
+  def __getitem__(self, name):
+    """Gets a module, importing it if needed.
+
+    Args:
+      name: the generator or binding model name.
+
+    Returns:
+      the module.
+
+    Raises:
+      KeyError: no module is registered with that name.
+    """
+    try:
+      return self._modules[name]
+    except KeyError:
+      module_name, path = self._entries[name]
+      if path is None:
+        module = __import__(module_name)
+      else:
+        module = self._LoadSource(module_name, path)
+      self._modules[name] = module
+      return module
+
+  def get(self, name, default=None):
+    if name in self._entries:
+      return self[name]
+    return default
+
+  def values(self):
+    """Gets all the modules, importing them if needed."""
+    return [self[name] for name in self._entries]
+
+  def items(self):
+    """Gets all the (name, module) pairs, importing the modules if needed."""
+    return [(name, self[name]) for name in self._entries]
+
+  def LoadAll(self):
+    """Imports all the registered modules."""
+    self.values()
+
+  def GetLoadedModules(self):
+    """Gets the modules imported so far.
+
+    Returns:
+      a dictionary mapping names to modules.
+    """
+    return self._modules.copy()
+
+  def GetSource(self, name):
+    """Gets the source file of a module, without importing it.
+
+    Args:
+      name: the generator or binding model name.
+
+    Returns:
+      the name of the python source file.
+
+    Raises:
+      KeyError: no module is registered with that name.
+      ImportError: the module can't be found.
+    """
+    module_name, path = self._entries[name]
+    if path is not None:
+      return path
+    module = self._modules.get(name, sys.modules.get(module_name))
+    if module is not None:
+      return _GetSourceFile(module.__file__)
+    unused_file, filename, unused_description = imp.find_module(module_name)
+    if unused_file:
+      unused_file.close()
+    return _GetSourceFile(filename)
+
+  def GetSources(self):
+    """Gets the source files of all the registered modules.
+
+    Returns:
+      the list of the names of the python source files, sorted by module
+      name.
+    """
+    names = self._entries.keys()
+    names.sort()
+    return [self.GetSource(name) for name in names]
+
+  def _GetBytecodeKey(self, path, source):
+    """Gets the bytecode cache key for a source file.
+
+    Args:
+      path: the path of the source file, which the code objects refer to.
+      source: the contents of the source file.
+
+    Returns:
+      the cache key.
+    """
+    md5_hash = writer.NewMd5()
+    md5_hash.update(imp.get_magic())
+    md5_hash.update('%s\n' % path)
+    md5_hash.update(source)
+    return md5_hash.hexdigest()
+
+  def _LoadSource(self, module_name, path):
+    """Loads a module from its source file, like imp.load_source.
+
+    Args:
+      module_name: the python name of the module.
+      path: the path of the python source file.
+
+    Returns:
+      the module.
+    """
+    if self.bytecode_cache is None:
+      return imp.load_source(module_name, path)
+    f = open(path, 'rU')
+    try:
+      source = f.read()
+    finally:
+      f.close()
+    key = self._GetBytecodeKey(path, source)
+    code = None
+    data = self.bytecode_cache.Get(key)
+    if data is not None:
+      try:
+        code = marshal.loads(data)
+      except (EOFError, ValueError, TypeError):
+        # A corrupted entry: compile the module again, and overwrite it.
+        pass
+    if code is None:
+      if not source.endswith('\n'):
+        source += '\n'
+      code = compile(source, path, 'exec')
+      self.bytecode_cache.Put(key, marshal.dumps(code))
+    module = imp.new_module(module_name)
+    module.__file__ = path
+    sys.modules[module_name] = module
+    try:
+      exec code in module.__dict__
+    except:
+      del sys.modules[module_name]
+      raise
+    return module
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for module_registry."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import disk_cache
+import module_registry
+
+
+class ModuleRegistryUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.module_path = os.path.join(self.directory, 'test_module.py')
+    f = open(self.module_path, 'w')
+    try:
+      f.write('value = 42')
+    finally:
+      f.close()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+    sys.modules.pop('test_module', None)
+
+  def testLazyImport(self):
+    registry = module_registry.ModuleRegistry({'pod': 'pod_binding'})
+    registry.AddSource('test_module', self.module_path)
+    self.assert_('test_module' in registry)
+    self.assertEquals(registry.GetSource('test_module'), self.module_path)
+    self.assertEquals(registry.GetLoadedModules(), {})
+    self.assertEquals(registry['test_module'].value, 42)
+    self.assertEquals(registry.GetLoadedModules().keys(), ['test_module'])
+    self.assertEquals(os.path.basename(registry.GetSource('pod')),
+                      'pod_binding.py')
+    self.assertRaises(KeyError, registry.__getitem__, 'none')
+    self.assertRaises(IOError, registry.AddSource, 'bad',
+                      os.path.join(self.directory, 'none.py'))
+
+  def testAddSameSource(self):
+    registry = module_registry.ModuleRegistry({})
+    registry.AddSource('test_module', self.module_path)
+    module = registry['test_module']
+    registry.AddSource('test_module', self.module_path)
+    self.assert_(registry['test_module'] is module)
+
+  def testBytecodeCache(self):
+    cache = disk_cache.DiskCache(os.path.join(self.directory, 'cache'),
+                                 1024 * 1024)
+    for unused_index in range(2):
+      registry = module_registry.ModuleRegistry({}, cache)
+      registry.AddSource('test_module', self.module_path)
+      self.assertEquals(registry['test_module'].value, 42)
+      self.assertEquals(registry['test_module'].__file__, self.module_path)
+    self.assertEquals((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+  unittest.main()
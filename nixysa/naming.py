@@ -42,6 +42,7 @@ print naming.Capitalized(words)
 """
 
 import re
+import memo
 
 
 def Upper(words):
@@ -113,9 +114,15 @@ def SplitWords(input_string):
   Returns:
     a list of lower-case words.
   """
+  return list(_SplitWords(input_string))
+
+
+@memo.Memoize
+def _SplitWords(input_string):
+  """Implementation of SplitWords, returning a tuple to share in the cache."""
   if input_string.find('_') > -1:
     # 'some_TEXT_' -> 'some text'
-    return input_string.replace('_', ' ').strip().lower().split()
+    return tuple(input_string.replace('_', ' ').strip().lower().split())
   else:
     if re.search('[A-Z]', input_string) and re.search('[a-z]', input_string):
       # mixed case.
@@ -124,9 +131,10 @@ def SplitWords(input_string):
       input_string = re.sub('([A-Z])', r' \1', input_string).strip()
       # 'Vector3' -> 'Vector 3'
       input_string = re.sub('([^0-9])([0-9])', r'\1 \2', input_string)
-    return input_string.lower().split()
+    return tuple(input_string.lower().split())
 
 
+@memo.Memoize
 def Normalize(input_string, func):
   """Normalizes an identifier into a particular case.
 
@@ -139,7 +147,7 @@ def Normalize(input_string, func):
   Returns:
     the normalized identifier.
   """
-  return func(SplitWords(input_string))
+  return func(list(_SplitWords(input_string)))
 
 
 def main():
@@ -20,6 +20,7 @@ This module contains a few utilities to help with NPAPI glue generation.
 """
 
 import string
+import memo
 import naming
 
 
@@ -29,18 +30,22 @@ enum {
 };
 
 static NPIdentifier ${table}_ids[NUM_${TABLE}_IDS];
+static NPIdentifier ${table}_sorted_ids[NUM_${TABLE}_IDS];
 static const NPUTF8 *${table}_names[NUM_${TABLE}_IDS] = {
   ${NAMES}
 };""")
 
 _id_init_template = string.Template("""
 NPN_GetStringIdentifiers(${table}_names, NUM_${TABLE}_IDS,
-                                ${table}_ids);""")
+                                ${table}_ids);
+std::copy(${table}_ids, ${table}_ids + NUM_${TABLE}_IDS,
+          ${table}_sorted_ids);
+std::sort(${table}_sorted_ids, ${table}_sorted_ids + NUM_${TABLE}_IDS);""")
 
 _id_check_template = string.Template("""
-for (int i = 0; i < NUM_${TABLE}_IDS; i++)
-    if (name == ${table}_ids[i])
-        return true;""")
+if (std::binary_search(${table}_sorted_ids,
+                       ${table}_sorted_ids + NUM_${TABLE}_IDS, name))
+    return true;""")
 
 def MakeIdTableDict(id_list, table_name):
   """Generate a substitution dictionary for NPAPI identifiers management.
@@ -54,6 +59,10 @@ def MakeIdTableDict(id_list, table_name):
   initialization of the table, and one to check whether an identifier is in the
   table or not.
 
+  The identifiers are sorted by name, so that the tables don't depend on the
+  order in which they were collected. The check looks the identifier up with a
+  binary search in a copy of the table, sorted when it is initialized.
+
   Args:
     id_list: a list of pairs of string. Each element is composed of the name of
       the C++ enum value representing the identifier, and of the quoted name of
@@ -63,12 +72,12 @@ def MakeIdTableDict(id_list, table_name):
   Returns:
     the substitution dictionary.
   """
-  id_set = set(id_list)
+  id_pairs = sorted(set([(id_name, id) for (id, id_name) in id_list]))
   words = naming.SplitWords(table_name)
   name_cap = naming.Capitalized(words)
-  if id_set:
-    ids = ''.join(id + ',\n' for (id, id_name) in id_set)
-    names = ',\n  '.join(id_name for (id, id_name) in id_set)
+  if id_pairs:
+    ids = ''.join(id + ',\n' for (id_name, id) in id_pairs)
+    names = ',\n  '.join(id_name for (id_name, id) in id_pairs)
     table_dict = {'TABLE': naming.Upper(words),
                   'table': naming.Lower(words),
                   'Table': name_cap,
@@ -122,6 +131,7 @@ def GetGlueNamespace(scope):
     raise InvalidScopeType(scope)
 
 
+@memo.Memoize
 def GetGlueFullNamespace(scope):
   """Gets the fully qualified name of the glue namespace for a scope.
 
@@ -0,0 +1,94 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for npapi_utils."""
+
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import npapi_utils
+
+_nixysa_dir = os.path.dirname(os.path.abspath(__file__))
+_example_files = glob.glob(os.path.join(_nixysa_dir, '..', 'examples',
+                                        'complex', '*.idl'))
+
+
+class NpapiUtilsUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def testMakeIdTableDict(self):
+    id_list = [('METHOD_B', '"b"'), ('METHOD_A', '"a"'), ('METHOD_AB', '"ab"'),
+               ('METHOD_A', '"a"')]
+    table = npapi_utils.MakeIdTableDict(id_list, 'method')
+    id_list.reverse()
+    self.assertEquals(npapi_utils.MakeIdTableDict(id_list, 'method'), table)
+    self.assert_('METHOD_A,\nMETHOD_AB,\nMETHOD_B,\nNUM_METHOD_IDS' in
+                 table['MethodTable'])
+    self.assert_('"a",\n  "ab",\n  "b"\n' in table['MethodTable'])
+    self.assert_('std::sort(method_sorted_ids' in table['MethodInit'])
+    self.assert_('std::binary_search(method_sorted_ids' in
+                 table['MethodCheck'])
+    self.assertEquals(npapi_utils.MakeIdTableDict([], 'method'),
+                      {'MethodTable': '', 'MethodInit': '', 'MethodCheck': ''})
+
+  def Generate(self, generator, hash_seed):
+    codegen_path = os.path.join(_nixysa_dir, 'codegen.py')
+    env = dict(os.environ)
+    # Python 2.6 and up can randomize the hash of strings, which changes the
+    # iteration order of sets and dictionaries.
+    env['PYTHONHASHSEED'] = str(hash_seed)
+    # The header guards depend on the output directory: use the same one,
+    # relative to different working directories.
+    working_dir = os.path.join(self.directory, '%s%d' % (generator, hash_seed))
+    os.mkdir(working_dir)
+    process = subprocess.Popen([sys.executable, codegen_path,
+                                '--generate=%s' % generator,
+                                '--output-dir=glue'] + _example_files,
+                               env=env, cwd=working_dir,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    process.communicate()
+    self.assertEquals(process.returncode, 0)
+    output_dir = os.path.join(working_dir, 'glue')
+    contents = {}
+    for name in os.listdir(output_dir):
+      if os.path.splitext(name)[1] in ['.h', '.cc']:
+        f = open(os.path.join(output_dir, name), 'rb')
+        try:
+          contents[name] = f.read()
+        finally:
+          f.close()
+    return contents
+
+  def testRepeatedRunsAreIdentical(self):
+    for generator in ['npapi', 'ppapi']:
+      first = self.Generate(generator, 1)
+      second = self.Generate(generator, 2)
+      self.assert_(first)
+      self.assertEquals(sorted(first.keys()), sorted(second.keys()))
+      for name in first:
+        self.assertEquals(first[name], second[name], name)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -24,9 +24,14 @@ For JS bindings, the nullable type is represented by a JavaScript reference.
 """
 
 import by_pointer_binding
+import snippet_cache
 import string
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+
 class InvalidNullableUsage(Exception):
   """Raised when a nullable is used in conjuction with a type that is not a
   pointer pointer binding."""
@@ -436,7 +441,9 @@ def NpapiFromNPVariant(scope, type_defn, input_expr, variable, success,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  text, value = data_type_bm.NpapiFromNPVariant(
+  text, value = snippet_cache.Call(
+      data_type_bm,
+      'NpapiFromNPVariant',
       scope,
       data_type,
       input_expr,
@@ -502,7 +509,9 @@ def NpapiExprToNPVariant(scope, type_defn, variable, expression, output,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  pre_text, post_text = data_type_bm.NpapiExprToNPVariant(
+  pre_text, post_text = snippet_cache.Call(
+      data_type_bm,
+      'NpapiExprToNPVariant',
       scope,
       data_type,
       variable,
@@ -632,7 +641,9 @@ def PpapiFromPPVar(scope, type_defn, input_expr, variable, success,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  text, value = data_type_bm.PpapiFromPPVar(
+  text, value = snippet_cache.Call(
+      data_type_bm,
+      'PpapiFromPPVar',
       scope,
       data_type,
       input_expr,
@@ -699,7 +710,9 @@ def PpapiExprToPPVar(scope, type_defn, variable, expression, output,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  pre_text, post_text = data_type_bm.PpapiExprToPPVar(
+  pre_text, post_text = snippet_cache.Call(
+      data_type_bm,
+      'PpapiExprToPPVar',
       scope,
       data_type,
       variable,
@@ -0,0 +1,259 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Output cache.
+
+This module implements a persistent cache of generated files, that can be
+shared by several build trees, like ccache does for compilers. The cache maps
+the digest of a unit (see the manifest module) to the files generated for it:
+identical IDL files, code generator and flags give identical outputs, so they
+are copied from the cache instead of being generated again.
+
+The unit digests include the --output-dir flag, since the generated files
+refer to it: build trees share entries when they use the same relative output
+directory.
+
+The contents of each generated file are stored once, in an entry keyed by
+their digest. An entry for a unit lists its output files, with the key of
+their contents. The files can be hard-linked to the cache entries instead of
+copied: the writer module replaces files through a rename instead of writing
+them in place, so the cache is not modified when the files are generated
+again.
+"""
+
+import os
+
+import disk_cache
+import idl_parser
+import log
+import writer
+
+
+def _GetRelativeName(output_dir, filename):
+  """Gets the name of an output file, relative to the output directory.
+
+  Args:
+    output_dir: the output directory.
+    filename: the name of the output file.
+
+  Returns:
+    the relative name, or None if the file is not in the output directory.
+  """
+  for separator in ['/', os.sep]:
+    prefix = output_dir.rstrip(separator) + separator
+    if filename.startswith(prefix):
+      return filename[len(prefix):]
+  return None
+
+
+class CachedFile(object):
+  """Cached file class.
+
+  This class implements the interface of the file writers used by codegen,
+  for a file found in the output cache.
+
+  Attributes:
+    idl_file: the idl_parser.File the file was generated from.
+  """
+
+  def __init__(self, output_cache, content_key, filename, idl_file):
+    """Inits a CachedFile.
+
+    Args:
+      output_cache: the OutputCache the file was found in.
+      content_key: the key of the entry holding the contents of the file.
+      filename: the name of the file.
+      idl_file: the idl_parser.File the file was generated from.
+    """
+    self._output_cache = output_cache
+    self._content_key = content_key
+    self._filename = filename
+    self.idl_file = idl_file
+
+  def GetFilename(self):
+    """Gets the name of the file."""
+    return self._filename
+
+  def GetContent(self):
+    """Gets the contents of the file."""
+    f = open(self._output_cache.cache.GetPath(self._content_key), 'rb')
+    try:
+      return f.read()
+    finally:
+      f.close()
+
+  def GetDigest(self):
+    """Gets the digest of the contents of the file."""
+    return self._content_key
+
+  def GetLinkPath(self):
+    """Gets the file to hard-link, see writer.WriteFiles.
+
+    Returns:
+      the path of the cache entry, or None if the file is copied.
+    """
+    if self._output_cache.link and hasattr(os, 'link'):
+      return self._output_cache.cache.GetPath(self._content_key)
+    return None
+
+  def Write(self):
+    """Copies or hard-links the file from the cache."""
+    content = self.GetContent()
+    link_path = self.GetLinkPath()
+    if link_path and os.path.exists(self._filename):
+      f = open(self._filename, 'rb')
+      try:
+        old_content = f.read()
+      finally:
+        f.close()
+      if old_content == content:
+        return
+    if link_path:
+      try:
+        writer.LinkAtomically(self._filename, link_path)
+        log.Info('Writing %s' % self._filename)
+        return
+      except OSError:
+        # e.g. the cache is on another file system.
+        pass
+    writer.WriteIfContentDifferent(self._filename, content)
+
+
+class OutputCache(object):
+  """Output cache class.
+
+  Attributes:
+    cache: the underlying disk_cache.DiskCache.
+    link: whether the files are hard-linked from the cache, instead of copied.
+    hits: the number of units found in the cache.
+    misses: the number of units that had to be generated.
+  """
+
+  def __init__(self, directory, max_size, link=False):
+    """Inits an OutputCache instance.
+
+    Args:
+      directory: the cache directory. It can be shared between several build
+        trees.
+      max_size: the maximum size of the cache, in bytes.
+      link: whether to hard-link the files from the cache, instead of copying
+        them.
+    """
+    self.cache = disk_cache.DiskCache(directory, max_size)
+    self.link = link
+    self.hits = 0
+    self.misses = 0
+
+  def GetKey(self, generator_name, digests):
+    """Gets the cache key for a unit, or a group of units.
+
+    Args:
+      generator_name: the name of the generator.
+      digests: the list of the digests of the units, see
+        manifest.DependencyTracker.
+
+    Returns:
+      the cache key.
+    """
+    md5_hash = writer.NewMd5()
+    md5_hash.update('outputs\n%s\n' % generator_name)
+    md5_hash.update('\n'.join(digests))
+    return md5_hash.hexdigest()
+
+  def Get(self, key, output_dir, pairs):
+    """Gets the files of a unit from the cache.
+
+    Args:
+      key: the cache key of the unit, see GetKey.
+      output_dir: the output directory.
+      pairs: a list of (idl_parser.File, syntax_tree.Definition list)
+        describing the list of top-level definitions in each source file. The
+        idl_file members of the returned writers are mapped back to these
+        idl_parser.File instances.
+
+    Returns:
+      a list of CachedFile, or None if the unit is not in the cache.
+    """
+    data = self.cache.Get(key)
+    if data is None:
+      self.misses += 1
+      return None
+    idl_files = dict([(idl_file.source, idl_file) for (idl_file, defn) in
+                      pairs])
+    writer_list = []
+    for line in data.splitlines():
+      content_key, source, name = line.split('\t', 2)
+      if not os.path.exists(self.cache.GetPath(content_key)):
+        # Evicted by Trim.
+        self.misses += 1
+        return None
+      self.cache.Touch(content_key)
+      if source not in idl_files:
+        # Files that are not source files (e.g. the global namespace glue).
+        idl_files[source] = idl_parser.File(source)
+      writer_list.append(CachedFile(self, content_key,
+                                    '%s/%s' % (output_dir, name),
+                                    idl_files[source]))
+    self.hits += 1
+    return writer_list
+
+  def Put(self, key, output_dir, writer_list, stamps):
+    """Adds the files of a unit to the cache.
+
+    The files are added from the output directory, once they are written, so
+    that their contents are never held in memory. Files of units that were up
+    to date, and not written again, are trusted like the manifest trusts them.
+    Units with files outside of the output directory are not cached.
+
+    Args:
+      key: the cache key of the unit, see GetKey.
+      output_dir: the output directory.
+      writer_list: the writers of the files of the unit.
+      stamps: the stamp_file.StampFile recording the digests of the files, see
+        writer.WriteFiles.
+    """
+    lines = []
+    contents = []
+    for file_writer in writer_list:
+      filename = file_writer.GetFilename()
+      name = _GetRelativeName(output_dir, filename)
+      if name is None:
+        return
+      content_key = stamps.GetDigest(filename)
+      contents.append((content_key, filename))
+      lines.append('%s\t%s\t%s\n' % (content_key, file_writer.idl_file.source,
+                                     name))
+    for content_key, filename in contents:
+      if os.path.exists(self.cache.GetPath(content_key)):
+        self.cache.Touch(content_key)
+      else:
+        self.cache.PutFile(content_key, filename)
+        # The entries are private files: give the contents the mode of the
+        # other generated files, in case they get hard-linked.
+        os.chmod(self.cache.GetPath(content_key), writer.GetFileMode())
+    self.cache.Put(key, ''.join(lines))
+
+  def Trim(self):
+    """Evicts old entries until the cache fits in its maximum size."""
+    self.cache.Trim()
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for output_cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import idl_parser
+import output_cache
+import stamp_file
+import writer
+
+
+class OutputCacheUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.output_dir = os.path.join(self.directory, 'glue')
+    os.mkdir(self.output_dir)
+    self.idl_file = idl_parser.File('test.idl')
+    self.pairs = [(self.idl_file, [])]
+    self.writers = [
+        writer.RenderedFile(self.output_dir + '/test.h', 'header\n',
+                            self.idl_file),
+        writer.RenderedFile(self.output_dir + '/globals.h', 'globals\n',
+                            idl_parser.File('<internal>'))]
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def Put(self, cache, key, writers):
+    # The files are added to the cache once they are written.
+    stamps = stamp_file.StampFile(os.path.join(self.directory, 'stamps'))
+    writer.WriteFiles(writers, stamps)
+    cache.Put(key, self.output_dir, writers, stamps)
+
+  def MakeCache(self, link=False):
+    return output_cache.OutputCache(os.path.join(self.directory, 'cache'),
+                                    1024 * 1024, link)
+
+  def ReadFile(self, filename):
+    f = open(filename)
+    try:
+      return f.read()
+    finally:
+      f.close()
+
+  def testGetPut(self):
+    cache = self.MakeCache()
+    key = cache.GetKey('header', ['digest'])
+    self.assertEquals(cache.Get(key, self.output_dir, self.pairs), None)
+    self.Put(cache, key, self.writers)
+    cached = cache.Get(key, self.output_dir, self.pairs)
+    self.assertEquals([(w.GetFilename(), w.GetContent()) for w in cached],
+                      [(w.GetFilename(), w.GetContent()) for w in
+                       self.writers])
+    self.assert_(cached[0].idl_file is self.idl_file)
+    self.assertEquals(cached[1].idl_file.source, '<internal>')
+    self.assertEquals((cache.hits, cache.misses), (1, 1))
+    self.assertEquals(cache.Get(cache.GetKey('header', ['other']),
+                                self.output_dir, self.pairs), None)
+
+  def testOutsideOutputDir(self):
+    cache = self.MakeCache()
+    key = cache.GetKey('header', ['digest'])
+    outside = writer.RenderedFile(os.path.join(self.directory, 'other.h'),
+                                  'other\n', self.idl_file)
+    self.Put(cache, key, self.writers + [outside])
+    self.assertEquals(cache.Get(key, self.output_dir, self.pairs), None)
+
+  def testHardLink(self):
+    cache = self.MakeCache(True)
+    key = cache.GetKey('header', ['digest'])
+    self.Put(cache, key, self.writers)
+    cached = cache.Get(key, self.output_dir, self.pairs)
+    for cached_file in cached:
+      cached_file.Write()
+    filename = cached[0].GetFilename()
+    self.assertEquals(self.ReadFile(filename), 'header\n')
+    # Generating the file again doesn't modify the cache entry.
+    writer.WriteIfContentDifferent(filename, 'modified\n')
+    self.assertEquals(self.ReadFile(filename), 'modified\n')
+    self.assertEquals(cached[0].GetContent(), 'header\n')
+
+
+if __name__ == '__main__':
+  unittest.main()
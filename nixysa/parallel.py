@@ -0,0 +1,277 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parallel code generation.
+
+This module runs code generation functions in a pool of forked processes. The
+worker processes inherit the syntax tree and the generator state from the
+parent, so only the results - the contents of the generated files - need to be
+sent back. The number of errors and warnings logged by the workers, their
+profiling records and their size report counts are added to the parent's.
+
+Parallel execution needs os.fork: on platforms that don't have it, everything
+runs in the parent process.
+"""
+
+import cPickle
+import os
+import sys
+import traceback
+
+import idl_parser
+import log
+import profiler
+import size_report
+import writer
+
+
+class WorkerError(Exception):
+  """Raised when a worker process failed."""
+
+  def __init__(self, message):
+    Exception.__init__(self, message)
+    self.message = message
+
+
+def IsAvailable():
+  """Checks whether parallel execution is available on this platform."""
+  return hasattr(os, 'fork')
+
+
+def _RunWorker(function, items, write_fd):
+  """Runs in a worker process: applies a function and sends back the results.
+
+  Args:
+    function: the function to apply.
+    items: the items to apply the function to.
+    write_fd: the file descriptor to send the results to.
+  """
+  error_count, warning_count = log.GetCounts()
+  record_count = len(profiler.GetRecords())
+  # Only send the sizes counted in this process.
+  size_report.Reset()
+  try:
+    results = [function(item) for item in items]
+    new_error_count, new_warning_count = log.GetCounts()
+    data = cPickle.dumps((True, results, new_error_count - error_count,
+                          new_warning_count - warning_count,
+                          profiler.GetRecords()[record_count:],
+                          size_report.GetCounts()),
+                         cPickle.HIGHEST_PROTOCOL)
+  except:
+    message = traceback.format_exc()
+    print >> sys.stderr, message
+    data = cPickle.dumps((False, message, 0, 0, [], None),
+                         cPickle.HIGHEST_PROTOCOL)
+  f = os.fdopen(write_fd, 'wb')
+  f.write(data)
+  f.close()
+
+
+def Map(function, items, jobs):
+  """Applies a function to a list of items, in parallel.
+
+  The results must be picklable. The function runs in forked processes, so it
+  can't have side effects on the parent.
+
+  Args:
+    function: the function to apply.
+    items: the list of items to apply the function to.
+    jobs: the number of processes to use.
+
+  Returns:
+    the list of results, in the order of the items.
+
+  Raises:
+    WorkerError: the function raised an exception in a worker process.
+  """
+  jobs = min(jobs, len(items))
+  if jobs <= 1 or not IsAvailable():
+    return [function(item) for item in items]
+  sys.stdout.flush()
+  sys.stderr.flush()
+  workers = []
+  for index in range(jobs):
+    # Interleave the items to balance the load.
+    worker_items = items[index::jobs]
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+      os.close(read_fd)
+      status = 1
+      try:
+        _RunWorker(function, worker_items, write_fd)
+        status = 0
+      finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+    os.close(write_fd)
+    workers.append((pid, read_fd))
+  results = [None] * len(items)
+  errors = []
+  for index, (pid, read_fd) in enumerate(workers):
+    f = os.fdopen(read_fd, 'rb')
+    data = f.read()
+    f.close()
+    os.waitpid(pid, 0)
+    if not data:
+      errors.append('worker process %d died' % pid)
+      continue
+    (success, worker_results, error_count, warning_count, records,
+     size_counts) = cPickle.loads(data)
+    if not success:
+      errors.append(worker_results)
+      continue
+    log.AddCounts(error_count, warning_count)
+    profiler.AddRecords(records)
+    size_report.AddCounts(size_counts)
+    results[index::jobs] = worker_results
+  if errors:
+    raise WorkerError('\n'.join(errors))
+  return results
+
+
+class _WrittenFile(object):
+  """Stands for an untracked file that was already written by a worker."""
+
+  def Write(self):
+    """Does nothing, the file is already written."""
+    pass
+
+
+def RenderWriters(writer_list):
+  """Renders writers so that their contents can be sent to another process.
+
+  Args:
+    writer_list: a list of file writers.
+
+  Returns:
+    a list of (file name, contents) pairs.
+  """
+  return [(file_writer.GetFilename(), file_writer.GetContent())
+          for file_writer in writer_list]
+
+
+def GenerateFiles(function, pairs, jobs):
+  """Runs a per-file generation function on all source files, in parallel.
+
+  Args:
+    function: the function generating the writers for a source file. It takes
+      an (idl_parser.File, syntax_tree.Definition list) pair, and returns a
+      list of file writers.
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file.
+    jobs: the number of processes to use.
+
+  Returns:
+    the list of writers for all the files, in the order of the source files.
+    When running in parallel, these are writer.RenderedFile instances.
+  """
+  if jobs <= 1 or len(pairs) <= 1 or not IsAvailable():
+    writer_list = []
+    for pair in pairs:
+      writer_list += function(pair)
+    return writer_list
+
+  def _Render(pair):
+    return RenderWriters(function(pair))
+  rendered_list = Map(_Render, pairs, jobs)
+  return MakeRenderedFiles(pairs, rendered_list)
+
+
+def MapWriters(function, items, jobs, pairs):
+  """Applies a function returning file writers to a list of items, in parallel.
+
+  Args:
+    function: the function to apply. It returns a list of file writers, that
+      have an idl_file member. When running in parallel, the writers that
+      can't be tracked (see writer.IsTracked) are written by the workers, and
+      are returned as _WrittenFile instances.
+    items: the list of items to apply the function to.
+    jobs: the number of processes to use.
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file. The idl_file
+      members of the writers returned by the parallel workers are mapped back
+      to these idl_parser.File instances.
+
+  Returns:
+    for each item, the list of writers returned by the function. When running
+    in parallel, these are writer.RenderedFile instances.
+  """
+  if jobs <= 1 or len(items) <= 1 or not IsAvailable():
+    return [function(item) for item in items]
+  file_indices = dict([(idl_file, index) for (index, (idl_file, defn)) in
+                       enumerate(pairs)])
+
+  def _Render(item):
+    rendered = []
+    for file_writer in function(item):
+      if writer.IsTracked(file_writer):
+        rendered.append((file_writer.GetFilename(), file_writer.GetContent(),
+                         file_indices.get(file_writer.idl_file),
+                         file_writer.idl_file.source))
+      else:
+        file_writer.Write()
+        rendered.append(None)
+    return rendered
+  results = []
+  for rendered in Map(_Render, items, jobs):
+    # Writers for files that are not source files (e.g. the global namespace
+    # glue) need to share their idl_parser.File too.
+    other_files = {}
+    writer_list = []
+    for rendered_file in rendered:
+      if rendered_file is None:
+        writer_list.append(_WrittenFile())
+        continue
+      filename, content, index, source = rendered_file
+      if index is not None:
+        idl_file = pairs[index][0]
+      else:
+        if source not in other_files:
+          other_files[source] = idl_parser.File(source)
+        idl_file = other_files[source]
+      writer_list.append(writer.RenderedFile(filename, content, idl_file))
+    results.append(writer_list)
+  return results
+
+
+def MakeRenderedFiles(pairs, rendered_list):
+  """Creates writers for rendered files.
+
+  Args:
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file.
+    rendered_list: for each source file, the list of (file name, contents)
+      pairs of the files generated from it.
+
+  Returns:
+    a list of writer.RenderedFile.
+  """
+  writer_list = []
+  for (idl_file, defn), rendered in zip(pairs, rendered_list):
+    for filename, content in rendered:
+      writer_list.append(writer.RenderedFile(filename, content, idl_file))
+  return writer_list
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
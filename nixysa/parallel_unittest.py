@@ -0,0 +1,161 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for parallel."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import codegen
+import header_generator
+import idl_parser
+import log
+import npapi_generator
+import parallel
+import syntax_tree
+import writer
+
+# Files sharing a namespace, with nested namespaces and global definitions.
+_idl_template = """
+namespace shared {
+[binding_model=by_pointer, include="s%(index)d.h"] class S%(index)d {
+  S%(index)d();
+  int Value(float f);
+  [getter] int count;
+  [static] void Create(int a);
+};
+[binding_model=by_pointer, include="s%(index)d.h"]
+class T%(index)d : S%(index)d {
+  void Go();
+};
+enum E%(index)d { A%(index)d, B%(index)d };
+void Free%(index)d(int x);
+namespace inner%(inner)d {
+  [binding_model=by_pointer, include="s%(index)d.h"] class U%(index)d {
+    S%(index)d GetS();
+  };
+}
+}
+[binding_model=by_pointer, include="s%(index)d.h"]
+class Top%(index)d {
+  Top%(index)d();
+};
+"""
+
+
+def _LogWarning(item):
+  log.Warning('warning for %d' % item)
+  return item * 2
+
+
+def _Fail(item):
+  raise ValueError(item)
+
+
+class ParallelUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def testMap(self):
+    self.assertEquals(parallel.Map(lambda x: x * x, range(10), 3),
+                      [x * x for x in range(10)])
+    self.assertEquals(parallel.Map(lambda x: x, [], 3), [])
+
+  def testMapMergesLogCounts(self):
+    old_stderr = sys.stderr
+    sys.stderr = open(os.devnull, 'w')
+    try:
+      errors, warnings = log.GetCounts()
+      self.assertEquals(parallel.Map(_LogWarning, range(4), 2), [0, 2, 4, 6])
+      self.assertEquals(log.GetCounts(), (errors, warnings + 4))
+      log.AddCounts(0, -4)
+    finally:
+      sys.stderr.close()
+      sys.stderr = old_stderr
+
+  def testMapRaises(self):
+    if not parallel.IsAvailable():
+      return
+    old_stderr = sys.stderr
+    sys.stderr = open(os.devnull, 'w')
+    try:
+      self.assertRaises(parallel.WorkerError, parallel.Map, _Fail, range(4),
+                        2)
+    finally:
+      sys.stderr.close()
+      sys.stderr = old_stderr
+
+  def testMapWritersSharesFiles(self):
+    if not parallel.IsAvailable():
+      return
+    pairs = [(idl_parser.File('a.idl'), []), (idl_parser.File('b.idl'), [])]
+    globals_file = idl_parser.File('<internal>')
+
+    def _MakeWriters(name):
+      return [writer.RenderedFile('%s_%s.h' % (name, idl_file.basename),
+                                  name, idl_file)
+              for idl_file in [pairs[0][0], pairs[1][0], globals_file]]
+    results = parallel.MapWriters(_MakeWriters, ['x', 'y'], 2, pairs)
+    self.assertEquals(len(results), 2)
+    for name, writer_list in zip(['x', 'y'], results):
+      self.assertEquals([w.GetFilename() for w in writer_list],
+                        ['%s_a.h' % name, '%s_b.h' % name,
+                         '%s_<internal>.h' % name])
+      self.assertEquals([w.GetContent() for w in writer_list], [name] * 3)
+      self.assert_(writer_list[0].idl_file is pairs[0][0])
+      self.assert_(writer_list[1].idl_file is pairs[1][0])
+      self.assertEquals(writer_list[2].idl_file.source, '<internal>')
+
+  def Generate(self, generator, jobs):
+    """Runs a generator on the test files, returns the generated contents."""
+    parser = idl_parser.Parser()
+    pairs = []
+    for index in range(5):
+      filename = os.path.join(self.directory, 's%d.idl' % index)
+      f = open(filename, 'w')
+      f.write(_idl_template % {'index': index, 'inner': index % 2})
+      f.close()
+      idl_file = idl_parser.File(filename)
+      pairs.append((idl_file, parser.Parse(idl_file)))
+      self.assertEquals(parser.error_count, 0)
+    definitions = (sum([defn for (f, defn) in pairs], []) +
+                   codegen.GetNativeTypes())
+    namespace = syntax_tree.Namespace(None, [], '', definitions)
+    table = syntax_tree.FinalizeObjects(namespace, codegen.binding_models)
+    # The files share the namespace, and define nested namespaces.
+    for name in ['shared::S0', 'shared::T4', 'shared::S0::Create',
+                 'shared::inner0::U0', 'shared::inner1::U3', 'Top2']:
+      self.assert_(table.LookUp(name), name)
+    writer_list = generator.ProcessFiles('glue', pairs, namespace, jobs)
+    return [(w.GetFilename(), w.idl_file.source, w.GetContent())
+            for w in writer_list]
+
+  def testNpapiOutputIsIdentical(self):
+    self.assertEquals(self.Generate(npapi_generator, 3),
+                      self.Generate(npapi_generator, 1))
+
+  def testHeaderOutputIsIdentical(self):
+    self.assertEquals(self.Generate(header_generator, 3),
+                      self.Generate(header_generator, 1))
+
+
+if __name__ == '__main__':
+  unittest.main()
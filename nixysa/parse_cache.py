@@ -0,0 +1,210 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Parse cache.
+
+This module implements a persistent cache of parsed IDL files. The cache stores
+the definition lists returned by idl_parser.Parser.Parse - before
+syntax_tree.FinalizeObjects modifies them - keyed by a hash of the file
+contents and of the version of the parser and syntax tree modules. A warm
+cache only needs to parse the files that changed.
+
+The File object of the parsed file is not stored in the cache: on a cache hit,
+the definitions are attached to the File object passed in, like freshly parsed
+definitions would be.
+"""
+
+import copy_reg
+import cPickle
+import cStringIO
+import os
+
+import disk_cache
+import idl_parser
+import syntax_tree
+import writer
+
+
+# cached value for GetTreeVersion.
+_tree_version = None
+
+# Nested syntax tree classes can't be found by pickle through their name, so
+# they are pickled through these names instead.
+_nested_classes = {'Function.Param': syntax_tree.Function.Param,
+                   'Enum.Value': syntax_tree.Enum.Value}
+
+
+def GetTreeVersion():
+  """Gets the version of the parsed syntax trees.
+
+  The version changes whenever the grammar, or the code creating the syntax
+  tree objects changes.
+
+  Returns:
+    the version, as an hexadecimal string.
+  """
+  global _tree_version
+  if _tree_version is None:
+    md5_hash = writer.NewMd5()
+    md5_hash.update(idl_parser.GetGrammarHash())
+    for module in [idl_parser, syntax_tree]:
+      source = os.path.splitext(module.__file__)[0] + '.py'
+      f = open(source)
+      try:
+        md5_hash.update(f.read())
+      finally:
+        f.close()
+    _tree_version = md5_hash.hexdigest()
+  return _tree_version
+
+
+def _MakeNested(name):
+  """Creates an uninitialized instance of a nested syntax tree class."""
+  cls = _nested_classes[name]
+  return cls.__new__(cls)
+
+
+def _ReduceNested(obj):
+  """Pickle reduction function for nested syntax tree classes."""
+  reduce_value = obj.__reduce_ex__(2)
+  for name, cls in _nested_classes.items():
+    if obj.__class__ is cls:
+      return (_MakeNested, (name,)) + tuple(reduce_value[2:])
+
+
+for _cls in _nested_classes.values():
+  copy_reg.pickle(_cls, _ReduceNested)
+
+
+def DumpDefinitions(defn_list, idl_file):
+  """Serializes a definition list.
+
+  Args:
+    defn_list: the list of definitions, before syntax_tree.FinalizeObjects
+      modifies them.
+    idl_file: the idl_parser.File the definitions come from. It is not
+      serialized.
+
+  Returns:
+    the serialized definitions.
+  """
+  output = cStringIO.StringIO()
+  pickler = cPickle.Pickler(output, cPickle.HIGHEST_PROTOCOL)
+
+  def _PersistentId(obj):
+    if obj is idl_file:
+      return 'file'
+    return None
+  pickler.persistent_id = _PersistentId
+  pickler.dump(defn_list)
+  return output.getvalue()
+
+
+def LoadDefinitions(data, idl_file):
+  """De-serializes a definition list.
+
+  Args:
+    data: the serialized definitions, see DumpDefinitions.
+    idl_file: the idl_parser.File to attach the definitions to.
+
+  Returns:
+    the list of definitions.
+  """
+  unpickler = cPickle.Unpickler(cStringIO.StringIO(data))
+
+  def _PersistentLoad(persistent_id):
+    if persistent_id != 'file':
+      raise cPickle.UnpicklingError('unknown persistent id')
+    return idl_file
+  unpickler.persistent_load = _PersistentLoad
+  return unpickler.load()
+
+
+class ParseCache(object):
+  """Parse cache class.
+
+  Attributes:
+    cache: the underlying disk_cache.DiskCache. Its hits and misses members
+      count the files that were found in the cache, and the ones that had to
+      be parsed.
+  """
+
+  def __init__(self, directory, max_size):
+    """Inits a ParseCache instance.
+
+    Args:
+      directory: the cache directory. It can be shared between several build
+        trees.
+      max_size: the maximum size of the cache, in bytes.
+    """
+    self.cache = disk_cache.DiskCache(directory, max_size)
+
+  def GetKey(self, input_data):
+    """Gets the cache key for an IDL file.
+
+    Args:
+      input_data: the contents of the IDL file.
+
+    Returns:
+      the cache key.
+    """
+    md5_hash = writer.NewMd5()
+    md5_hash.update(GetTreeVersion())
+    md5_hash.update(input_data)
+    return md5_hash.hexdigest()
+
+  def Parse(self, parser, idl_file):
+    """Parses an IDL file, or gets its definitions from the cache.
+
+    Files that have parse errors are not added to the cache.
+
+    Args:
+      parser: the idl_parser.Parser used if the file is not in the cache.
+      idl_file: the file to parse, as an idl_parser.File object.
+
+    Returns:
+      the list of top-level definitions, see idl_parser.Parser.Parse.
+    """
+    f = open(idl_file.source)
+    try:
+      input_data = f.read()
+    finally:
+      f.close()
+    key = self.GetKey(input_data)
+    data = self.cache.Get(key)
+    if data is not None:
+      try:
+        return LoadDefinitions(data, idl_file)
+      except Exception:
+        # A corrupted or incompatible entry: parse the file again, and
+        # overwrite it.
+        pass
+    defn_list = parser.Parse(idl_file, input_data)
+    if defn_list is not None and not parser.error_count:
+      self.cache.Put(key, DumpDefinitions(defn_list, idl_file))
+    return defn_list
+
+  def Trim(self):
+    """Evicts old entries until the cache fits in its maximum size."""
+    self.cache.Trim()
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
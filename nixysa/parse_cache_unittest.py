@@ -0,0 +1,95 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for parse_cache."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import idl_parser
+import parse_cache
+
+_idl = """namespace test {
+  enum E { VALUE_A, VALUE_B };
+  class A {
+    void Method(int a, float b);
+  };
+}
+"""
+
+
+class ParseCacheUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.cache_dir = os.path.join(self.directory, 'cache')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def MakeFile(self, name, contents):
+    filename = os.path.join(self.directory, name)
+    f = open(filename, 'w')
+    f.write(contents)
+    f.close()
+    return idl_parser.File(filename)
+
+  def testHitAndMiss(self):
+    parser = idl_parser.Parser()
+    idl_file = self.MakeFile('test.idl', _idl)
+    cache = parse_cache.ParseCache(self.cache_dir, 1 << 20)
+    parsed_list = cache.Parse(parser, idl_file)
+    self.assertEquals(cache.cache.misses, 1)
+    cached_list = parse_cache.ParseCache(self.cache_dir, 1 << 20).Parse(
+        parser, idl_file)
+    self.assertEquals(len(cached_list), 1)
+    namespace = cached_list[0]
+    self.assertEquals(namespace.name, parsed_list[0].name)
+    self.assertTrue(namespace.source.file is idl_file)
+    enum, class_defn = namespace.defn_list
+    self.assertEquals([value.name for value in enum.values],
+                      ['VALUE_A', 'VALUE_B'])
+    method = class_defn.defn_list[0]
+    self.assertEquals([param.name for param in method.params], ['a', 'b'])
+
+  def testErrorsAreNotCached(self):
+    parser = idl_parser.Parser()
+    idl_file = self.MakeFile('broken.idl', 'class B {')
+    cache = parse_cache.ParseCache(self.cache_dir, 1 << 20)
+    cache.Parse(parser, idl_file)
+    cache.Parse(parser, idl_file)
+    self.assertEquals(cache.cache.hits, 0)
+
+  def testTrim(self):
+    parser = idl_parser.Parser()
+    cache = parse_cache.ParseCache(self.cache_dir, 0)
+    cache.Parse(parser, self.MakeFile('test.idl', _idl))
+    cache.Trim()
+    for unused_dir, unused_dirs, filenames in os.walk(self.cache_dir):
+      self.assertEquals(filenames, [])
+
+  def testTrimKeepsTemporaryFiles(self):
+    cache = parse_cache.ParseCache(self.cache_dir, 0)
+    temp_path = os.path.join(self.cache_dir, '.tmpentry')
+    f = open(temp_path, 'wb')
+    f.write('partial entry')
+    f.close()
+    cache.Trim()
+    self.assertTrue(os.path.exists(temp_path))
+
+
+if __name__ == '__main__':
+  unittest.main()
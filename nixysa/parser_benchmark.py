@@ -0,0 +1,109 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""IDL parser benchmark.
+
+This benchmark writes a number of small IDL files into a temporary directory,
+and parses all of them with a single idl_parser.Parser session. It prints the
+cost of the first file (which includes building the lexer and the parser
+tables) and the average time per file over each run of files, which should stay
+flat when the number of files grows.
+To use:
+ parser_benchmark.py --files=200 --runs=4
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import gflags
+
+import idl_parser
+
+
+FLAGS = gflags.FLAGS
+gflags.DEFINE_integer('files', 200, 'number of IDL files to parse')
+gflags.DEFINE_integer('runs', 4, 'number of runs the files are split into for'
+                      ' reporting')
+gflags.DEFINE_integer('classes', 10, 'number of classes in each IDL file')
+gflags.DEFINE_boolean('parser-per-file', False, 'create a new Parser for each'
+                      ' file, instead of re-using a single parser session')
+
+_class_template = """
+[binding_model=by_value, include="file%(file)d.h"] class Class%(file)d_%(index)d {
+  Class%(file)d_%(index)d();
+  [getter] int value_%(index)d;
+  float Compute(int a, float b, Class%(file)d_%(index)d other);
+  void SetValues(int[] values);
+};
+"""
+
+
+def WriteIdlFiles(directory, file_count, class_count):
+  """Writes synthetic IDL files.
+
+  Args:
+    directory: the directory to write the files into.
+    file_count: the number of files to write.
+    class_count: the number of classes in each file.
+
+  Returns:
+    the list of file names.
+  """
+  filenames = []
+  for file_index in range(file_count):
+    filename = os.path.join(directory, 'file%d.idl' % file_index)
+    chunks = ['namespace bench%d {\n' % file_index]
+    for class_index in range(class_count):
+      chunks.append(_class_template % {'file': file_index,
+                                       'index': class_index})
+    chunks.append('}  // namespace bench%d\n' % file_index)
+    f = open(filename, 'w')
+    f.write(''.join(chunks))
+    f.close()
+    filenames.append(filename)
+  return filenames
+
+
+def main(unused_argv):
+  directory = tempfile.mkdtemp()
+  try:
+    filenames = WriteIdlFiles(directory, FLAGS.files, FLAGS.classes)
+    parser = idl_parser.Parser()
+    timings = []
+    for filename in filenames:
+      if FLAGS['parser-per-file'].value:
+        parser = idl_parser.Parser()
+      start = time.time()
+      parser.Parse(idl_parser.File(filename))
+      timings.append(time.time() - start)
+  finally:
+    shutil.rmtree(directory)
+
+  print 'first file (includes parser construction): %.2f ms' % (
+      timings[0] * 1000)
+  run_size = max(1, len(timings) / FLAGS.runs)
+  for start in range(0, len(timings), run_size):
+    run = timings[start:start + run_size]
+    print 'files %4d-%4d: %.2f ms/file' % (start, start + len(run) - 1,
+                                            sum(run) * 1000 / len(run))
+  print 'total: %.2f s for %d files' % (sum(timings), len(timings))
+
+
+if __name__ == '__main__':
+  main(FLAGS(sys.argv))
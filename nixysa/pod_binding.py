@@ -38,6 +38,10 @@ import cpp_utils
 import java_utils
 
 
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+
 CPP_POD_TO_JSDOC_TYPES = {
   'int': 'number',
   'std.string' : 'string',
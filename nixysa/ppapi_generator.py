@@ -58,12 +58,19 @@ code for the namespaces.
 import string
 import cpp_utils
 import globals_binding
+import glue_layout
 import idl_parser
 import naming
 import npapi_utils
+import parallel
 import pod_binding
+import reachability
+import size_report
+import snippet_cache
 import syntax_tree
 
+supports_jobs = True
+
 
 # default includes to add to the generated glue files
 
@@ -697,15 +704,25 @@ def MakePodType(name):
 class PpapiGenerator(object):
   """Main generator class."""
 
-  def __init__(self, output_dir):
+  def __init__(self, output_dir, reachable=None, layout=None):
     """Inits a PpapiGenerator instance.
 
     Args:
       output_dir: the output directory for generated files.
+      reachable: (optional) the set of the definitions to generate the glue
+        for, see the reachability module. None to generate the glue for all
+        the definitions.
+      layout: (optional) the glue_layout.Layout of the glue implementation
+        files. Defaults to one file for each IDL file.
     """
     self._output_dir = output_dir
+    self._reachable = reachable
+    self._layout = layout or glue_layout.Layout()
+    # The translation units of the file being generated, see CreateCppSection.
+    self._units = []
     self._namespace_map = {}
     self._finalize_functions = []
+    self._partial = False
     # TODO: instead of passing a raw void *, it would be better to define a
     # PluginInstance class. Needs a fair amount of refactoring in the C++ code.
     self._plugin_data_type = MakePodType('void *')
@@ -854,9 +871,10 @@ class PpapiGenerator(object):
       start_exception, end_exception = GenExceptionContext(
           _exception_macro_name, "parameter",
           naming.Normalize(param.name, naming.Java))
-      code, param_access = param_binding.PpapiFromPPVar(
-          scope, param.type_defn, 'args[%d]' % i, 'param_%s' % param.name,
-          'success', _exception_macro_name, 'instance')
+      code, param_access = snippet_cache.Call(
+          param_binding, 'PpapiFromPPVar', scope, param.type_defn,
+          'args[%d]' % i, 'param_%s' % param.name, 'success',
+          _exception_macro_name, 'instance')
       strings.append(start_exception)
       strings.append(code)
       strings.append(_failure_test_string)
@@ -880,9 +898,9 @@ class PpapiGenerator(object):
       whose glue header is needed.
     """
     binding_model = type_defn.binding_model
-    pre, post = binding_model.PpapiExprToPPVar(scope, type_defn, 'retval',
-                                               expression, result,
-                                               'success', 'instance')
+    pre, post = snippet_cache.Call(binding_model, 'PpapiExprToPPVar', scope,
+                                   type_defn, 'retval', expression, result,
+                                   'success', 'instance')
     return pre, post, set([type_defn])
 
   def GetVoidReturnStrings(self, type_defn, result):
@@ -1196,9 +1214,10 @@ class PpapiGenerator(object):
       start_exception, end_exception = GenExceptionContext(
           _exception_macro_name, "field",
           naming.Normalize(field.name, naming.Java))
-      code, param_expr = field_binding.PpapiFromPPVar(
-          scope, field.type_defn, 'value', 'param_%s' % field.name,
-          'success', _exception_macro_name, 'instance')
+      code, param_expr = snippet_cache.Call(
+          field_binding, 'PpapiFromPPVar', scope, field.type_defn, 'value',
+          'param_%s' % field.name, 'success', _exception_macro_name,
+          'instance')
       section = context.set_prop_section
       section.needed_glue.add(field.type_defn)
       if 'userglue_setter' in field.attributes:
@@ -1257,9 +1276,10 @@ class PpapiGenerator(object):
       start_exception, end_exception = GenExceptionContext(
           _exception_macro_name, "field",
           naming.Normalize(field.name, naming.Java))
-      code, param_expr = field_binding.PpapiFromPPVar(
-          scope, field.type_defn, 'value', 'param_%s' % field.name,
-          'success', _exception_macro_name, 'instance')
+      code, param_expr = snippet_cache.Call(
+          field_binding, 'PpapiFromPPVar', scope, field.type_defn, 'value',
+          'param_%s' % field.name, 'success', _exception_macro_name,
+          'instance')
       section = context.static_set_prop_section
       section.needed_glue.add(field.type_defn)
       expression = binding_model.CppSetStatic(scope, type_defn, field,
@@ -1412,10 +1432,7 @@ class PpapiGenerator(object):
         context.header_section.additional_includes)
     context.header_section.PopNamespace()
 
-    context.cpp_section.PushNamespace(namespace_name)
-    cpp_section = context.cpp_section.CreateSection(namespace_name)
-    cpp_section.needed_glue = context.cpp_section.needed_glue
-    context.cpp_section.PopNamespace()
+    cpp_section = self.CreateCppSection(context, obj)
 
     param_to_variant_pre = []
     param_to_variant_post = []
@@ -1427,9 +1444,9 @@ class PpapiGenerator(object):
       cpp_section.needed_glue.add(p.type_defn)
       param_strings += [param_string]
       bm = p.type_defn.binding_model
-      pre, post = bm.PpapiExprToPPVar(scope, p.type_defn, 'var_' + p.name,
-                                      p.name, '(args + %d)' % i, 'success',
-                                      'instance')
+      pre, post = snippet_cache.Call(bm, 'PpapiExprToPPVar', scope,
+                                     p.type_defn, 'var_' + p.name, p.name,
+                                     '(args + %d)' % i, 'success', 'instance')
       param_to_variant_pre.append(pre)
       param_to_variant_post.append(post)
 
@@ -1446,11 +1463,11 @@ class PpapiGenerator(object):
                      'pp::Var& object, bool async%s)')
                     % (return_type_string, ', '.join(param_strings)))
 
-    return_eval, return_value = bm.PpapiFromPPVar(scope, return_type,
-                                                  'result', 'retval',
-                                                  'success',
-                                                  _exception_macro_name,
-                                                  'instance')
+    return_eval, return_value = snippet_cache.Call(bm, 'PpapiFromPPVar', scope,
+                                                   return_type, 'result',
+                                                   'retval', 'success',
+                                                   _exception_macro_name,
+                                                   'instance')
     start_exception, end_exception = GenExceptionContext(
         _exception_macro_name, "callback return value", "<no name>")
     subst_dict = {'RunCallback': run_callback,
@@ -1500,6 +1517,9 @@ class PpapiGenerator(object):
 
     namespace_name = npapi_utils.GetGlueNamespace(obj)
     parent_context.namespace_list.append(obj)
+    if self._partial:
+      # The rest of the class glue only goes into the file being generated.
+      return
 
     scope = syntax_tree.Namespace(None, [], namespace_name, [])
     scope.parent = parent_context.scope
@@ -1512,10 +1532,7 @@ class PpapiGenerator(object):
         parent_context.header_section.additional_includes)
     parent_context.header_section.PopNamespace()
 
-    parent_context.cpp_section.PushNamespace(namespace_name)
-    cpp_section = parent_context.cpp_section.CreateSection(namespace_name)
-    cpp_section.needed_glue = parent_context.cpp_section.needed_glue
-    parent_context.cpp_section.PopNamespace()
+    cpp_section = self.CreateCppSection(parent_context, obj)
 
     context = self.CodeGenContext(obj, scope, header_section, cpp_section, None)
     header_section.needed_defn.add(obj)
@@ -1684,7 +1701,7 @@ class PpapiGenerator(object):
         cpp_section.EmitTemplate(temp_template.safe_substitute(
             substitution_dict))
 
-      self._finalize_functions.append(_Finalize)
+      self._finalize_functions.append((obj, self._partial, _Finalize))
 
     context.cpp_section.needed_glue.add(obj)
     self.GenerateList(context, obj.defn_list)
@@ -1720,10 +1737,17 @@ class PpapiGenerator(object):
     for obj in defn_list:
       if 'nojs' in obj.attributes:
         continue
+      if self._reachable is not None and obj not in self._reachable:
+        continue
       if 'include' in obj.attributes:
         context.header_section.needed_defn.add(obj)
       func = getattr(self, obj.defn_type)
-      func(context, obj)
+      # The glue of partial passes is discarded, see BeginFile.
+      size_report.Push(obj, self._partial)
+      try:
+        func(context, obj)
+      finally:
+        size_report.Pop()
 
   def CreateGlueWriters(self, idl_file):
     """Creates CppFileWriter instances for glue header and implementation.
@@ -1733,20 +1757,63 @@ class PpapiGenerator(object):
 
     Returns:
       a pair of CppFileWriter, the first being the glue header writer, the
-      second one being the glue implementation writer.
+      second one being the glue implementation writer. Their idl_file member is
+      set to the source file.
     """
-    cpp_writer = cpp_utils.CppFileWriter(
-        '%s/%s' % (self._output_dir, GetGlueCpp(idl_file)), False)
-    for include, system in _cpp_includes:
-      cpp_writer.AddInclude(include, system)
-    cpp_writer.AddInclude(GetGlueHeader(idl_file), False)
-
+    cpp_writer = self.CreateGlueCppWriter(idl_file)
     header_writer = cpp_utils.CppFileWriter(
         '%s/%s' % (self._output_dir, GetGlueHeader(idl_file)), True)
     for include, system in _header_includes:
       header_writer.AddInclude(include, system)
+    header_writer.idl_file = idl_file
     return header_writer, cpp_writer
 
+  def CreateGlueCppWriter(self, idl_file, suffix=None):
+    """Creates a CppFileWriter for a glue implementation file.
+
+    Args:
+      idl_file: an idl_parser.File for the source file.
+      suffix: (optional) the suffix of the file name, for the additional
+        implementation files of the glue layout, see
+        glue_layout.Layout.GetWriters.
+
+    Returns:
+      the CppFileWriter. Its idl_file member is set to the source file.
+    """
+    filename = GetGlueCpp(idl_file)
+    if suffix is not None:
+      filename = glue_layout.SplitFilename(filename, suffix)
+    cpp_writer = cpp_utils.CppFileWriter(
+        '%s/%s' % (self._output_dir, filename), False)
+    if self._layout.pch_file:
+      # The precompiled header must be the first include.
+      cpp_writer.AddInclude(self._layout.pch_file, False)
+    for include, system in _cpp_includes:
+      cpp_writer.AddInclude(include, system)
+    cpp_writer.AddInclude(GetGlueHeader(idl_file), False)
+    cpp_writer.idl_file = idl_file
+    return cpp_writer
+
+  def CreateCppSection(self, context, obj):
+    """Creates the glue implementation section of a class or callback.
+
+    Depending on the glue layout, the section is created in the section of the
+    parent scope, or in a translation unit of its own, see glue_layout.
+
+    Args:
+      context: the code generation context of the parent scope.
+      obj: the Class or Callback definition.
+
+    Returns:
+      the created section.
+    """
+    glue_namespaces = [npapi_utils.GetGlueNamespace(scope) for scope in
+                       obj.GetParentScopeStack() + [obj]]
+    cpp_section = self._layout.CreateSection(self._units, context.cpp_section,
+                                             obj, glue_namespaces)
+    cpp_section.needed_glue = context.cpp_section.needed_glue
+    return cpp_section
+
   def CreateGlueSection(self, writer):
     """Utility function to create a 'glue' section in a writer.
 
@@ -1763,13 +1830,16 @@ class PpapiGenerator(object):
     writer.PopNamespace()
     return section
 
-  def BeginFile(self, idl_file, parent_context, defn_list):
+  def BeginFile(self, idl_file, parent_context, defn_list, partial=False):
     """Runs the pass 1 generation for an IDL file.
 
     Args:
       idl_file: the source IDL file.
       parent_context: the code generation context.
       defn_list: the list of top-level definitions in the IDL file.
+      partial: (optional) only run the part of pass 1 that the glue of the
+        other files depends on - the glue of the classes isn't generated. The
+        glue for this file is then incomplete, and must be discarded.
 
     Returns:
       a 3-uple. The first element is the code generation context for that file.
@@ -1793,7 +1863,14 @@ class PpapiGenerator(object):
                                   parent_context.scope, header_section,
                                   cpp_section, parent_context)
 
-    self.GenerateList(context, defn_list)
+    cpp_writer.glue_units = []
+    self._units = cpp_writer.glue_units
+    self._partial = partial
+    try:
+      self.GenerateList(context, defn_list)
+    finally:
+      self._partial = False
+      self._units = []
     return context, header_writer, cpp_writer
 
   def FinishFile(self, idl_file, context, header_writer, cpp_writer):
@@ -1816,12 +1893,16 @@ class PpapiGenerator(object):
                                    in source_files)
     cpp_needed_glue_includes.add(GetGlueHeader(idl_file))
 
-    for include_file in cpp_needed_glue_includes:
+    cpp_writers = self._layout.GetWriters(
+        cpp_writer, cpp_writer.glue_units,
+        lambda suffix: self.CreateGlueCppWriter(idl_file, suffix))
+    for include_file in sorted(cpp_needed_glue_includes):
       if include_file:
-        cpp_writer.AddInclude(include_file)
+        for unit_writer in cpp_writers:
+          unit_writer.AddInclude(include_file)
 
-    for include_file in set(type_defn.GetDefinitionInclude() for type_defn
-                            in header_writer.needed_defn):
+    for include_file in sorted(set(type_defn.GetDefinitionInclude()
+                                   for type_defn in header_writer.needed_defn)):
       if include_file:
         header_writer.AddInclude(include_file)
 
@@ -1829,17 +1910,17 @@ class PpapiGenerator(object):
                     header_writer.needed_glue)
     header_needed_glue_includes = set(GetGlueHeader(source_file) for source_file
                                       in source_files)
-    for include_file in header_needed_glue_includes:
+    for include_file in sorted(header_needed_glue_includes):
       if include_file:
         # TODO(jhorwich) Avoid adding include if the include is the
         # same file as the file being written. Right now this is harmless
         # due to header guards but it is sloppy
         header_writer.AddInclude(include_file)
 
-    for include_file in header_writer.additional_includes:
+    for include_file in sorted(header_writer.additional_includes):
       header_writer.AddInclude(include_file)
 
-    return [header_writer, cpp_writer]
+    return [header_writer] + cpp_writers
 
   def BeginGlobals(self, idl_file, namespace):
     """Runs the pass 1 generation for the global namespace.
@@ -1884,8 +1965,12 @@ class PpapiGenerator(object):
     Returns:
       a list of CppFileWriter instances that contain the generated files.
     """
-    for f in self._finalize_functions:
-      f()
+    for obj, partial, f in self._finalize_functions:
+      size_report.Push(obj, partial)
+      try:
+        f()
+      finally:
+        size_report.Pop()
     namespace_id_dict = GenNamespaceCode(context)
 
     substitution_dict = {}
@@ -1907,48 +1992,119 @@ class PpapiGenerator(object):
     includes = set(GetGlueHeader(ns_obj.source.file) for ns_obj in
                    context.namespace_list)
 
-    for include_file in includes:
+    for include_file in sorted(includes):
       if include_file is not None:
         cpp_writer.AddInclude(include_file)
 
     return [header_writer, cpp_writer]
 
 
-def ProcessFiles(output_dir, pairs, namespace):
-  """Generates the PPAPI glue for all input files.
+def GenerateGlue(output_dir, pairs, namespace, file_indices=None):
+  """Generates the PPAPI glue.
 
   Args:
     output_dir: the output directory.
     pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
       the list of top-level definitions in each source file.
     namespace: a syntax_tree.Namespace for the global namespace.
+    file_indices: (optional) the indices in pairs of the source files to
+      generate the glue for. Defaults to all of them. The other files only go
+      through a partial pass 1 - see PpapiGenerator.BeginFile.
 
   Returns:
-    a list of cpp_utils.CppFileWriter, one for each output glue header or
-    implementation file.
+    a pair. The first element is the list of cpp_utils.CppFileWriter for the
+    global namespace glue. The second element is a list containing, for each
+    source file, the list of cpp_utils.CppFileWriter for its glue, or None if
+    the glue wasn't generated for that file.
   """
   globals_file = idl_parser.File('<internal>')
   globals_file.header = None
   globals_file.basename = 'globals'
-  generator = PpapiGenerator(output_dir)
+  generator = PpapiGenerator(output_dir,
+                             reachability.GetReachable(namespace),
+                             glue_layout.GetLayout())
 
   # pass 1
   global_context, global_header_writer, global_cpp_writer = (
       generator.BeginGlobals(globals_file, namespace))
-  file_map = {}
-  for (idl_file, defn) in pairs:
-    context, header_writer, cpp_writer = generator.BeginFile(
-        idl_file, global_context, defn)
-    file_map[idl_file] = (context, header_writer, cpp_writer)
+  file_contexts = []
+  for index, (idl_file, defn) in enumerate(pairs):
+    partial = file_indices is not None and index not in file_indices
+    file_contexts.append(generator.BeginFile(idl_file, global_context, defn,
+                                             partial))
 
   # pass 2
-  writer_list = generator.FinishGlobals(global_context, global_header_writer,
-                                        global_cpp_writer)
-  for (idl_file, defn) in pairs:
-    context, header_writer, cpp_writer = file_map[idl_file]
-    writer_list += generator.FinishFile(idl_file, context, header_writer,
-                                        cpp_writer)
-  return writer_list
+  global_writer_list = generator.FinishGlobals(
+      global_context, global_header_writer, global_cpp_writer)
+  file_writer_lists = []
+  for index, (idl_file, defn) in enumerate(pairs):
+    if file_indices is not None and index not in file_indices:
+      file_writer_lists.append(None)
+      continue
+    context, header_writer, cpp_writer = file_contexts[index]
+    file_writer_lists.append(generator.FinishFile(idl_file, context,
+                                                  header_writer, cpp_writer))
+  return global_writer_list, file_writer_lists
+
+
+def ProcessFiles(output_dir, pairs, namespace, jobs=1):
+  """Generates the PPAPI glue for all input files.
+
+  With several jobs, the glue for the source files is generated in parallel.
+  Each worker process generates the glue for a subset of the files, but runs
+  the partial pass 1 on the other files, so that the glue for namespaces
+  spanning several files is complete. The global namespace glue is generated
+  in this process, using only partial passes.
+
+  Args:
+    output_dir: the output directory.
+    pairs: a list of (idl_parser.File, syntax_tree.Definition list) describing
+      the list of top-level definitions in each source file.
+    namespace: a syntax_tree.Namespace for the global namespace.
+    jobs: (optional) the number of processes generating the files.
+
+  Returns:
+    a list of cpp_utils.CppFileWriter (or writer.RenderedFile when running in
+    parallel), one for each output glue header or implementation file, and
+    for the unity build file and the precompiled header (see --glue-unity and
+    --glue-pch).
+  """
+  layout = glue_layout.GetLayout()
+  jobs = min(jobs, len(pairs))
+  if jobs <= 1 or not parallel.IsAvailable():
+    global_writer_list, file_writer_lists = GenerateGlue(output_dir, pairs,
+                                                         namespace)
+    writer_list = []
+    for file_writer_list in file_writer_lists:
+      writer_list.extend(file_writer_list)
+  else:
+    chunks = [range(len(pairs))[index::jobs] for index in range(jobs)]
+
+    def _GenerateChunk(chunk):
+      unused_global_writer_list, file_writer_lists = GenerateGlue(
+          output_dir, pairs, namespace, set(chunk))
+      return [parallel.RenderWriters(file_writer_lists[index])
+              for index in chunk]
+    rendered_list = [None] * len(pairs)
+    for chunk, chunk_results in zip(chunks, parallel.Map(_GenerateChunk,
+                                                           chunks, jobs)):
+      for index, rendered in zip(chunk, chunk_results):
+        rendered_list[index] = rendered
+    global_writer_list, unused_file_writer_lists = GenerateGlue(
+        output_dir, pairs, namespace, set())
+    writer_list = parallel.MakeRenderedFiles(pairs, rendered_list)
+  # The unity build file and the precompiled header go with the global
+  # namespace glue.
+  globals_file = global_writer_list[0].idl_file
+  if layout.unity_file:
+    global_writer_list.append(glue_layout.CreateUnityWriter(
+        output_dir, layout.unity_file, global_writer_list + writer_list,
+        globals_file, layout.pch_file))
+  if layout.pch_file:
+    global_writer_list.append(glue_layout.CreatePchWriter(
+        output_dir, layout.pch_file, _header_includes + _cpp_includes,
+        globals_file))
+  return global_writer_list + writer_list
 
 
 def main():
@@ -0,0 +1,215 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Code generator profiling.
+
+This module records the wall time spent in each phase of a code generator run
+(hashing, parsing each file, finalizing, running each generator, writing), and
+writes a report in JSON format:
+
+  {"total_seconds": 1.2,
+   "max_rss_kb": 23456,
+   "phases": {"parse": 0.6, "generate": 0.4, ...},
+   "records": [{"phase": "parse", "name": "foo.idl", "seconds": 0.1,
+                "max_rss_kb": 20000}, ...]}
+
+The max_rss_kb values are the peak memory use of the process when the record
+was made, when the resource module is available. Records of the write phase
+also have output_files and output_bytes members, records of the generate phase
+have the hit rates of the memoized functions (see memo.GetStats) in a memo
+member.
+
+Recording does nothing unless Enable was called.
+"""
+
+import os
+import time
+
+# Use cProfile if present (Python 2.5 and up), otherwise fall back to profile.
+try:
+  import cProfile as profile_module
+except ImportError:
+  import profile as profile_module
+try:
+  import json
+except ImportError:
+  try:
+    import simplejson as json
+  except ImportError:
+    json = None
+try:
+  import resource
+except ImportError:
+  resource = None
+
+
+_enabled = False
+_start_time = None
+_records = []
+
+
+def Enable():
+  """Enables recording, and resets the records."""
+  global _enabled
+  _enabled = True
+  Reset()
+
+
+def IsEnabled():
+  """Checks whether recording is enabled."""
+  return _enabled
+
+
+def Reset():
+  """Removes all the records, and restarts the total time."""
+  global _start_time
+  global _records
+  _start_time = time.time()
+  _records = []
+
+
+def GetMaxRss():
+  """Gets the peak memory use of the process.
+
+  Returns:
+    the maximum resident set size in kilobytes, or None if it is not known.
+  """
+  if resource is None:
+    return None
+  max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if os.uname()[0] == 'Darwin':
+    # In bytes on Mac OS X.
+    max_rss /= 1024
+  return max_rss
+
+
+def Start():
+  """Gets the start time of a phase, to pass to Record."""
+  return time.time()
+
+
+def Record(phase, name, start, **details):
+  """Records the time spent in a phase.
+
+  Args:
+    phase: the phase, e.g. 'parse'.
+    name: what the phase was run on, e.g. the IDL file name.
+    start: the start time of the phase, returned by Start.
+    details: additional members of the record, e.g. output_bytes.
+  """
+  if not _enabled:
+    return
+  record = {'phase': phase, 'name': name, 'seconds': time.time() - start,
+            'max_rss_kb': GetMaxRss()}
+  record.update(details)
+  _records.append(record)
+
+
+def Call(phase, name, function, *args):
+  """Calls a function, and records the time it took.
+
+  Args:
+    phase: the phase, e.g. 'parse'.
+    name: what the phase was run on, e.g. the IDL file name.
+    function: the function to call.
+    args: the arguments of the function.
+
+  Returns:
+    the result of the function.
+  """
+  start = Start()
+  result = function(*args)
+  Record(phase, name, start)
+  return result
+
+
+def GetRecords():
+  """Gets the records made so far.
+
+  Returns:
+    a list of records, as dictionaries.
+  """
+  return _records[:]
+
+
+def AddRecords(records):
+  """Adds records made by another process."""
+  if _enabled:
+    _records.extend(records)
+
+
+def GetReport():
+  """Gets the profiling report.
+
+  Returns:
+    the report, as a dictionary.
+  """
+  phases = {}
+  for record in _records:
+    phases[record['phase']] = (phases.get(record['phase'], 0) +
+                               record['seconds'])
+  return {'total_seconds': time.time() - _start_time,
+          'max_rss_kb': GetMaxRss(),
+          'phases': phases,
+          'records': _records}
+
+
+def WriteReport(filename):
+  """Writes the profiling report in JSON format.
+
+  Args:
+    filename: the name of the report file.
+
+  Raises:
+    ImportError: no JSON module is available.
+  """
+  if json is None:
+    raise ImportError('the profiling report needs the json module (Python 2.6'
+                      ' and up) or simplejson.')
+  f = open(filename, 'w')
+  try:
+    json.dump(GetReport(), f, indent=1, sort_keys=True)
+  finally:
+    f.close()
+
+
+def RunWithStats(filename, function, *args):
+  """Calls a function under the python profiler, and dumps the statistics.
+
+  The statistics can be read with the pstats module. Code running in other
+  processes (see the parallel module) is not covered.
+
+  Args:
+    filename: the name of the statistics file.
+    function: the function to call.
+    args: the arguments of the function.
+
+  Returns:
+    the result of the function.
+  """
+  profile = profile_module.Profile()
+  try:
+    return profile.runcall(function, *args)
+  finally:
+    profile.dump_stats(filename)
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
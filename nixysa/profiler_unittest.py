@@ -0,0 +1,86 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for profiler."""
+
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+import parallel
+import profiler
+
+
+def _Square(item):
+  return profiler.Call('square', str(item), lambda x: x * x, item)
+
+
+class ProfilerUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    profiler._enabled = False
+    profiler.Reset()
+    shutil.rmtree(self.directory)
+
+  def testDisabled(self):
+    profiler.Reset()
+    self.assertEquals(profiler.Call('test', 'a', len, 'abc'), 3)
+    self.assertEquals(profiler.GetRecords(), [])
+
+  def testRecords(self):
+    profiler.Enable()
+    self.assertEquals(profiler.Call('test', 'a', len, 'abc'), 3)
+    profiler.Record('test', 'b', profiler.Start(), output_bytes=12)
+    profiler.Record('other', 'c', profiler.Start())
+    records = profiler.GetRecords()
+    self.assertEquals([(r['phase'], r['name']) for r in records],
+                      [('test', 'a'), ('test', 'b'), ('other', 'c')])
+    self.assertEquals(records[1]['output_bytes'], 12)
+    report = profiler.GetReport()
+    phases = report['phases'].keys()
+    phases.sort()
+    self.assertEquals(phases, ['other', 'test'])
+    self.assertEquals(report['phases']['test'],
+                      records[0]['seconds'] + records[1]['seconds'])
+
+  def testWriteReport(self):
+    if profiler.json is None:
+      return
+    profiler.Enable()
+    profiler.Call('test', 'a', len, 'abc')
+    filename = os.path.join(self.directory, 'report.json')
+    profiler.WriteReport(filename)
+    report = profiler.json.load(open(filename))
+    self.assertEquals(report['records'][0]['name'], 'a')
+
+  def testRunWithStats(self):
+    filename = os.path.join(self.directory, 'stats')
+    self.assertEquals(profiler.RunWithStats(filename, _Square, 3), 9)
+    self.assert_(pstats.Stats(filename).total_calls > 0)
+
+  def testParallelRecords(self):
+    profiler.Enable()
+    self.assertEquals(parallel.Map(_Square, range(4), 2), [0, 1, 4, 9])
+    names = [r['name'] for r in profiler.GetRecords()]
+    names.sort()
+    self.assertEquals(names, ['0', '1', '2', '3'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reachability analysis.
+
+This module finds the definitions reachable from a set of roots, given by
+their qualified names (see the --glue-root flag), so that the NPAPI and PPAPI
+generators only emit the glue for the definitions the plugin exports.
+
+A definition is reachable if it is:
+- a root, or within a root,
+- a member of a reachable class: the glue of a class exposes all its members,
+- a type referenced by a reachable definition (following typedefs, base
+  classes, arrays, function parameters and return types),
+- a scope containing a reachable definition, or a verbatim block within such a
+  scope. All the parts of a reachable namespace are reachable, since its glue
+  is emitted along with the first part.
+
+The result is stored in the 'reachable' member of the global namespace, see
+GetReachable.
+"""
+
+import manifest
+import syntax_tree
+import writer
+
+
+class Error(Exception):
+  """Base exception for the reachability module."""
+
+
+class UnknownRootError(Error):
+  """Raised when a root doesn't name any definition."""
+
+  def __init__(self, name):
+    Error.__init__(self)
+    self.name = name
+
+  def __str__(self):
+    return 'unknown glue root %s' % self.name
+
+
+def FindReachable(namespace, root_names):
+  """Finds the definitions reachable from a set of roots.
+
+  Args:
+    namespace: the global namespace. It must have been finalized, see
+      syntax_tree.FinalizeObjects.
+    root_names: the list of the qualified names of the roots, e.g.
+      'o3d::Client'.
+
+  Returns:
+    the set of the reachable definitions.
+
+  Raises:
+    UnknownRootError: a root doesn't name any definition.
+  """
+  table = namespace.symbol_table
+  # A list of (definition, with_members) pairs: members are only reachable
+  # through roots and classes, not through the scopes containing them.
+  pending = []
+  for name in root_names:
+    roots = table.LookUp(name)
+    if not roots:
+      raise UnknownRootError(name)
+    pending.extend([(root, True) for root in roots])
+  reachable = set()
+  expanded = set()
+  while pending:
+    defn, with_members = pending.pop()
+    if defn not in reachable:
+      reachable.add(defn)
+      pending.extend([(type_defn, True) for type_defn in
+                      manifest.GetReferencedTypes(defn)])
+      if defn.parent:
+        pending.append((defn.parent, False))
+      if defn.defn_type == 'Namespace':
+        pending.extend([(part, False) for part in
+                        table.LookUp(table.GetQualifiedName(defn))])
+      if defn.is_scope:
+        pending.extend([(child, False) for child in table.GetChildren(defn)
+                        if child.defn_type == 'Verbatim'])
+    if (with_members or defn.defn_type == 'Class') and defn not in expanded:
+      expanded.add(defn)
+      pending.extend([(child, True) for child in table.GetChildren(defn)])
+  return reachable
+
+
+def Prune(namespace, root_names):
+  """Computes the reachable definitions, for the generators to prune the others.
+
+  Args:
+    namespace: the global namespace. It must have been finalized.
+    root_names: the list of the qualified names of the roots.
+
+  Returns:
+    the set of the reachable definitions, also set as the 'reachable' member
+    of the namespace.
+
+  Raises:
+    UnknownRootError: a root doesn't name any definition.
+  """
+  namespace.reachable = FindReachable(namespace, root_names)
+  return namespace.reachable
+
+
+def GetReachable(namespace):
+  """Gets the reachable definitions computed by Prune.
+
+  Args:
+    namespace: the global namespace.
+
+  Returns:
+    the set of the reachable definitions, or None if nothing is pruned.
+  """
+  return getattr(namespace, 'reachable', None)
+
+
+def GetPruned(namespace, defn_list):
+  """Gets the outermost definitions pruned in a list of definitions.
+
+  Members of pruned definitions are not listed.
+
+  Args:
+    namespace: the global namespace, on which Prune was called.
+    defn_list: the list of top-level definitions, e.g. of an IDL file.
+
+  Returns:
+    the list of the pruned definitions, in traversal order.
+  """
+  reachable = GetReachable(namespace)
+  if reachable is None:
+    return []
+  return [defn for defn in syntax_tree.GetObjectsRecursive(defn_list)
+          if defn not in reachable and defn.parent in reachable]
+
+
+def GetDigest(namespace):
+  """Gets the digest of the set of reachable definitions.
+
+  Args:
+    namespace: the global namespace, on which Prune was called.
+
+  Returns:
+    the digest, as an hexadecimal string.
+  """
+  table = namespace.symbol_table
+  names = ['%s %s' % (defn.defn_type, table.GetQualifiedName(defn))
+           for defn in GetReachable(namespace) or []]
+  names.sort()
+  md5_hash = writer.NewMd5()
+  md5_hash.update('\n'.join(names))
+  return md5_hash.hexdigest()
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for reachability."""
+
+import unittest
+import codegen
+import idl_parser
+import reachability
+import syntax_tree
+
+_idl1 = """namespace types {
+  typedef int Size;
+  [binding_model=by_pointer] class Base {
+    void BaseMethod();
+  };
+  [binding_model=by_pointer] class Unused {
+    void UnusedMethod();
+  };
+}
+namespace api {
+  %{
+  // verbatim
+  %}
+  callback void Done(types::Size size);
+  [binding_model=by_pointer] class Client : types::Base {
+    void Start(Done done);
+    types::Size size;
+  };
+  void Free();
+}
+"""
+
+_idl2 = """namespace api {
+  [binding_model=by_pointer] class Other {};
+}
+"""
+
+
+class ReachabilityUnitTest(unittest.TestCase):
+  def setUp(self):
+    parser = idl_parser.Parser()
+    self.pairs = []
+    for name, contents in [('test1.idl', _idl1), ('test2.idl', _idl2)]:
+      idl_file = idl_parser.File(name)
+      self.pairs.append((idl_file, parser.Parse(idl_file, contents)))
+    definitions = sum([defn for (f, defn) in self.pairs], [])
+    self.namespace = syntax_tree.Namespace(
+        None, [], '', definitions + codegen.GetNativeTypes())
+    self.table = syntax_tree.FinalizeObjects(self.namespace,
+                                             codegen.binding_models)
+
+  def GetNames(self, definitions):
+    return sorted([self.table.GetQualifiedName(defn) for defn in definitions
+                   if defn.name and defn.source.file.source != '<internal>'])
+
+  def testClassRoot(self):
+    reachable = reachability.Prune(self.namespace, ['api::Client'])
+    # The members of the root, the types they reference and their members,
+    # the scopes and all their parts.
+    self.assertEquals(self.GetNames(reachable),
+                      ['api', 'api', 'api::Client', 'api::Client::Start',
+                       'api::Client::size', 'api::Done', 'types',
+                       'types::Base', 'types::Base::BaseMethod',
+                       'types::Size'])
+    verbatim = [defn for defn in self.namespace.GetObjectsRecursive()
+                if defn.defn_type == 'Verbatim']
+    self.assertEquals(len(verbatim), 1)
+    self.assert_(verbatim[0] in reachable)
+    self.assert_(reachability.GetReachable(self.namespace) is reachable)
+    pruned = []
+    for (idl_file, defn_list) in self.pairs:
+      pruned += reachability.GetPruned(self.namespace, defn_list)
+    self.assertEquals(self.GetNames(pruned),
+                      ['api::Free', 'api::Other', 'types::Unused'])
+
+  def testNamespaceRoot(self):
+    reachability.Prune(self.namespace, ['api'])
+    pruned = reachability.GetPruned(self.namespace, self.pairs[0][1])
+    self.assertEquals(self.GetNames(pruned), ['types::Unused'])
+
+  def testDigest(self):
+    reachability.Prune(self.namespace, ['api::Client'])
+    digest = reachability.GetDigest(self.namespace)
+    reachability.Prune(self.namespace, ['api::Client'])
+    self.assertEquals(reachability.GetDigest(self.namespace), digest)
+    reachability.Prune(self.namespace, ['api'])
+    self.assertNotEquals(reachability.GetDigest(self.namespace), digest)
+
+  def testUnknownRoot(self):
+    self.assertEquals(reachability.GetReachable(self.namespace), None)
+    self.assertRaises(reachability.UnknownRootError, reachability.Prune,
+                      self.namespace, ['api::Unknown'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,138 @@
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SCons tool for the nixysa code generator.
+
+This tool adds a Nixysa builder, that runs the code generator on IDL files. The
+code generator is asked to write a dependency file (see nixysa/depfile.py),
+that the builder's target scanner reads back: SCons then knows all the inputs
+of each generated file - including the IDL files defining the types it
+references, and the generator and binding model modules - and only runs the
+code generator when one of them changed.
+
+To use, in a SConstruct:
+  env = Environment(tools=['default', 'nixysa'],
+                    toolpath=['path/to/nixysa/scons'],
+                    GLUE_DIR='glue')
+  glue_files = env.Nixysa(['foo.idl', 'bar.idl'])
+
+Construction variables:
+  NIXYSA_DIR: the nixysa directory. Defaults to the parent of this directory.
+  GLUE_DIR: the output directory. Defaults to 'glue'.
+  NIXYSA_GENERATE: the list of generators to run. Defaults to ['npapi'].
+  NIXYSA_DEPFILE: the dependency file. Defaults to '$GLUE_DIR/nixysa.d'.
+  NIXYSA_GLUE_PCH: the name of the precompiled header of the glue files, in
+    GLUE_DIR (see the --glue-pch flag of the code generator), e.g.
+    'glue_pch.h'. Defaults to '', for none.
+  NIXYSA_FLAGS: additional flags for the code generator.
+"""
+
+import imp
+import os
+import sys
+
+import SCons.Builder
+import SCons.Scanner
+
+_nixysa_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+depfile = imp.load_source('nixysa_depfile',
+                          os.path.join(_nixysa_dir, 'depfile.py'))
+
+# Generators whose output names can be derived from the IDL file names. The
+# outputs of the other generators depend on the IDL contents, and are only
+# known from the dependency file of the previous run.
+_glue_generators = ['npapi', 'ppapi']
+
+
+def _ReadDependencies(env):
+  """Reads the dependency file of the previous run, if any.
+
+  Args:
+    env: the construction environment.
+
+  Returns:
+    a dictionary mapping absolute output paths to lists of input file nodes.
+  """
+  filename = env.File('$NIXYSA_DEPFILE').abspath
+  if not os.path.exists(filename):
+    return {}
+  dependencies = {}
+  # The code generator runs in the top-level directory.
+  top_dir = env.Dir('#')
+  for output, inputs in depfile.ReadDepfile(filename).items():
+    input_nodes = [top_dir.File(path) for path in inputs
+                   if os.path.exists(top_dir.File(path).abspath)]
+    dependencies[top_dir.File(output).abspath] = input_nodes
+  return dependencies
+
+
+def _NixysaEmitter(target, source, env):
+  """Emitter for the Nixysa builder."""
+  target = []
+  if [g for g in env['NIXYSA_GENERATE'] if g in _glue_generators]:
+    bases = [os.path.splitext(s.name)[0] for s in source] + ['globals']
+    target += [env.File('$GLUE_DIR/%s_glue.cc' % b) for b in bases]
+    target += [env.File('$GLUE_DIR/%s_glue.h' % b) for b in bases]
+    if env['NIXYSA_GLUE_PCH']:
+      target.append(env.File('$GLUE_DIR/$NIXYSA_GLUE_PCH'))
+  top_dir = env.Dir('#')
+  known_targets = set([t.abspath for t in target])
+  outputs = _ReadDependencies(env).keys()
+  outputs.sort()
+  for output in outputs:
+    if output not in known_targets:
+      target.append(top_dir.File(output))
+  target += [env.File('$GLUE_DIR/hash'), env.File('$GLUE_DIR/manifest'),
+             env.File('$NIXYSA_DEPFILE')]
+  return target, source
+
+
+def _NixysaScan(node, env, path):
+  """Target scanner for the Nixysa builder.
+
+  Returns:
+    the list of the inputs of a generated file, from the dependency file.
+  """
+  path = path  # silence gpylint
+  return _ReadDependencies(env).get(node.abspath, [])
+
+
+def generate(env):
+  """Adds the Nixysa builder and its construction variables."""
+  env.SetDefault(NIXYSA_DIR=_nixysa_dir,
+                 GLUE_DIR='glue',
+                 NIXYSA_GENERATE=['npapi'],
+                 NIXYSA_DEPFILE='$GLUE_DIR/nixysa.d',
+                 NIXYSA_GLUE_PCH='',
+                 NIXYSA_FLAGS=[])
+  if sys.platform == 'win32':
+    env.SetDefault(NIXYSA_CODEGEN='$NIXYSA_DIR/codegen.bat')
+  else:
+    env.SetDefault(NIXYSA_CODEGEN='$NIXYSA_DIR/codegen.sh')
+  env['NIXYSA_GENERATE_FLAGS'] = (
+      '${_concat("--generate=", NIXYSA_GENERATE, "", __env__)}')
+  env['NIXYSA_GLUE_PCH_FLAGS'] = (
+      '${NIXYSA_GLUE_PCH and "--glue-pch=" + NIXYSA_GLUE_PCH or ""}')
+  env['ENV']['PYTHON'] = sys.executable
+  action = ('$NIXYSA_CODEGEN --output-dir=$GLUE_DIR --depfile=$NIXYSA_DEPFILE'
+            ' $NIXYSA_GENERATE_FLAGS $NIXYSA_GLUE_PCH_FLAGS $NIXYSA_FLAGS'
+            ' $SOURCES')
+  scanner = SCons.Scanner.Base(function=_NixysaScan, name='NixysaScanner')
+  env['BUILDERS']['Nixysa'] = SCons.Builder.Builder(action=action,
+                                                    emitter=_NixysaEmitter,
+                                                    target_scanner=scanner)
+
+
+def exists(env):
+  return True
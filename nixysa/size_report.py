@@ -0,0 +1,335 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generated code size report.
+
+This module attributes the code emitted by the generators to the definitions
+it was generated for, and counts the snippets rendered by each binding model,
+to find the definitions that make the generated code big. It writes a report
+in JSON format:
+
+  {"attributed_lines": 12000,
+   "attributed_bytes": 450000,
+   "definitions": [{"name": "o3d::Client", "type": "Class",
+                    "binding_model": "by_pointer_binding",
+                    "source": "client.idl", "line": 12,
+                    "lines": 200, "bytes": 8000,
+                    "total_lines": 1500, "total_bytes": 60000,
+                    "snippets": {"unsized_array_binding": 4}}, ...],
+   "binding_models": {"unsized_array_binding":
+                      {"snippets": {"NpapiFromNPVariant": 4}, "calls": 6,
+                       "bytes": 3000}, ...},
+   "sources": {"client.idl": {"lines": 1600, "bytes": 64000}, ...},
+   "files": [{"name": "glue/client_glue.cc", "source": "client.idl",
+              "lines": 1400, "bytes": 56000}, ...]}
+
+The lines and bytes of a definition are the code emitted while generating it,
+not counting its members, while total_lines and total_bytes include the
+members. Definitions are sorted by decreasing total_bytes. The binding model
+counts are the snippets the generators request through snippet_cache.Call
+(e.g. the marshalling code of each parameter), by binding model of the
+marshalled type, and the size of the code they rendered. The files are the
+generated files, with their sizes on disk, and the sources sum up the code
+attributed to the definitions of each IDL file.
+
+Only the code emitted by the generators that report the definitions they
+generate (see Push) is attributed, and only in the run that generates it: use
+--force, and no output cache, for a report on all the files.
+
+Recording does nothing unless Enable was called.
+"""
+
+try:
+  import json
+except ImportError:
+  try:
+    import simplejson as json
+  except ImportError:
+    json = None
+
+
+_enabled = False
+# The stack of the keys of the definitions being generated, None for code that
+# is discarded.
+_stack = []
+# The nesting depth of snippet_cache.Call, to only count the outer calls.
+_snippet_depth = 0
+# Maps definition keys to [lines, bytes, parent key, snippets dictionary].
+_definitions = {}
+# Maps binding model names to [calls, bytes, snippets dictionary].
+_binding_models = {}
+# The list of (file name, source, lines, bytes) for the generated files.
+_files = []
+
+
+def Enable():
+  """Enables recording, and resets the counts."""
+  global _enabled
+  _enabled = True
+  Reset()
+
+
+def IsEnabled():
+  """Checks whether recording is enabled."""
+  return _enabled
+
+
+def Reset():
+  """Removes all the counts."""
+  global _definitions
+  global _binding_models
+  global _files
+  _definitions = {}
+  _binding_models = {}
+  _files = []
+
+
+def _GetKey(defn):
+  """Gets the key of a definition in the counts.
+
+  The keys don't reference the definitions, so that the counts can be sent
+  from another process.
+
+  Args:
+    defn: the definition.
+
+  Returns:
+    a (qualified name, definition type, binding model, source, line) tuple.
+  """
+  names = [scope.name for scope in defn.GetParentScopeStack() if scope.name]
+  names.append(defn.name or '')
+  binding_model = None
+  if defn.binding_model:
+    binding_model = defn.binding_model.__name__
+  source = None
+  line = None
+  if defn.source:
+    source = defn.source.file.source
+    line = defn.source.line
+  return ('::'.join(names), defn.defn_type, binding_model, source, line)
+
+
+def Push(defn, discarded=False):
+  """Starts attributing the emitted code to a definition.
+
+  Generators call this before generating each definition, and Pop after.
+
+  Args:
+    defn: the definition.
+    discarded: whether the code emitted for the definition is discarded (e.g.
+      in partial passes), in which case it isn't counted.
+  """
+  if not _enabled:
+    return
+  if discarded or (_stack and _stack[-1] is None):
+    _stack.append(None)
+    return
+  key = _GetKey(defn)
+  if key not in _definitions:
+    parent_key = None
+    if _stack:
+      parent_key = _stack[-1]
+    _definitions[key] = [0, 0, parent_key, {}]
+  _stack.append(key)
+
+
+def Pop():
+  """Stops attributing the emitted code to the last pushed definition."""
+  if not _enabled:
+    return
+  _stack.pop()
+
+
+def AddLines(lines):
+  """Counts lines emitted for the current definition.
+
+  Args:
+    lines: the list of the emitted lines.
+  """
+  if not _stack or _stack[-1] is None:
+    return
+  counts = _definitions[_stack[-1]]
+  counts[0] += len(lines)
+  counts[1] += sum([len(line) + 1 for line in lines])
+
+
+def _GetSize(value):
+  """Gets the size of a rendered snippet.
+
+  Args:
+    value: a string, or a tuple or list of strings.
+
+  Returns:
+    the total length of the strings.
+  """
+  if isinstance(value, str):
+    return len(value)
+  elif isinstance(value, (tuple, list)):
+    return sum([_GetSize(item) for item in value])
+  else:
+    return 0
+
+
+def BeginSnippet():
+  """Called by snippet_cache.Call before rendering a snippet."""
+  global _snippet_depth
+  _snippet_depth += 1
+
+
+def EndSnippet(binding_model, function_name, value):
+  """Called by snippet_cache.Call after rendering a snippet.
+
+  Only the outer calls are counted: the snippets that binding models render
+  for other types are part of the outer snippet.
+
+  Args:
+    binding_model: the binding model module.
+    function_name: the name of the binding model function.
+    value: the rendered snippet, or None if rendering failed.
+  """
+  global _snippet_depth
+  _snippet_depth -= 1
+  if _snippet_depth or value is None or not _stack or _stack[-1] is None:
+    return
+  name = binding_model.__name__
+  counts = _binding_models.setdefault(name, [0, 0, {}])
+  counts[0] += 1
+  counts[1] += _GetSize(value)
+  counts[2][function_name] = counts[2].get(function_name, 0) + 1
+  snippets = _definitions[_stack[-1]][3]
+  snippets[name] = snippets.get(name, 0) + 1
+
+
+def AddFile(filename, source):
+  """Adds a generated file to the report.
+
+  Args:
+    filename: the name of the file, already written.
+    source: the name of the IDL file it was generated from.
+  """
+  if not _enabled:
+    return
+  f = open(filename, 'rb')
+  try:
+    content = f.read()
+  finally:
+    f.close()
+  _files.append((filename, source, content.count('\n'), len(content)))
+
+
+def GetCounts():
+  """Gets the counts, to send them to another process.
+
+  Returns:
+    the counts, a picklable object.
+  """
+  return _definitions, _binding_models
+
+
+def AddCounts(counts):
+  """Adds the counts made by another process.
+
+  Args:
+    counts: the counts, returned by GetCounts in the other process after a
+      call to Reset.
+  """
+  if not _enabled:
+    return
+  definitions, binding_models = counts
+  for key, (lines, size, parent_key, snippets) in definitions.items():
+    own = _definitions.setdefault(key, [0, 0, parent_key, {}])
+    own[0] += lines
+    own[1] += size
+    for name, count in snippets.items():
+      own[3][name] = own[3].get(name, 0) + count
+  for name, (calls, size, snippets) in binding_models.items():
+    own = _binding_models.setdefault(name, [0, 0, {}])
+    own[0] += calls
+    own[1] += size
+    for function_name, count in snippets.items():
+      own[2][function_name] = own[2].get(function_name, 0) + count
+
+
+def GetReport():
+  """Gets the size report.
+
+  Returns:
+    the report, as a dictionary.
+  """
+  totals = {}
+  for key, (lines, size, parent_key, snippets) in _definitions.items():
+    # Add the code of the definition to its own total and to the totals of
+    # its parents.
+    while key is not None:
+      total = totals.setdefault(key, [0, 0])
+      total[0] += lines
+      total[1] += size
+      key = _definitions[key][2]
+  definitions = []
+  sources = {}
+  for key, (lines, size, parent_key, snippets) in _definitions.items():
+    name, defn_type, binding_model, source, line = key
+    definitions.append({'name': name, 'type': defn_type,
+                        'binding_model': binding_model, 'source': source,
+                        'line': line, 'lines': lines, 'bytes': size,
+                        'total_lines': totals[key][0],
+                        'total_bytes': totals[key][1],
+                        'snippets': snippets})
+    source_counts = sources.setdefault(source, {'lines': 0, 'bytes': 0})
+    source_counts['lines'] += lines
+    source_counts['bytes'] += size
+  definitions.sort(lambda x, y: (cmp(y['total_bytes'], x['total_bytes']) or
+                                 cmp(x['name'], y['name']) or
+                                 cmp(x['line'], y['line'])))
+  binding_models = {}
+  for name, (calls, size, snippets) in _binding_models.items():
+    binding_models[name] = {'calls': calls, 'bytes': size,
+                            'snippets': snippets}
+  files = [{'name': filename, 'source': source, 'lines': lines,
+            'bytes': size} for (filename, source, lines, size) in _files]
+  return {'attributed_lines': sum([item['lines'] for item in definitions]),
+          'attributed_bytes': sum([item['bytes'] for item in definitions]),
+          'definitions': definitions,
+          'binding_models': binding_models,
+          'sources': sources,
+          'files': files}
+
+
+def WriteReport(filename):
+  """Writes the size report in JSON format.
+
+  Args:
+    filename: the name of the report file.
+
+  Raises:
+    ImportError: no JSON module is available.
+  """
+  if json is None:
+    raise ImportError('the size report needs the json module (Python 2.6 and'
+                      ' up) or simplejson.')
+  f = open(filename, 'w')
+  try:
+    json.dump(GetReport(), f, indent=1, sort_keys=True)
+  finally:
+    f.close()
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for size_report."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import codegen
+import idl_parser
+import memo
+import npapi_generator
+import size_report
+import syntax_tree
+import writer
+
+_idl = """namespace test {
+  [binding_model=by_pointer, include="test.h"] class Buffer {
+    Buffer();
+    void SetData(int[] data);
+    [getter] int size;
+  };
+}
+"""
+
+
+class BindingModelMock(object):
+  """Mock of a binding model module."""
+  __name__ = 'mock_binding'
+
+
+class SizeReportUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    parser = idl_parser.Parser()
+    self.idl_file = idl_parser.File(os.path.join(self.directory, 'test.idl'))
+    self.defn_list = parser.Parse(self.idl_file, _idl)
+    self.namespace = syntax_tree.Namespace(
+        None, [], '', self.defn_list + codegen.GetNativeTypes())
+    syntax_tree.FinalizeObjects(self.namespace, codegen.binding_models)
+    memo.Reset()
+
+  def tearDown(self):
+    size_report._enabled = False
+    size_report.Reset()
+    shutil.rmtree(self.directory)
+
+  def GetDefinitions(self):
+    report = size_report.GetReport()
+    return dict([(item['name'], item) for item in report['definitions']])
+
+  def testAttribution(self):
+    size_report.Enable()
+    test_namespace = self.defn_list[0]
+    buffer_class = test_namespace.defn_list[0]
+    size_report.Push(test_namespace)
+    size_report.AddLines(['namespace test {'])
+    size_report.Push(buffer_class)
+    size_report.AddLines(['class Buffer;', ''])
+    size_report.BeginSnippet()
+    size_report.BeginSnippet()
+    size_report.EndSnippet(BindingModelMock(), 'Inner', 'inner')
+    size_report.EndSnippet(BindingModelMock(), 'NpapiFromNPVariant',
+                           ('code', 'expr'))
+    size_report.Pop()
+    size_report.Pop()
+    size_report.AddLines(['ignored'])
+    definitions = self.GetDefinitions()
+    self.assertEquals(
+        [(name, item['lines'], item['bytes'], item['total_lines'],
+          item['total_bytes']) for (name, item) in sorted(definitions.items())],
+        [('test', 1, 17, 3, 32), ('test::Buffer', 2, 15, 2, 15)])
+    self.assertEquals(definitions['test::Buffer']['binding_model'],
+                      'by_pointer_binding')
+    # Only the outer snippet is counted.
+    self.assertEquals(definitions['test::Buffer']['snippets'],
+                      {'mock_binding': 1})
+    self.assertEquals(size_report.GetReport()['binding_models'],
+                      {'mock_binding': {'calls': 1, 'bytes': 8,
+                                        'snippets': {'NpapiFromNPVariant': 1}}})
+
+  def testDisabledAndDiscarded(self):
+    test_namespace = self.defn_list[0]
+    size_report.Push(test_namespace)
+    size_report.AddLines(['namespace test {'])
+    size_report.Pop()
+    self.assertEquals(size_report.GetReport()['definitions'], [])
+    size_report.Enable()
+    size_report.Push(test_namespace, True)
+    size_report.Push(test_namespace.defn_list[0])
+    size_report.AddLines(['class Buffer;'])
+    size_report.Pop()
+    size_report.Pop()
+    self.assertEquals(size_report.GetReport()['definitions'], [])
+
+  def testAddCounts(self):
+    size_report.Enable()
+    size_report.Push(self.defn_list[0])
+    size_report.AddLines(['namespace test {'])
+    size_report.Pop()
+    counts = size_report.GetCounts()
+    size_report.Reset()
+    size_report.AddCounts(counts)
+    size_report.AddCounts(counts)
+    self.assertEquals(self.GetDefinitions()['test']['lines'], 2)
+
+  def testGenerator(self):
+    size_report.Enable()
+    writer_list = npapi_generator.ProcessFiles(
+        self.directory, [(self.idl_file, self.defn_list)], self.namespace)
+    definitions = self.GetDefinitions()
+    self.assert_(definitions['test::Buffer::SetData']['snippets'].has_key(
+        'unsized_array_binding'))
+    self.assert_(definitions['test::Buffer']['total_bytes'] >
+                 definitions['test::Buffer::SetData']['bytes'] > 0)
+    report = size_report.GetReport()
+    self.assertEquals(report['binding_models']['unsized_array_binding']
+                      ['calls'], 1)
+    total_bytes = sum([len(file_writer.GetContent())
+                       for file_writer in writer_list])
+    self.assert_(0 < report['attributed_bytes'] <= total_bytes)
+    for file_writer in writer_list:
+      writer.WriteAtomically(file_writer.GetFilename(),
+                             file_writer.GetContent())
+      size_report.AddFile(file_writer.GetFilename(), self.idl_file.source)
+    self.assertEquals(sum([item['bytes'] for item
+                           in size_report.GetReport()['files']]), total_bytes)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of the glue snippets rendered by binding models.
+
+The generators call binding model functions such as NpapiFromNPVariant for
+every parameter of every method, and the binding models substitute the same
+templates each time, only changing the variable names. This module renders each
+snippet once per (binding model, function, scope, type), with placeholders
+instead of the string arguments, and then replaces the placeholders with the
+actual arguments for each call.
+
+Binding models opt into the cache by listing the function names in a
+CACHEABLE_SNIPPETS module attribute, e.g.:
+
+  CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                        'PpapiFromPPVar', 'PpapiExprToPPVar')
+
+By doing so, a binding model guarantees that for each listed function:
+  - the function takes (scope, type_defn, ...) arguments, and the other
+    arguments are strings.
+  - the result only depends on the scope and type definitions, and on the
+    string arguments by inserting them verbatim (possibly with a prefix or a
+    suffix) into the strings of the result. The result must not depend on the
+    contents of the string arguments (their length, case, etc.), and the
+    function must not have side effects.
+  - the result is a string, or a tuple or list of strings.
+  - calls to the functions of other binding models go through Call, so that
+    the snippet is rendered directly if those functions don't opt in.
+The functions that are not listed are called directly, so binding models
+written before the cache existed keep working.
+
+Cached snippets are dropped by memo.Reset at the start of each code generator
+run, and their hit rates are reported with the other memoized functions.
+"""
+
+import re
+import memo
+import size_report
+
+
+# The placeholder for the string argument at a given index. NUL characters don't
+# appear in the arguments or in the generated code.
+_PLACEHOLDER = '\0%d\0'
+_placeholder_re = re.compile('\0([0-9]+)\0')
+
+# The nesting depth of the snippets being rendered with placeholders.
+_rendering = 0
+
+
+class _NotCacheableError(Exception):
+  """Raised when a snippet can't be rendered with placeholders."""
+
+
+def _Substitute(value, args):
+  """Replaces the placeholders in a rendered snippet.
+
+  Args:
+    value: the rendered snippet, a string or a tuple or list of strings.
+    args: the string arguments to insert.
+
+  Returns:
+    the snippet, with the arguments.
+  """
+  if isinstance(value, str):
+    # Replace in one pass: the arguments may be placeholders of an outer
+    # snippet.
+    if '\0' in value:
+      value = _placeholder_re.sub(lambda match: args[int(match.group(1))],
+                                  value)
+    return value
+  elif isinstance(value, tuple):
+    return tuple([_Substitute(item, args) for item in value])
+  elif isinstance(value, list):
+    return [_Substitute(item, args) for item in value]
+  else:
+    return value
+
+
+@memo.Memoize
+def _Render(binding_model, function_name, scope, type_defn, arg_count):
+  """Renders a snippet with placeholders for the string arguments.
+
+  Args:
+    binding_model: the binding model module.
+    function_name: the name of the binding model function.
+    scope: the code generation scope.
+    type_defn: the type definition.
+    arg_count: the number of string arguments.
+
+  Returns:
+    the snippet, or None if it can't be cached because it calls the functions
+    of a binding model that doesn't opt into the cache.
+  """
+  global _rendering
+  placeholders = tuple([_PLACEHOLDER % index for index in range(arg_count)])
+  _rendering += 1
+  try:
+    try:
+      return getattr(binding_model, function_name)(scope, type_defn,
+                                                   *placeholders)
+    except _NotCacheableError:
+      return None
+  finally:
+    _rendering -= 1
+
+
+def Call(binding_model, function_name, scope, type_defn, *args):
+  """Calls a binding model function, using the cached snippet if possible.
+
+  Args:
+    binding_model: the binding model module.
+    function_name: the name of the binding model function, e.g.
+      'NpapiFromNPVariant'.
+    scope: the code generation scope.
+    type_defn: the type definition.
+    args: the other arguments of the function.
+
+  Returns:
+    the result of the binding model function.
+  """
+  if not size_report.IsEnabled():
+    return _Call(binding_model, function_name, scope, type_defn, args)
+  size_report.BeginSnippet()
+  value = None
+  try:
+    value = _Call(binding_model, function_name, scope, type_defn, args)
+  finally:
+    size_report.EndSnippet(binding_model, function_name, value)
+  return value
+
+
+def _Call(binding_model, function_name, scope, type_defn, args):
+  """Implementation of Call.
+
+  Args:
+    binding_model: the binding model module.
+    function_name: the name of the binding model function.
+    scope: the code generation scope.
+    type_defn: the type definition.
+    args: the tuple of the other arguments of the function.
+
+  Returns:
+    the result of the binding model function.
+  """
+  cacheable = function_name in getattr(binding_model, 'CACHEABLE_SNIPPETS', ())
+  if cacheable:
+    for arg in args:
+      if not isinstance(arg, str):
+        cacheable = False
+        break
+  if cacheable:
+    snippet = _Render(binding_model, function_name, scope, type_defn,
+                      len(args))
+    if snippet is not None:
+      return _Substitute(snippet, args)
+  if _rendering:
+    # The arguments are placeholders, so the snippet being rendered can't be
+    # cached either.
+    raise _NotCacheableError
+  return getattr(binding_model, function_name)(scope, type_defn, *args)
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
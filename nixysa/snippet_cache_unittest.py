@@ -0,0 +1,92 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for snippet_cache."""
+
+import unittest
+import memo
+import snippet_cache
+
+
+class BindingModelMock(object):
+  """Mock of a binding model module, counting the calls."""
+
+  def __init__(self, cacheable, data_binding_model=None):
+    if cacheable:
+      self.CACHEABLE_SNIPPETS = ('NpapiFromNPVariant',)
+    self.data_binding_model = data_binding_model
+    self.calls = 0
+
+  def NpapiFromNPVariant(self, scope, type_defn, input_expr, variable):
+    self.calls += 1
+    text = '%s %s = Get(%s);' % (type_defn, variable, input_expr)
+    if self.data_binding_model:
+      inner_text, unused_expr = snippet_cache.Call(
+          self.data_binding_model, 'NpapiFromNPVariant', scope, type_defn,
+          variable, variable + '_data')
+      text += inner_text
+    return text, variable
+
+
+class SnippetCacheUnitTest(unittest.TestCase):
+  def setUp(self):
+    memo.Reset()
+
+  def testCacheable(self):
+    binding_model = BindingModelMock(True)
+    for (input_expr, variable) in [('args[0]', 'a'), ('args[1]', 'b'),
+                                   ('args[0]', 'a')]:
+      self.assertEquals(snippet_cache.Call(binding_model, 'NpapiFromNPVariant',
+                                           None, 'int', input_expr, variable),
+                        ('int %s = Get(%s);' % (variable, input_expr),
+                         variable))
+    self.assertEquals(binding_model.calls, 1)
+    snippet_cache.Call(binding_model, 'NpapiFromNPVariant', None, 'float',
+                       'x', 'y')
+    self.assertEquals(binding_model.calls, 2)
+
+  def testNotCacheable(self):
+    binding_model = BindingModelMock(False)
+    for unused_index in range(2):
+      self.assertEquals(snippet_cache.Call(binding_model, 'NpapiFromNPVariant',
+                                           None, 'int', 'args[0]', 'a'),
+                        ('int a = Get(args[0]);', 'a'))
+    self.assertEquals(binding_model.calls, 2)
+
+  def testNested(self):
+    data_binding_model = BindingModelMock(True)
+    binding_model = BindingModelMock(True, data_binding_model)
+    for unused_index in range(2):
+      self.assertEquals(snippet_cache.Call(binding_model, 'NpapiFromNPVariant',
+                                           None, 'int', 'args[0]', 'a'),
+                        ('int a = Get(args[0]);int a_data = Get(a);', 'a'))
+    self.assertEquals(binding_model.calls, 1)
+    self.assertEquals(data_binding_model.calls, 1)
+
+  def testNestedNotCacheable(self):
+    # The outer snippet depends on a binding model that doesn't opt in, so it
+    # is rendered for each call.
+    data_binding_model = BindingModelMock(False)
+    binding_model = BindingModelMock(True, data_binding_model)
+    for unused_index in range(2):
+      self.assertEquals(snippet_cache.Call(binding_model, 'NpapiFromNPVariant',
+                                           None, 'int', 'args[0]', 'a'),
+                        ('int a = Get(args[0]);int a_data = Get(a);', 'a'))
+    self.assertEquals(data_binding_model.calls, 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
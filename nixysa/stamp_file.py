@@ -0,0 +1,179 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Stamp file.
+
+The code generator checks whether anything changed by hashing all its inputs.
+Reading every file is slow on network file systems, so the stamp file, stored
+in the output directory, records the digest of each input file along with its
+size, modification time and inode. A file whose stat data didn't change since
+the last run is not read again. Another stamp file records the digests of the
+generated files, to compare them with new contents without reading them.
+
+A file modified right after it was hashed may keep the same stat data, if the
+file system timestamps are coarse. Like git does for its index, files modified
+less than _RACY_SECONDS before the stamp file was written are always hashed
+again, and the stamp file is then written again, so that they are trusted in
+the next run.
+"""
+
+import os
+
+import manifest
+import writer
+
+# Files modified this close to the time the stamp file was written are always
+# hashed again, to cope with coarse file system timestamps.
+_RACY_SECONDS = 2
+
+
+def GetStat(path):
+  """Gets the stat data of a file that identifies a version of it.
+
+  Args:
+    path: the path of the file.
+
+  Returns:
+    a (size, modification time, inode) tuple of strings.
+
+  Raises:
+    OSError: the file doesn't exist.
+  """
+  stat = os.stat(path)
+  return (str(stat.st_size), repr(stat.st_mtime), str(stat.st_ino))
+
+
+class StampFile(object):
+  """Stamp file class.
+
+  Attributes:
+    hashed: the number of files that were read and hashed since the stamp file
+      was loaded.
+  """
+
+  def __init__(self, filename):
+    """Inits a StampFile instance.
+
+    Args:
+      filename: the name of the stamp file.
+    """
+    self._filename = filename
+    # path -> (stat data, digest)
+    self._entries = {}
+    self._used = set()
+    self._time = None
+    self._dirty = False
+    self.hashed = 0
+
+  def Load(self):
+    """Loads the stamp file, if it exists."""
+    self._entries = {}
+    self._used = set()
+    self._time = None
+    self._dirty = False
+    try:
+      f = open(self._filename, 'r')
+    except IOError:
+      return
+    try:
+      self._time = os.fstat(f.fileno()).st_mtime
+      for line in f:
+        fields = line.rstrip('\n').split(' ', 4)
+        if len(fields) == 5:
+          digest, size, mtime, inode, path = fields
+          self._entries[path] = ((size, mtime, inode), digest)
+    finally:
+      f.close()
+
+  def Save(self):
+    """Saves the stamp file, if it changed.
+
+    Only the files looked up since Load are kept. The file is replaced
+    atomically, since several code generator instances may share the output
+    directory.
+    """
+    if not self._dirty and self._used == set(self._entries.keys()):
+      return
+    lines = []
+    paths = list(self._used)
+    paths.sort()
+    for path in paths:
+      stat, digest = self._entries[path]
+      if stat is None:
+        continue
+      size, mtime, inode = stat
+      lines.append('%s %s %s %s %s\n' % (digest, size, mtime, inode, path))
+    writer.WriteAtomically(self._filename, ''.join(lines))
+    self._dirty = False
+
+  def GetDigest(self, path):
+    """Gets the digest of the contents of a file.
+
+    The file is only read if its stat data changed since the last run.
+
+    Args:
+      path: the path of the file.
+
+    Returns:
+      the digest, as an hexadecimal string, see manifest.GetFileDigest.
+
+    Raises:
+      IOError: the file can't be read.
+    """
+    try:
+      stat = GetStat(path)
+    except OSError:
+      stat = None
+    self._used.add(path)
+    entry = self._entries.get(path)
+    if stat is not None and entry is not None and entry[0] == stat:
+      if (self._time is not None and
+          float(stat[1]) < self._time - _RACY_SECONDS):
+        return entry[1]
+    digest = manifest.GetFileDigest(path)
+    self.hashed += 1
+    self._entries[path] = (stat, digest)
+    self._dirty = True
+    return digest
+
+  def SetDigest(self, path, digest):
+    """Records the digest of a file that was just written.
+
+    Args:
+      path: the path of the file.
+      digest: the digest of its contents.
+    """
+    self._used.add(path)
+    self._entries[path] = (GetStat(path), digest)
+    self._dirty = True
+
+  def Keep(self, paths):
+    """Keeps the entries of files when saving, without looking them up.
+
+    Args:
+      paths: the paths of the files.
+    """
+    for path in paths:
+      if path in self._entries:
+        self._used.add(path)
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for stamp_file."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import manifest
+import stamp_file
+
+
+class StampFileUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.stamp_filename = os.path.join(self.directory, 'stamps')
+    self.source = os.path.join(self.directory, 'file.idl')
+    self.mtime = time.time() - 3600
+    self.WriteSource('first')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def WriteSource(self, contents):
+    f = open(self.source, 'w')
+    try:
+      f.write(contents)
+    finally:
+      f.close()
+    os.utime(self.source, (self.mtime, self.mtime))
+
+  def GetDigest(self):
+    stamps = stamp_file.StampFile(self.stamp_filename)
+    stamps.Load()
+    digest = stamps.GetDigest(self.source)
+    stamps.Save()
+    return digest, stamps.hashed
+
+  def testUnchanged(self):
+    digest = manifest.GetFileDigest(self.source)
+    self.assertEquals(self.GetDigest(), (digest, 1))
+    self.assertEquals(self.GetDigest(), (digest, 0))
+
+  def testChanged(self):
+    self.GetDigest()
+    self.WriteSource('second')
+    self.assertEquals(self.GetDigest(),
+                      (manifest.GetFileDigest(self.source), 1))
+
+  def testSameStatIsTrusted(self):
+    digest, unused_hashed = self.GetDigest()
+    # Same size, modification time and inode: the file isn't read.
+    self.WriteSource('other')
+    self.assertEquals(self.GetDigest(), (digest, 0))
+
+  def testRacyFile(self):
+    self.mtime = time.time()
+    self.WriteSource('first')
+    self.GetDigest()
+    # Modified right after the stamp file was written, with the same stat
+    # data: the file is hashed again.
+    self.WriteSource('other')
+    self.assertEquals(self.GetDigest(),
+                      (manifest.GetFileDigest(self.source), 1))
+
+
+if __name__ == '__main__':
+  unittest.main()
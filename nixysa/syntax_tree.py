@@ -20,6 +20,8 @@ This module contains all the classes that are used to describe the IDL as a
 syntax tree.
 """
 
+import profiler
+
 # TODO: this module has grown too big, it should be split.
 
 
@@ -94,6 +96,8 @@ class TypeReference(object):
   the types before using them.
   """
 
+  __slots__ = ('location',)
+
   def __init__(self, location):
     """Inits a TypeReference instance.
 
@@ -152,6 +156,8 @@ class NameTypeReference(TypeReference):
   (typedef, typename, class, enum).
   """
 
+  __slots__ = ('name',)
+
   def __init__(self, location, name):
     """Inits a NameTypeReference instance.
 
@@ -186,6 +192,8 @@ class ScopedTypeReference(TypeReference):
   scope, and TypeRef is a type reference.
   """
 
+  __slots__ = ('scope_name', 'type_ref')
+
   def __init__(self, location, scope_name, type_ref):
     """Inits a ScopedTypeReference instance.
 
@@ -227,6 +235,8 @@ class ArrayTypeReference(TypeReference):
   is a type reference.
   """
 
+  __slots__ = ('type_ref', 'size')
+
   def __init__(self, location, type_ref, size):
     """Inits a ArrayTypeReference instance.
 
@@ -265,6 +275,8 @@ class QualifiedTypeReference(TypeReference):
   qualifier (const, restrict, volatile), and TypeRef is a type reference.
   """
 
+  __slots__ = ('qualifier', 'type_ref')
+
   def __init__(self, location, qualifier, type_ref):
     """Inits a QualifiedTypeReference instance.
 
@@ -293,6 +305,35 @@ class QualifiedTypeReference(TypeReference):
     return '%s %s' % (self.qualifier, self.type_ref)
 
 
+class SharedAttributes(dict):
+  """Read-only attributes dictionary, shared by several definitions.
+
+  The parser shares identical attributes dictionaries between definitions (see
+  idl_parser.Parser). Modifying one would silently modify the attributes of
+  unrelated definitions, so they can't be modified: assign a new dictionary to
+  the attributes of the definition instead, e.g.
+  defn.attributes = dict(defn.attributes).
+  """
+
+  __slots__ = ()
+
+  def _ReadOnly(self, *unused_args, **unused_kwargs):
+    raise TypeError('shared attributes can\'t be modified, replace the'
+                    ' attributes dictionary of the definition instead')
+
+  __setitem__ = _ReadOnly
+  __delitem__ = _ReadOnly
+  clear = _ReadOnly
+  pop = _ReadOnly
+  popitem = _ReadOnly
+  setdefault = _ReadOnly
+  update = _ReadOnly
+
+  def __reduce__(self):
+    # The default protocol sets the items one by one.
+    return (SharedAttributes, (dict(self),))
+
+
 class Definition(object):
   """Base class for definitions.
 
@@ -302,6 +343,13 @@ class Definition(object):
   should be implemented by sub-classes, such as listing all the scopes the
   object may contain.
 
+  Definitions store their attributes in __slots__, to keep large syntax trees
+  small. Other attributes can still be set on them (they go into a __dict__,
+  only allocated when used), and sub-classes without __slots__ work as usual.
+  The attributes dictionaries may be shared by several definitions (see
+  idl_parser.Parser), these are read-only SharedAttributes: replace them rather
+  than modifying them.
+
   Attributes:
     defn_type: a string representing the type of this definition
     source: idl_parser.SourceLocation object, describing the source location
@@ -317,8 +365,13 @@ class Definition(object):
       array size. Empty for non-types
     nullable: the nullable form of this type.
     binding_model: the binding model module for this type. None for non-types
+    symbol_table: the SymbolTable built by FinalizeObjects, that look-ups go
+      through. None until the definition is finalized.
   """
   defn_type = 'Definition'
+  __slots__ = ('source', 'attributes', 'name', 'is_type', 'is_scope', 'parent',
+               '_array_defns', 'nullable', 'binding_model', 'symbol_table',
+               '_scope_stack', '__dict__')
 
   def __init__(self, source, attributes, name):
     """Inits a Definition instance.
@@ -335,20 +388,34 @@ class Definition(object):
     self.is_type = False
     self.is_scope = False
     self.parent = None
-    self.array_defns = {}
+    # Most definitions never have arrays, so the dictionary is only created
+    # when needed, see array_defns.
+    self._array_defns = None
     self.nullable = None
     self.binding_model = None
+    self.symbol_table = None
+    # Set by SymbolTable once the definition is finalized.
+    self._scope_stack = None
 
   def __repr__(self):
     return '%s(%s)' % (self.defn_type, self.name)
 
+  def _GetArrayDefns(self):
+    if self._array_defns is None:
+      return {}
+    return self._array_defns
+  array_defns = property(_GetArrayDefns)
+
   def GetParentScopeStack(self):
     """Gets the stack of englobing scopes."""
+    if self._scope_stack is not None:
+      return self._scope_stack[:]
     stack = []
     cursor = self.parent
     while cursor:
-      stack = [cursor] + stack
+      stack.append(cursor)
       cursor = cursor.parent
+    stack.reverse()
     return stack
 
   def LookUpTypeRecursive(self, name):
@@ -448,11 +515,13 @@ class Definition(object):
     # instanciated on use. For several purposes (looking up binding models for
     # example), we want to treat them as a definition, so hook a unique version
     # of each array (unsized, each size) in the type.
-    if size in self.array_defns:
-      return self.array_defns[size]
+    if self._array_defns is None:
+      self._array_defns = {}
+    if size in self._array_defns:
+      return self._array_defns[size]
     else:
       array = Array(self, size)
-      self.array_defns[size] = array
+      self._array_defns[size] = array
       return array
 
   def GetNullableType(self):
@@ -480,14 +549,28 @@ class Definition(object):
 
     This method gets the list of all objects defined within this description,
     going recursively through them. In this list, parent objects must be
-    returned before their children. This method should be overridden by
-    Description sub-types that are scopes, but the default behavior is valid
-    for non-scopes.
+    returned before their children. Sub-types override AddObjectsRecursive
+    rather than this method.
 
     Returns:
       The list of objects.
     """
-    return [self]
+    objects = []
+    self.AddObjectsRecursive(objects)
+    return objects
+
+  def AddObjectsRecursive(self, objects):
+    """Appends all objects defined in this description to a list, recursively.
+
+    This is the implementation of GetObjectsRecursive, that fills a single list
+    for the whole tree. This method should be overridden by Description
+    sub-types that are scopes, but the default behavior is valid for
+    non-scopes.
+
+    Args:
+      objects: the list to append the objects to.
+    """
+    objects.append(self)
 
   def ResolveTypeReferences(self):
     """Resolve all type references needed for this type.
@@ -573,6 +656,8 @@ class Class(Definition):
     defn_list: the list of definitions contained in the class scope.
   """
   defn_type = 'Class'
+  __slots__ = ('base_type_ref', 'base_type', 'defn_list', '_scope',
+               '_types_resolved', '_chain_end')
 
   def __init__(self, source, attributes, name, base_type_ref, defn_list):
     """Inits a Class instance.
@@ -594,12 +679,16 @@ class Class(Definition):
     self.is_type = True
     self.is_scope = True
     self._types_resolved = False
+    # See CheckTypeInChain.
+    self._chain_end = None
     for o in defn_list:
       o.parent = self
 
-  def GetObjectsRecursive(self):
-    """Implementation of GetObjectsRecursive for Class."""
-    return [self] + GetObjectsRecursive(self.defn_list)
+  def AddObjectsRecursive(self, objects):
+    """Implementation of AddObjectsRecursive for Class."""
+    objects.append(self)
+    for obj in self.defn_list:
+      obj.AddObjectsRecursive(objects)
 
   def ResolveTypeReferences(self):
     """Implementation of ResolveTypeReferences for Class.
@@ -639,7 +728,10 @@ class Class(Definition):
 
   def LookUpType(self, name):
     """Implementation of LookUpType for Class."""
-    type_defn = self._scope.LookUpType(name)
+    if self.symbol_table:
+      type_defn = self.symbol_table.LookUpType(self, name)
+    else:
+      type_defn = self._scope.LookUpType(name)
     if type_defn:
       return type_defn
     base = self.GetBaseSafe()
@@ -649,7 +741,10 @@ class Class(Definition):
 
   def FindScopes(self, name):
     """Implementation of FindScopes for Class."""
-    scopes = self._scope.FindScopes(name)
+    if self.symbol_table:
+      scopes = self.symbol_table.FindScopes(self, name)
+    else:
+      scopes = self._scope.FindScopes(name)
     base = self.GetBaseSafe()
     if base:
       scopes.extend(base.FindScopes(name))
@@ -682,6 +777,7 @@ class Namespace(Definition):
       should be merged for lookup.
   """
   defn_type = 'Namespace'
+  __slots__ = ('defn_list', 'scope')
 
   def __init__(self, source, attributes, name, defn_list):
     """Inits a Namespace instance.
@@ -700,9 +796,11 @@ class Namespace(Definition):
     for o in defn_list:
       o.parent = self
 
-  def GetObjectsRecursive(self):
-    """Implementation of GetObjectsRecursive for Namespace."""
-    return [self] + GetObjectsRecursive(self.defn_list)
+  def AddObjectsRecursive(self, objects):
+    """Implementation of AddObjectsRecursive for Namespace."""
+    objects.append(self)
+    for obj in self.defn_list:
+      obj.AddObjectsRecursive(objects)
 
   def MergeLookUpScope(self, other):
     """Merges the LookUpScope object from another Namespace into this one.
@@ -721,10 +819,14 @@ class Namespace(Definition):
 
   def LookUpType(self, name):
     """Implementation of LookUpType for Namespace."""
+    if self.symbol_table:
+      return self.symbol_table.LookUpType(self, name)
     return self.scope.LookUpType(name)
 
   def FindScopes(self, name):
     """Implementation of FindScopes for Namespace."""
+    if self.symbol_table:
+      return self.symbol_table.FindScopes(self, name)
     return self.scope.FindScopes(name)
 
 
@@ -748,6 +850,8 @@ class Enum(Definition):
       value: the value, or None for the default value.
     """
 
+    __slots__ = ('name', 'value')
+
     def __init__(self, name, value):
       """Inits an Enum.Value instance.
 
@@ -759,6 +863,7 @@ class Enum(Definition):
       self.value = value
 
   defn_type = 'Enum'
+  __slots__ = ('values',)
 
   def __init__(self, source, attributes, name, values):
     """Inits an Enum instance.
@@ -809,6 +914,8 @@ class Function(Definition):
         'this' parameter for methods.
     """
 
+    __slots__ = ('type_ref', 'type_defn', 'name', 'mutable')
+
     def __init__(self, type_ref, name):
       """Inits a Function.Param instance.
 
@@ -822,6 +929,7 @@ class Function(Definition):
       self.mutable = False
 
   defn_type = 'Function'
+  __slots__ = ('type_ref', 'type_defn', 'params')
 
   def __init__(self, source, attributes, name, type_ref, params):
     """Inits a Function instance.
@@ -865,6 +973,7 @@ class Callback(Definition):
   """
 
   defn_type = 'Callback'
+  __slots__ = ('type_ref', 'type_defn', 'params')
 
   def __init__(self, source, attributes, name, type_ref, params):
     """Inits a Callback instance.
@@ -912,6 +1021,7 @@ class Variable(Definition):
     type: the type of the variable, once the reference has been resolved.
   """
   defn_type = 'Variable'
+  __slots__ = ('type_ref', 'type_defn')
 
   def __init__(self, source, attributes, name, type_ref):
     """Inits a Variable instance.
@@ -977,6 +1087,8 @@ class Typedef(Definition):
       resolved.
   """
   defn_type = 'Typedef'
+  __slots__ = ('type_ref', 'type_defn', '_types_resolved', '_final_type',
+               '_chain_end')
 
   def __init__(self, source, attributes, name, type_ref):
     """Inits a Typedef instance.
@@ -994,6 +1106,9 @@ class Typedef(Definition):
     self.is_type = True
     self.is_scope = True
     self._types_resolved = False
+    self._final_type = None
+    # See CheckTypeInChain.
+    self._chain_end = None
 
   def ResolveTypeReferences(self):
     """Implementation of ResolveTypeReferences for Typedef."""
@@ -1028,7 +1143,11 @@ class Typedef(Definition):
 
   def GetFinalType(self):
     """Implementation of GetFinalType for Typedef."""
-    return self.GetTypeSafe().GetFinalType()
+    # Each typedef of a chain keeps its final type, so that the chain is only
+    # followed once.
+    if self._final_type is None:
+      self._final_type = self.GetTypeSafe().GetFinalType()
+    return self._final_type
 
   def LookUpType(self, name):
     """Implementation of LookUpType for Typedef."""
@@ -1050,6 +1169,7 @@ class Typename(Definition):
     None
   """
   defn_type = 'Typename'
+  __slots__ = ()
 
   def __init__(self, source, attributes, name):
     """Inits a Typename instance.
@@ -1082,6 +1202,7 @@ class Verbatim(Definition):
     text: the verbatim text.
   """
   defn_type = 'Verbatim'
+  __slots__ = ('text',)
 
   def __init__(self, source, attributes, text):
     """Inits a Verbatim instance.
@@ -1108,6 +1229,7 @@ class Array(Definition):
     size: the size of the array, as an integer, or None for an unsized array
   """
   defn_type = 'Array'
+  __slots__ = ('data_type', 'size')
 
   def __init__(self, data_type, size):
     """Inits an Array instance.
@@ -1143,6 +1265,7 @@ class Nullable(Definition):
     data_type: the type this Nullable has when it is not null.
   """
   defn_type = 'Nullable'
+  __slots__ = ('data_type',)
 
   def __init__(self, data_type):
     """Inits an Array instance.
@@ -1163,6 +1286,31 @@ class Nullable(Definition):
     return 'nullable'
 
 
+def _GetNextInChain(type_defn):
+  """Gets the type following a type in a type chain.
+
+  Args:
+    type_defn: the type.
+
+  Returns:
+    the original type of a typedef, the base type of a class or the data type
+    of an array, or None if there is none, or if it isn't resolved yet.
+  """
+  if type_defn.defn_type == 'Typedef':
+    # Don't use GetTypeSafe, just break if the type hasn't been set
+    # using GetTypeSafe would produce an infinite loop...
+    # It is ok to break if the type hasn't been set yet. If there is a
+    # cycle, it will be detected when that other type calls GetTypeSafe
+    return type_defn.type_defn
+  elif type_defn.defn_type == 'Class':
+    # same as above, don't use GetBaseTypeSafe
+    return type_defn.base_type
+  elif type_defn.defn_type == 'Array':
+    return type_defn.data_type
+  else:
+    return None
+
+
 def CheckTypeInChain(type_defn, chain_head):
   """Checks that a type isn't in a type chain.
 
@@ -1183,6 +1331,13 @@ def CheckTypeInChain(type_defn, chain_head):
   and so on. This function checks that a particular type doesn't already exists
   in a chain, defined by following typedefs, base classes and array data types.
 
+  Each typedef and class of the chain keeps the end of the chain found when it
+  was followed, so that later checks skip the part of the chain already
+  followed. Links are only ever added at the end of a chain, so the end found
+  then is still in the chain, and is followed from there. When the type looked
+  for is at the end of a chain, as when it is being resolved, it can't be in
+  the part skipped.
+
   Args:
     type_defn: the type to look for.
     chain_head: the head of the chain to look into.
@@ -1191,23 +1346,20 @@ def CheckTypeInChain(type_defn, chain_head):
     CircularTypedefError: a circular reference was found, that is 'type' was
       found in the chain.
   """
+  use_chain_ends = _GetNextInChain(type_defn) is None
+  followed = []
   current = chain_head
   while current:
     if type_defn == current:
       raise CircularTypedefError(type_defn, current)
-    if current.defn_type == 'Typedef':
-      # Don't use GetTypeSafe, just break if the type hasn't been set
-      # using GetTypeSafe would produce an infinite loop...
-      # It is ok to break if the type hasn't been set yet. If there is a
-      # cycle, it will be detected when that other type calls GetTypeSafe
-      current = current.type_defn
-    elif current.defn_type == 'Class':
-      # same as above, don't use GetBaseTypeSafe
-      current = current.base_type
-    elif current.defn_type == 'Array':
-      current = current.data_type
+    followed.append(current)
+    if use_chain_ends and getattr(current, '_chain_end', None):
+      current = current._chain_end
     else:
-      break
+      current = _GetNextInChain(current)
+  for defn in followed[:-1]:
+    if defn.defn_type in ('Typedef', 'Class'):
+      defn._chain_end = followed[-1]
 
 
 class LookUpScope(object):
@@ -1215,13 +1367,16 @@ class LookUpScope(object):
 
   This class provides basic functionality for LookUpType and FindScope
   implementations, when the definition is a scope, like classes and namespaces.
-  Caching and such is implemented here. Currently, only type lookups is cached
-  with a name -> definition dictionary.
+  Caching and such is implemented here. Type lookups are cached with a name ->
+  definition dictionary, and scope lookups with a name -> list of definitions
+  dictionary.
 
   Attributes:
     list: the list of definition the lookup operates on.
   """
 
+  __slots__ = ('list', '_types', '_scopes')
+
   def __init__(self, definition_list):
     """Inits a LookUpScope instance.
 
@@ -1234,11 +1389,18 @@ class LookUpScope(object):
   def ResetCache(self):
     """Resets all caches. To be used if the definition list changes."""
     self._types = None
+    self._scopes = None
 
   def MakeCache(self):
     """Initializes caches."""
-    if not self._types:
-      self._types = dict([(i.name, i) for i in self.list if i.is_type])
+    if self._types is None:
+      self._types = {}
+      self._scopes = {}
+      for i in self.list:
+        if i.is_type:
+          self._types[i.name] = i
+        if i.is_scope:
+          self._scopes.setdefault(i.name, []).append(i)
 
   def LookUpType(self, name):
     """Looks up a type by name within the definition list.
@@ -1265,7 +1427,8 @@ class LookUpScope(object):
       The list of all the scopes that were found. May be [] if no scope of that
       name was found.
     """
-    return [i for i in self.list if i.is_scope and i.name == name]
+    self.MakeCache()
+    return self._scopes.get(name, [])[:]
 
 
 def GetObjectsRecursive(object_list):
@@ -1280,7 +1443,146 @@ def GetObjectsRecursive(object_list):
     Returns:
       The list of objects.
     """
-  return sum([obj.GetObjectsRecursive() for obj in object_list], [])
+  objects = []
+  for obj in object_list:
+    obj.AddObjectsRecursive(objects)
+  return objects
+
+
+class SymbolTable(object):
+  """Whole-program index of the definitions.
+
+  FinalizeObjects builds a SymbolTable before resolving the type references.
+  It indexes the definitions by fully qualified name, the children of each
+  scope, and the types and scopes defined in each scope by name, and sets the
+  parent scope stack of each definition. Once a definition is in a table, its
+  LookUpType and FindScopes query the table instead of walking the tree.
+
+  The parts of a namespace share their qualified name, so they share their
+  types and scopes, like the LookUpScope objects merged by
+  MergeNamespacesRecursive.
+
+  Attributes:
+    definitions: the list of all the definitions, parents before children.
+  """
+
+  def __init__(self, namespace):
+    """Inits a SymbolTable instance.
+
+    Args:
+      namespace: 'global' namespace, containing all the definitions.
+    """
+    self.definitions = namespace.GetObjectsRecursive()
+    self._names = {}
+    self._definitions = {}
+    self._children = {}
+    # scope key -> {name: type}, and scope key -> {name: [scopes]}, see
+    # _GetScopeKey.
+    self._types = {}
+    self._scopes = {}
+    # The children of a scope share their scope stack, GetParentScopeStack
+    # returns copies.
+    inner_stacks = {}
+    for defn in self.definitions:
+      defn.symbol_table = self
+      parent = defn.parent
+      if defn is namespace:
+        defn._scope_stack = defn.GetParentScopeStack()
+        parent_name = None
+      else:
+        # Parents come before their children, so their stack is already set.
+        try:
+          defn._scope_stack = inner_stacks[id(parent)]
+        except KeyError:
+          defn._scope_stack = parent._scope_stack + [parent]
+          inner_stacks[id(parent)] = defn._scope_stack
+        self._children.setdefault(id(parent), []).append(defn)
+        parent_name = self._names.get(id(parent))
+        key = self._GetScopeKey(parent)
+        # Like LookUpScope, the last type of a given name wins.
+        if defn.is_type:
+          self._types.setdefault(key, {})[defn.name] = defn
+        if defn.is_scope:
+          self._scopes.setdefault(key, {}).setdefault(defn.name, []).append(
+              defn)
+      if defn.name is None:
+        continue
+      if parent_name:
+        name = '%s::%s' % (parent_name, defn.name)
+      else:
+        name = defn.name
+      self._names[id(defn)] = name
+      self._definitions.setdefault(name, []).append(defn)
+
+  def _GetScopeKey(self, scope):
+    """Gets the key of a scope in the type and scope indices.
+
+    Namespaces are keyed by qualified name, so that their parts are merged.
+    Other scopes are keyed by identity.
+    """
+    if scope.defn_type == 'Namespace':
+      return self._names.get(id(scope))
+    return id(scope)
+
+  def LookUpType(self, scope, name):
+    """Looks up a type by name, directly within a scope.
+
+    Args:
+      scope: the scope definition.
+      name: the name of the type looked for.
+
+    Returns:
+      The type definition if found, None otherwise.
+    """
+    return self._types.get(self._GetScopeKey(scope), {}).get(name)
+
+  def FindScopes(self, scope, name):
+    """Finds all the scopes matching a name, directly within a scope.
+
+    Args:
+      scope: the scope definition.
+      name: the name of the scopes looked for.
+
+    Returns:
+      The list of all the scopes that were found, in traversal order. May be []
+      if no scope of that name was found.
+    """
+    return self._scopes.get(self._GetScopeKey(scope), {}).get(name, [])[:]
+
+  def GetQualifiedName(self, defn):
+    """Gets the fully qualified name of a definition.
+
+    Args:
+      defn: the definition.
+
+    Returns:
+      The name, e.g. 'Namespace::Class::Function', or None if the definition
+      doesn't have a name or isn't in the table.
+    """
+    return self._names.get(id(defn))
+
+  def LookUp(self, qualified_name):
+    """Looks up definitions by fully qualified name.
+
+    Args:
+      qualified_name: the name, e.g. 'Namespace::Class'.
+
+    Returns:
+      The list of the definitions with that name, in traversal order (several
+      for overloaded functions or namespaces defined by parts). May be [].
+    """
+    return self._definitions.get(qualified_name, [])[:]
+
+  def GetChildren(self, scope):
+    """Gets the definitions directly within a scope.
+
+    Args:
+      scope: the scope definition.
+
+    Returns:
+      The list of the definitions whose parent is the scope.
+    """
+    return self._children.get(id(scope), [])[:]
 
 
 def MergeNamespacesRecursive(namespace):
@@ -1326,6 +1628,7 @@ def FinalizeObjects(namespace, binding_models):
   When objects are first parsed, they are not completely ready for code
   generation. This functions takes care of finalizing objects:
   - merging namespace scopes that have the same name in the same outer scope.
+  - building the symbol table the type look-ups go through.
   - resolving type references.
   - setting binding models on types.
 
@@ -1341,14 +1644,28 @@ def FinalizeObjects(namespace, binding_models):
       definition.
     UnknownBindingModelError: a type definition doesn't have a valid binding
       model.
+
+  Returns:
+    The SymbolTable of the definitions, also set as the symbol_table member of
+    the namespace.
   """
+  start = profiler.Start()
   MergeNamespacesRecursive(namespace)
-  all_defns = namespace.GetObjectsRecursive()
+  profiler.Record('finalize', 'MergeNamespacesRecursive', start)
+  start = profiler.Start()
+  table = SymbolTable(namespace)
+  profiler.Record('finalize', 'SymbolTable', start)
+  all_defns = table.definitions
+  start = profiler.Start()
   for defn in all_defns:
     defn.ResolveTypeReferences()
+  profiler.Record('finalize', 'ResolveTypeReferences', start)
+  start = profiler.Start()
   for defn in all_defns:
     if defn.is_type:
       defn.SetBindingModel(binding_models)
+  profiler.Record('finalize', 'SetBindingModel', start)
+  return table
 
 
 def main():
@@ -16,6 +16,7 @@
 
 """Test for syntax_tree."""
 
+import cPickle
 import unittest
 import idl_parser
 import syntax_tree
@@ -263,6 +264,32 @@ class DefinitionTest(unittest.TestCase):
     self.assertEquals(sized.size, 3)
     self.assertEquals(sized, definition.GetArrayType(3))
 
+  def testSlots(self):
+    definition = syntax_tree.Definition(_location, [], 'Definition')
+    self.assertEquals(definition.array_defns, {})
+    definition.is_type = True
+    unsized = definition.GetArrayType(None)
+    self.assertEquals(definition.array_defns, {None: unsized})
+    # Attributes that aren't declared in the slots still work.
+    definition.podtype = 'int'
+    self.assertEquals(definition.podtype, 'int')
+
+  def testSharedAttributes(self):
+    attributes = syntax_tree.SharedAttributes([('binding_model', 'pod')])
+    self.assertEquals(attributes['binding_model'], 'pod')
+    self.assertRaises(TypeError, attributes.__setitem__, 'include', 'a.h')
+    self.assertRaises(TypeError, attributes.__delitem__, 'binding_model')
+    self.assertRaises(TypeError, attributes.update, {'include': 'a.h'})
+    self.assertRaises(TypeError, attributes.setdefault, 'include', 'a.h')
+    self.assertEquals(attributes, {'binding_model': 'pod'})
+    copy = dict(attributes)
+    copy['include'] = 'a.h'
+    self.assertEquals(attributes, {'binding_model': 'pod'})
+    unpickled = cPickle.loads(cPickle.dumps(attributes,
+                                            cPickle.HIGHEST_PROTOCOL))
+    self.assertEquals(unpickled, attributes)
+    self.assertEquals(type(unpickled), syntax_tree.SharedAttributes)
+
   def testLookUpTypeRecursive(self):
     type1_c1 = MakeType('Type1')
     type2_c1 = MakeType('Type2')
@@ -1006,6 +1033,30 @@ class CheckTypeInChainTest(unittest.TestCase):
     self.assertRaises(syntax_tree.CircularTypedefError,
                       type1.ResolveTypeReferences)
 
+  def testLongChain(self):
+    # typedef Typedef1 Typedef0;
+    # ...
+    # typedef Typedef9 Typedef8;
+    # typedef Typedef0 Typedef9;
+    types = []
+    for index in range(10):
+      type_ref = syntax_tree.NameTypeReference(_location,
+                                               'Typedef%d' % ((index + 1) % 10))
+      types.append(syntax_tree.Typedef(_location, {}, 'Typedef%d' % index,
+                                       type_ref))
+    unused_scope1 = ContextMock(types, [], 'globals', None)
+    types_to_resolve = types[:-1]
+    types_to_resolve.reverse()
+    for type_defn in types_to_resolve:
+      type_defn.ResolveTypeReferences()
+    # The types keep the end of the chain, so that it is followed once.
+    self.assertEquals(types[1]._chain_end, types[-1])
+    self.assertRaises(syntax_tree.CircularTypedefError,
+                      types[-1].ResolveTypeReferences)
+    # Types in the part skipped are still found.
+    self.assertRaises(syntax_tree.CircularTypedefError,
+                      syntax_tree.CheckTypeInChain, types[5], types[0])
+
   def testMixed(self):
     # typedef Class Typedef;
     # class Class: Typedef {};
@@ -1080,6 +1131,62 @@ class GetObjectsRecursiveTest(unittest.TestCase):
                       scope1.GetObjectsRecursive())
 
 
+class SymbolTableTest(unittest.TestCase):
+  def testSymbolTable(self):
+    type1 = MakeType('Type1')
+    function1 = syntax_tree.Function(_location, {}, 'Function1', None, [])
+    function1_bis = syntax_tree.Function(_location, {}, 'Function1', None, [])
+    class1 = syntax_tree.Class(_location, {}, 'Class1', None,
+                               [function1, function1_bis])
+    ns1 = syntax_tree.Namespace(_location, {}, 'Namespace1', [class1])
+    ns1_bis = syntax_tree.Namespace(_location, {}, 'Namespace1', [type1])
+    ns = syntax_tree.Namespace(_location, {}, '', [ns1, ns1_bis])
+    table = syntax_tree.SymbolTable(ns)
+    self.assertEquals(table.definitions, [ns, ns1, class1, function1,
+                                          function1_bis, ns1_bis, type1])
+    self.assertEquals(table.LookUp('Namespace1'), [ns1, ns1_bis])
+    self.assertEquals(table.LookUp('Namespace1::Class1::Function1'),
+                      [function1, function1_bis])
+    self.assertEquals(table.LookUp('Namespace1::Type1'), [type1])
+    self.assertEquals(table.LookUp('Type1'), [])
+    self.assertEquals(table.GetQualifiedName(class1), 'Namespace1::Class1')
+    self.assertEquals(table.GetChildren(ns), [ns1, ns1_bis])
+    self.assertEquals(table.GetChildren(class1), [function1, function1_bis])
+    self.assertEquals(table.GetChildren(type1), [])
+    self.assertEquals(function1.GetParentScopeStack(), [ns, ns1, class1])
+    self.assertEquals(ns.GetParentScopeStack(), [])
+    # The stacks returned are copies.
+    function1.GetParentScopeStack().append(type1)
+    self.assertEquals(function1_bis.GetParentScopeStack(), [ns, ns1, class1])
+
+  def testLookUp(self):
+    type1 = MakeType('Type1')
+    type2 = MakeType('Type2')
+    scope1 = MakeScope('Scope1')
+    scope1_bis = MakeScope('Scope1')
+    class1 = syntax_tree.Class(_location, {}, 'Class1', None,
+                               [type2, scope1_bis])
+    ns1 = syntax_tree.Namespace(_location, {}, 'Namespace1', [type1, scope1])
+    ns1_bis = syntax_tree.Namespace(_location, {}, 'Namespace1', [class1])
+    ns = syntax_tree.Namespace(_location, {}, '', [ns1, ns1_bis])
+    table = syntax_tree.SymbolTable(ns)
+    self.assertEquals(table.LookUpType(ns1, 'Type1'), type1)
+    # The parts of a namespace share their types and scopes.
+    self.assertEquals(table.LookUpType(ns1_bis, 'Type1'), type1)
+    self.assertEquals(table.LookUpType(ns1_bis, 'Class1'), class1)
+    self.assertEquals(table.LookUpType(ns1, 'Type2'), None)
+    self.assertEquals(table.LookUpType(class1, 'Type2'), type2)
+    self.assertEquals(table.FindScopes(ns1_bis, 'Scope1'), [scope1])
+    self.assertEquals(table.FindScopes(class1, 'Scope1'), [scope1_bis])
+    self.assertEquals(table.FindScopes(ns, 'Scope1'), [])
+    # Look-ups on the definitions go through the table.
+    self.assertEquals(ns1_bis.symbol_table, table)
+    self.assertEquals(ns1_bis.LookUpType('Type1'), type1)
+    self.assertEquals(class1.LookUpTypeRecursive('Type1'), type1)
+    self.assertEquals(class1.FindScopesRecursive('Scope1'), [scope1_bis,
+                                                             scope1])
+
+
 class MergeNamespacesRecursive(unittest.TestCase):
   def testMergeNamespaceResucrsive(self):
     def MakeNamespace(name, defn_list):
@@ -32,6 +32,11 @@ For JS bindings, the array is represented by a JavaScript array.
 """
 
 import string
+import snippet_cache
+
+
+CACHEABLE_SNIPPETS = ('NpapiFromNPVariant', 'NpapiExprToNPVariant',
+                      'PpapiFromPPVar', 'PpapiExprToPPVar')
 
 
 class InvalidArrayUsage(Exception):
@@ -467,9 +472,9 @@ def NpapiFromNPVariant(scope, type_defn, input_expr, variable, success,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  text, expr = data_type_bm.NpapiFromNPVariant(scope, data_type, 'value',
-                                               '%s_i' % variable, success,
-                                               exception_context, npp)
+  text, expr = snippet_cache.Call(data_type_bm, 'NpapiFromNPVariant', scope,
+                                  data_type, 'value', '%s_i' % variable,
+                                  success, exception_context, npp)
   type_name, unused_need_defn = _CppTypeString(scope, type_defn)
   text = _from_npvariant_template.substitute(Type=type_name,
                                              variable=variable,
@@ -529,10 +534,9 @@ def NpapiExprToNPVariant(scope, type_defn, variable, expression, output,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  pre, post = data_type_bm.NpapiExprToNPVariant(scope, data_type,
-                                                '%s_value' % variable,
-                                                '%s[i]' % variable, '&value',
-                                                success, npp)
+  pre, post = snippet_cache.Call(data_type_bm, 'NpapiExprToNPVariant', scope,
+                                 data_type, '%s_value' % variable,
+                                 '%s[i]' % variable, '&value', success, npp)
   type_name, unused_need_defn = _CppTypeString(scope, type_defn)
   text = _expr_to_npvariant_template.substitute(Type=type_name,
                                                 variable=variable,
@@ -670,9 +674,9 @@ def PpapiFromPPVar(scope, type_defn, input_expr, variable, success,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  text, expr = data_type_bm.PpapiFromPPVar(scope, data_type, 'value',
-                                           '%s_i' % variable, success,
-                                           exception_context, npp)
+  text, expr = snippet_cache.Call(data_type_bm, 'PpapiFromPPVar', scope,
+                                  data_type, 'value', '%s_i' % variable,
+                                  success, exception_context, npp)
   type_name, unused_need_defn = _CppTypeString(scope, type_defn)
   text = _from_ppvar_template.substitute(Type=type_name,
                                          variable=variable,
@@ -732,10 +736,9 @@ def PpapiExprToPPVar(scope, type_defn, variable, expression, output,
   """
   data_type = type_defn.GetFinalType().data_type
   data_type_bm = data_type.binding_model
-  pre, post = data_type_bm.PpapiExprToPPVar(scope, data_type,
-                                            '%s_value' % variable,
-                                            '%s[i]' % variable, '&value',
-                                            success, npp)
+  pre, post = snippet_cache.Call(data_type_bm, 'PpapiExprToPPVar', scope,
+                                 data_type, '%s_value' % variable,
+                                 '%s[i]' % variable, '&value', success, npp)
   type_name, unused_need_defn = _CppTypeString(scope, type_defn)
   text = _expr_to_ppvar_template.substitute(Type=type_name,
                                             variable=variable,
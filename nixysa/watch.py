@@ -0,0 +1,230 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Watch mode.
+
+This module keeps the code generator running, and runs it again each time one
+of its input files changes. The process, the imported modules and the parser
+tables stay warm between runs.
+
+The parsed definitions of each IDL file are kept in memory, serialized, and
+only the files whose contents changed are parsed again. Since
+syntax_tree.FinalizeObjects modifies the definitions, each run gets a fresh
+copy of them to finalize. The dependency manifest then limits the generation
+to the outputs that are affected by the change.
+
+The code of a running process can't be replaced: when one of the code
+generator modules changes, the process restarts itself.
+"""
+
+import os
+import sys
+import time
+import traceback
+
+import idl_parser
+import log
+import parse_cache
+import writer
+
+
+def GetStamp(path):
+  """Gets the modification stamp of a file.
+
+  Args:
+    path: the path of the file.
+
+  Returns:
+    a (modification time, size) pair, or None if the file doesn't exist.
+  """
+  try:
+    stat = os.stat(path)
+  except OSError:
+    return None
+  return (stat.st_mtime, stat.st_size)
+
+
+def GetStamps(paths):
+  """Gets the modification stamps of files.
+
+  Args:
+    paths: the list of the paths of the files.
+
+  Returns:
+    a dictionary mapping paths to stamps, see GetStamp.
+  """
+  return dict([(path, GetStamp(path)) for path in paths])
+
+
+def WaitForChanges(stamps, interval):
+  """Waits until some files change.
+
+  Args:
+    stamps: a dictionary mapping the paths of the files to watch to their
+      stamps, see GetStamps.
+    interval: the polling interval, in seconds.
+
+  Returns:
+    the sorted list of the paths of the files that changed.
+  """
+  while True:
+    time.sleep(interval)
+    changed = [path for (path, stamp) in stamps.items()
+               if GetStamp(path) != stamp]
+    if changed:
+      changed.sort()
+      return changed
+
+
+class SourceWatcher(object):
+  """Keeps the parsed definitions of IDL files up to date.
+
+  Attributes:
+    parse_count: the number of files that were parsed.
+  """
+
+  def __init__(self, files, parser, my_parse_cache=None):
+    """Inits a SourceWatcher instance.
+
+    Args:
+      files: the list of the IDL files.
+      parser: the idl_parser.Parser to parse the files with.
+      my_parse_cache: (optional) a parse_cache.ParseCache to get the
+        definitions of the files from, on the first parse.
+    """
+    self._files = files
+    self._parser = parser
+    self._parse_cache = my_parse_cache
+    # Maps each source to a (stamp, contents digest, serialized definitions)
+    # tuple. The definitions are None if the file had parse errors.
+    self._entries = {}
+    self.parse_count = 0
+
+  def _Parse(self, idl_file, input_data):
+    """Parses a file.
+
+    Args:
+      idl_file: the file to parse, as an idl_parser.File.
+      input_data: the contents of the file.
+
+    Returns:
+      a pair (definition list, success).
+    """
+    self.parse_count += 1
+    if self._parse_cache:
+      misses = self._parse_cache.cache.misses
+      defn_list = self._parse_cache.Parse(self._parser, idl_file)
+      if self._parse_cache.cache.misses == misses:
+        # Only files without errors are in the cache.
+        return defn_list, True
+    else:
+      defn_list = self._parser.Parse(idl_file, input_data)
+    return defn_list, defn_list is not None and not self._parser.error_count
+
+  def GetPairs(self):
+    """Gets the definitions of all the files.
+
+    The files that changed since the last call are parsed again.
+
+    Returns:
+      a list of (idl_parser.File, syntax_tree.Definition list) describing the
+      list of top-level definitions in each source file. The definitions are
+      not finalized.
+    """
+    pairs = []
+    for source in self._files:
+      idl_file = idl_parser.File(source)
+      stamp = GetStamp(source)
+      entry = self._entries.get(source)
+      if entry and entry[0] == stamp and entry[2] is not None:
+        pairs.append((idl_file, parse_cache.LoadDefinitions(entry[2],
+                                                            idl_file)))
+        continue
+      f = open(source)
+      try:
+        input_data = f.read()
+      finally:
+        f.close()
+      md5_hash = writer.NewMd5()
+      md5_hash.update(input_data)
+      digest = md5_hash.hexdigest()
+      if entry and entry[1] == digest and entry[2] is not None:
+        # Touched, but not modified.
+        self._entries[source] = (stamp, digest, entry[2])
+        pairs.append((idl_file, parse_cache.LoadDefinitions(entry[2],
+                                                            idl_file)))
+        continue
+      defn_list, success = self._Parse(idl_file, input_data)
+      if success:
+        data = parse_cache.DumpDefinitions(defn_list, idl_file)
+      else:
+        data = None
+      self._entries[source] = (stamp, digest, data)
+      pairs.append((idl_file, defn_list))
+    return pairs
+
+
+def Restart():
+  """Replaces the current process with a new instance of the code generator."""
+  print 'Code generator changed: restarting.'
+  sys.stdout.flush()
+  sys.stderr.flush()
+  os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def Watch(run, files, tool_sources, interval):
+  """Runs the code generator, then again each time its inputs change.
+
+  This function never returns. Errors don't stop the watch: they are reported,
+  and the code generator runs again on the next change.
+
+  Args:
+    run: the function running the code generator once.
+    files: the list of the IDL files.
+    tool_sources: the list of the source files of the code generator modules.
+      When one of these changes, the process restarts.
+    interval: the polling interval, in seconds.
+  """
+  while True:
+    # Get the stamps before running, so that changes made during the run are
+    # not missed.
+    stamps = GetStamps(files + tool_sources)
+    try:
+      run()
+    except Exception:
+      traceback.print_exc()
+      log.Error('Code generation failed.')
+    num_errors, num_warnings = log.GetCounts()
+    if num_errors > 0 or num_warnings > 0:
+      print >> sys.stderr, 'Num Errors:', num_errors
+      print >> sys.stderr, 'Num Warnings:', num_warnings
+    log.AddCounts(-num_errors, -num_warnings)
+    print 'Watching %d files for changes.' % len(files)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    changed = WaitForChanges(stamps, interval)
+    for path in changed:
+      if path in tool_sources:
+        Restart()
+    print 'Changed: %s' % ' '.join(changed)
+
+
+def main():
+  pass
+
+
+if __name__ == '__main__':
+  main()
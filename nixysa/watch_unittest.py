@@ -0,0 +1,76 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for watch."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import idl_parser
+import watch
+
+
+class WatchUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.files = [os.path.join(self.directory, name)
+                  for name in ['a.idl', 'b.idl']]
+    self.WriteFile(self.files[0], 'class A { void Go(); };\n')
+    self.WriteFile(self.files[1], 'class B { A GetA(); };\n')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def WriteFile(self, filename, contents):
+    f = open(filename, 'w')
+    f.write(contents)
+    f.close()
+
+  def SetTime(self, filename, mtime):
+    os.utime(filename, (mtime, mtime))
+
+  def testGetPairsParsesChangedFiles(self):
+    watcher = watch.SourceWatcher(self.files, idl_parser.Parser())
+    pairs = watcher.GetPairs()
+    self.assertEquals(watcher.parse_count, 2)
+    self.assertEquals([defn[0].name for (f, defn) in pairs], ['A', 'B'])
+    # Unchanged files are not parsed again, but get fresh definitions.
+    new_pairs = watcher.GetPairs()
+    self.assertEquals(watcher.parse_count, 2)
+    self.assertEquals([defn[0].name for (f, defn) in new_pairs], ['A', 'B'])
+    self.assert_(new_pairs[0][1][0] is not pairs[0][1][0])
+    self.assert_(new_pairs[0][1][0].source.file is new_pairs[0][0])
+    # Touched files are not parsed again if their contents didn't change.
+    self.SetTime(self.files[0], 1000)
+    watcher.GetPairs()
+    self.assertEquals(watcher.parse_count, 2)
+    self.WriteFile(self.files[1], 'class C { A GetA(); };\n')
+    self.SetTime(self.files[1], 2000)
+    pairs = watcher.GetPairs()
+    self.assertEquals(watcher.parse_count, 3)
+    self.assertEquals([defn[0].name for (f, defn) in pairs], ['A', 'C'])
+
+  def testWaitForChanges(self):
+    stamps = watch.GetStamps(self.files)
+    self.SetTime(self.files[1], 1000)
+    self.assertEquals(watch.WaitForChanges(stamps, 0), [self.files[1]])
+    os.remove(self.files[0])
+    self.assertEquals(watch.WaitForChanges(stamps, 0), self.files)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -17,12 +17,224 @@
 """File writing functions.
 
 This module contain function to write files only if their contents would
-change.
+change. Files are replaced atomically, by writing a temporary file and renaming
+it, so that an interrupted run never leaves truncated files behind.
+
+WriteFiles writes the files of a run concurrently. It compares the contents
+to write with the digests recorded in a stamp_file.StampFile, so that the
+existing files are only read back when their stat data changed. Unchanged
+files are not touched, and keep their modification time.
 """
 
-import os.path
+# Use hashlib if present (Python 2.5 and up), otherwise fall back to md5.
+try:
+  import hashlib
+except ImportError:
+  import md5
+import os
+import Queue
+import sys
+import tempfile
+import threading
 import log
 
+# The number of threads writing files in WriteFiles.
+_WRITE_THREADS = 4
+
+# The number of lines written at once by WriteLines.
+_WRITE_CHUNK_LINES = 512
+
+
+def NewMd5():
+  """Creates a new md5 hash object."""
+  if globals().has_key('hashlib'):
+    return hashlib.md5()
+  else:
+    return md5.new()
+
+
+def GetFileMode():
+  """Gets the mode of the files created with the current umask.
+
+  The umask is global to the process, and is briefly changed to be read: this
+  must not be called while other threads create files (see WriteFiles).
+  """
+  umask = os.umask(0)
+  os.umask(umask)
+  return 0666 & ~umask
+
+
+def _Rename(temp_path, filename):
+  """Renames a temporary file over a file.
+
+  Args:
+    temp_path: the temporary file.
+    filename: the file to replace.
+  """
+  try:
+    os.rename(temp_path, filename)
+  except OSError:
+    # On Windows, rename doesn't replace an existing file.
+    if not os.path.exists(filename):
+      raise
+    os.remove(filename)
+    os.rename(temp_path, filename)
+
+
+class _DigestStream(object):
+  """File-like object computing the digest of the data written to it."""
+
+  def __init__(self, f=None):
+    """Inits a _DigestStream.
+
+    Args:
+      f: (optional) a file to write the data to.
+    """
+    self._md5 = NewMd5()
+    self._file = f
+
+  def write(self, data):
+    self._md5.update(data)
+    if self._file:
+      self._file.write(data)
+
+  def hexdigest(self):
+    return self._md5.hexdigest()
+
+
+def WriteLines(section, write, prefix=''):
+  """Writes the full contents of a file writer section, line by line.
+
+  Sections (see cpp_utils.CppFileWriter and js_utils.JavascriptFileWriter)
+  implement GetItems, returning their code lines and child sections. This
+  produces the same lines as their GetLines, each followed by a new line,
+  without building the list of all the lines: they are written by chunks of
+  _WRITE_CHUNK_LINES lines.
+
+  Args:
+    section: the section.
+    write: the function to call with the text to write, e.g. the write method
+      of a file.
+    prefix: the text to write before the first line, if there is one.
+
+  Returns:
+    True if any line was written, False if the section has no code.
+  """
+  written = False
+  chunk = []
+  stack = [iter(section.GetItems())]
+  while stack:
+    for line in stack[-1]:
+      if not isinstance(line, basestring):
+        stack.append(iter(line.GetItems()))
+        break
+      chunk.append(line)
+      if len(chunk) >= _WRITE_CHUNK_LINES:
+        chunk.append('')
+        write(prefix + '\n'.join(chunk))
+        prefix = ''
+        chunk = []
+        written = True
+    else:
+      stack.pop()
+  if chunk:
+    chunk.append('')
+    write(prefix + '\n'.join(chunk))
+    written = True
+  return written
+
+
+def IsTracked(file_writer):
+  """Checks whether the writes of a file writer can be tracked.
+
+  The writers returned by the generators are tracked by the dependency
+  manifest and written by WriteFiles when they have an idl_file member and
+  implement GetFilename and GetContent. Other writers (e.g. from generator
+  modules written before the manifest) are written unconditionally through
+  their Write method.
+
+  Args:
+    file_writer: the file writer.
+
+  Returns:
+    True if the writer can be tracked.
+  """
+  return (hasattr(file_writer, 'idl_file') and
+          hasattr(file_writer, 'GetFilename') and
+          hasattr(file_writer, 'GetContent'))
+
+
+def ReplaceFile(filename, render, mode=None):
+  """Writes a file through a temporary file.
+
+  Files with several hard links (e.g. linked from the output cache) are
+  replaced, not written through.
+
+  Args:
+    filename: filename of file.
+    render: the function writing the contents, called with the temporary
+      file object. It can return False to leave the file unchanged, e.g.
+      when the contents didn't change.
+    mode: (optional) the mode of the file. Defaults to the mode given by the
+      umask, see GetFileMode.
+
+  Returns:
+    True if the file was replaced.
+  """
+  if mode is None:
+    mode = GetFileMode()
+  fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(filename) or '.',
+                                   prefix='.tmp')
+  try:
+    f = os.fdopen(fd, 'w')
+    try:
+      replace = render(f) is not False
+    finally:
+      f.close()
+    if not replace:
+      os.remove(temp_path)
+      return False
+    os.chmod(temp_path, mode)
+    _Rename(temp_path, filename)
+    return True
+  except:
+    if os.path.exists(temp_path):
+      os.remove(temp_path)
+    raise
+
+
+def WriteAtomically(filename, content, mode=None):
+  """Writes a file through a temporary file, see ReplaceFile.
+
+  Args:
+    filename: filename of file.
+    content: string containing contents of file.
+    mode: (optional) the mode of the file, see ReplaceFile.
+  """
+  ReplaceFile(filename, lambda f: f.write(content), mode)
+
+
+def LinkAtomically(filename, source):
+  """Replaces a file with a hard link.
+
+  Args:
+    filename: filename of file.
+    source: the file to link to.
+
+  Raises:
+    OSError: the file can't be linked, e.g. because the source is on another
+      file system.
+  """
+  temp_path = '%s.%d.tmp' % (filename, os.getpid())
+  if os.path.exists(temp_path):
+    os.remove(temp_path)
+  os.link(source, temp_path)
+  try:
+    _Rename(temp_path, filename)
+  except:
+    os.remove(temp_path)
+    raise
+
 
 def WriteIfContentDifferent(filename, content):
   """Write file only if content is different or if filename does not exist.
@@ -37,8 +249,163 @@ def WriteIfContentDifferent(filename, content):
     f.close()
     if old_content == content:
       return
-  f = open(filename, 'w')
-  f.write(content)
-  f.close()
+  WriteAtomically(filename, content)
   log.Info('Writing %s' % filename)
 
+
+def _WriteFile(file_writer, stamps, lock, mode):
+  """Writes a file, if its contents changed.
+
+  Args:
+    file_writer: the file writer.
+    stamps: the stamp_file.StampFile recording the digests of the files.
+    lock: the lock protecting the stamps.
+    mode: the mode of the file.
+
+  Returns:
+    True if the file was written.
+  """
+  filename = file_writer.GetFilename()
+  lock.acquire()
+  try:
+    try:
+      old_digest = stamps.GetDigest(filename)
+    except IOError:
+      old_digest = None
+  finally:
+    lock.release()
+  if hasattr(file_writer, 'GetDigest'):
+    digest = file_writer.GetDigest()
+    if old_digest == digest:
+      return False
+    link_path = None
+    if hasattr(file_writer, 'GetLinkPath'):
+      link_path = file_writer.GetLinkPath()
+    written = False
+    if link_path:
+      try:
+        LinkAtomically(filename, link_path)
+        written = True
+      except OSError:
+        pass
+    if not written:
+      WriteAtomically(filename, file_writer.GetContent(), mode)
+  elif hasattr(file_writer, 'WriteTo'):
+    # Stream the contents into the temporary file instead of holding them in
+    # memory. The temporary file is discarded if the contents didn't change,
+    # so that the file keeps its modification time.
+    digests = []
+
+    def _Render(f):
+      stream = _DigestStream(f)
+      file_writer.WriteTo(stream)
+      digests.append(stream.hexdigest())
+      return digests[0] != old_digest
+    if not ReplaceFile(filename, _Render, mode):
+      return False
+    digest = digests[0]
+  else:
+    content = file_writer.GetContent()
+    md5_hash = NewMd5()
+    md5_hash.update(content)
+    digest = md5_hash.hexdigest()
+    if old_digest == digest:
+      return False
+    WriteAtomically(filename, content, mode)
+  lock.acquire()
+  try:
+    stamps.SetDigest(filename, digest)
+  finally:
+    lock.release()
+  return True
+
+
+def WriteFiles(writer_list, stamps, threads=_WRITE_THREADS):
+  """Writes the files whose contents changed, concurrently.
+
+  Writers implement GetFilename and GetContent. They can also implement
+  WriteTo, to write their contents to a stream as they are rendered, or
+  GetDigest, to get the digest of their contents without rendering them, and
+  GetLinkPath, to return the path of a file to hard-link instead of writing
+  the contents.
+
+  Args:
+    writer_list: the list of the file writers.
+    stamps: the stamp_file.StampFile recording the digests of the files. It
+      is updated with the digests of the files written.
+    threads: the maximum number of threads writing files.
+
+  Returns:
+    the list of the names of the files that were written, in the order of
+    the writers.
+  """
+  # Read the umask before the workers start: it can't be read from a thread
+  # without changing it for the whole process.
+  mode = GetFileMode()
+  lock = threading.Lock()
+  written = [False] * len(writer_list)
+  errors = []
+  queue = Queue.Queue()
+  for item in enumerate(writer_list):
+    queue.put(item)
+
+  def _Worker():
+    while not errors:
+      try:
+        index, file_writer = queue.get_nowait()
+      except Queue.Empty:
+        return
+      try:
+        written[index] = _WriteFile(file_writer, stamps, lock, mode)
+      except:
+        errors.append(sys.exc_info())
+  workers = [threading.Thread(target=_Worker) for unused_index in
+             range(min(threads, len(writer_list)))]
+  for worker in workers:
+    worker.start()
+  for worker in workers:
+    worker.join()
+  if errors:
+    raise errors[0][0], errors[0][1], errors[0][2]
+  filenames = []
+  for file_writer, file_written in zip(writer_list, written):
+    if file_written:
+      filenames.append(file_writer.GetFilename())
+      log.Info('Writing %s' % file_writer.GetFilename())
+  return filenames
+
+
+class RenderedFile(object):
+  """Rendered file class.
+
+  This class holds the contents of a file that was generated in another
+  process (see the parallel module). It implements the same interface as the
+  file writers used by codegen.
+
+  Attributes:
+    idl_file: the idl_parser.File the file was generated from.
+  """
+
+  def __init__(self, filename, content, idl_file):
+    """Inits a RenderedFile.
+
+    Args:
+      filename: the name of the file.
+      content: the contents of the file.
+      idl_file: the idl_parser.File the file was generated from.
+    """
+    self._filename = filename
+    self._content = content
+    self.idl_file = idl_file
+
+  def GetFilename(self):
+    """Gets the name of the file."""
+    return self._filename
+
+  def GetContent(self):
+    """Gets the contents of the file."""
+    return self._content
+
+  def Write(self):
+    """Writes the contents to the file."""
+    WriteIfContentDifferent(self._filename, self._content)
@@ -0,0 +1,133 @@
+#!/usr/bin/python2.4
+#
+# Copyright 2009 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test for writer."""
+
+import os
+import shutil
+import tempfile
+import unittest
+import stamp_file
+import writer
+
+
+class FailingWriter(writer.RenderedFile):
+  """Writer failing to render its contents."""
+
+  def GetContent(self):
+    raise ValueError('failed')
+
+
+class StreamingWriter(writer.RenderedFile):
+  """Writer streaming its contents, counting the renderings."""
+
+  renderings = 0
+
+  def WriteTo(self, f):
+    StreamingWriter.renderings += 1
+    f.write(self.GetContent())
+
+
+class WriterUnitTest(unittest.TestCase):
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.stamp_filename = os.path.join(self.directory, 'stamps')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def ReadFile(self, filename):
+    f = open(filename)
+    try:
+      return f.read()
+    finally:
+      f.close()
+
+  def WriteFiles(self, contents):
+    writer_list = [writer.RenderedFile(os.path.join(self.directory, name),
+                                       content, None)
+                   for name, content in contents]
+    stamps = stamp_file.StampFile(self.stamp_filename)
+    stamps.Load()
+    written = writer.WriteFiles(writer_list, stamps, 2)
+    stamps.Save()
+    return [os.path.basename(filename) for filename in written], stamps
+
+  def testWriteFiles(self):
+    written, stamps = self.WriteFiles([('a.h', 'a'), ('b.h', 'b'),
+                                       ('c.h', 'c')])
+    self.assertEquals(written, ['a.h', 'b.h', 'c.h'])
+    filename = os.path.join(self.directory, 'a.h')
+    self.assertEquals(self.ReadFile(filename), 'a')
+    old_time = int(os.stat(filename).st_mtime) - 3600
+    os.utime(filename, (old_time, old_time))
+    written, stamps = self.WriteFiles([('a.h', 'a'), ('b.h', 'B'),
+                                       ('c.h', 'c')])
+    self.assertEquals(written, ['b.h'])
+    self.assertEquals(self.ReadFile(os.path.join(self.directory, 'b.h')), 'B')
+    # Unchanged files keep their modification time.
+    self.assertEquals(os.stat(filename).st_mtime, old_time)
+    # No temporary files are left behind.
+    self.assertEquals(sorted(os.listdir(self.directory)),
+                      ['a.h', 'b.h', 'c.h', 'stamps'])
+
+  def testStreamingWriter(self):
+    filename = os.path.join(self.directory, 'a.h')
+    for content, written in [('a', True), ('a', False), ('b', True)]:
+      stamps = stamp_file.StampFile(self.stamp_filename)
+      stamps.Load()
+      StreamingWriter.renderings = 0
+      filenames = writer.WriteFiles([StreamingWriter(filename, content, None)],
+                                    stamps)
+      self.assertEquals(filenames, written and [filename] or [])
+      stamps.Save()
+      # The contents are rendered once, even when they changed.
+      self.assertEquals(StreamingWriter.renderings, 1)
+      self.assertEquals(self.ReadFile(filename), content)
+    self.assertEquals(sorted(os.listdir(self.directory)), ['a.h', 'stamps'])
+
+  def testModifiedOutput(self):
+    self.WriteFiles([('a.h', 'a')])
+    filename = os.path.join(self.directory, 'a.h')
+    f = open(filename, 'w')
+    try:
+      f.write('modified')
+    finally:
+      f.close()
+    written, stamps = self.WriteFiles([('a.h', 'a')])
+    self.assertEquals(written, ['a.h'])
+    self.assertEquals(self.ReadFile(filename), 'a')
+
+  def testError(self):
+    stamps = stamp_file.StampFile(self.stamp_filename)
+    writer_list = [FailingWriter(os.path.join(self.directory, 'a.h'), '',
+                                 None)]
+    self.assertRaises(ValueError, writer.WriteFiles, writer_list, stamps)
+
+  def testHardLink(self):
+    source = os.path.join(self.directory, 'source')
+    filename = os.path.join(self.directory, 'a.h')
+    writer.WriteAtomically(source, 'source')
+    writer.LinkAtomically(filename, source)
+    self.assertEquals(os.stat(filename).st_nlink, 2)
+    # Files are replaced, not written through the link.
+    writer.WriteIfContentDifferent(filename, 'a')
+    self.assertEquals(self.ReadFile(filename), 'a')
+    self.assertEquals(self.ReadFile(source), 'source')
+
+
+if __name__ == '__main__':
+  unittest.main()